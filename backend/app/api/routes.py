@@ -1,11 +1,30 @@
+import asyncio
+import csv
+import io
+import json
 import logging
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Literal, Optional, Tuple
+from app.services import clientes, github_service, gpt_service, historico, indice_perfis, perfis_colunar, profile_cache, llm_cache, prontidao, telemetria
+from app.services.github_client import GitHubClient
 from app.services.github_service import buscar_dados_github, buscar_dados_github_com_filtros
-from app.services.gpt_service import gerar_analise_gpt, gerar_ranking_completo
+from app.services.gpt_service import gerar_analise_gpt, gerar_analise_gpt_stream, gerar_ranking_completo
+from app.services.jobs import FilaDeJobs, criar_fila
+from app.templates.analysis_template import CARD_STYLE
+from core.config import (
+    INDICE_PERFIS_HABILITADO,
+    INDICE_PERFIS_TOP_K_MAX,
+    LOTE_CONCORRENCIA,
+    LOTE_MAX_ITENS,
+    PERFIS_COLUNAR_HABILITADO,
+)
 from app.models.schemas import (
+    BuscaIndiceInput,
+    LoteInput,
+    ModoSelecaoRepos,
     RankingInput, 
+    RankingJobInput,
     CandidateDataForRanking, 
     UserInput, 
     FiltrosInput
@@ -14,6 +33,72 @@ from app.models.schemas import (
 router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 
+# Fila de jobs de ranking (criada no startup)
+fila_ranking: Optional[FilaDeJobs] = None
+
+
+async def iniciar_fila_ranking():
+    global fila_ranking
+    fila_ranking = criar_fila(processar_candidato_para_ranking, gerar_ranking_para_fila)
+    await fila_ranking.iniciar()
+
+
+async def parar_fila_ranking():
+    if fila_ranking:
+        await fila_ranking.parar()
+
+
+def extrair_username(username_or_url: str) -> str:
+    """Aceita tanto o usuário quanto a URL do perfil (https://github.com/usuario)."""
+    username = username_or_url.strip()
+    if "github.com/" in username:
+        username = username.split("github.com/")[-1].split("/")[0]
+    return username
+
+
+# ==============================================================================
+# GERAÇÃO COM HISTÓRICO
+# ==============================================================================
+async def _analise_com_historico(dados_github: dict, contexto: str) -> Tuple[Optional[str], str]:
+    """Análise do perfil servida pelo histórico quando os dados coletados não mudaram. Retorna (id, HTML)."""
+    return await historico.obter_ou_gerar(
+        tipo="perfil",
+        logins=[dados_github['login']],
+        contexto=contexto,
+        snapshot=dados_github,
+        gerar=lambda: gerar_analise_gpt(**dados_github, contexto=contexto),
+        titulo=f"Análise de @{dados_github['login']} ({contexto})",
+    )
+
+
+async def _ranking_com_historico(
+    job_description: str,
+    candidatos_analisados: List[CandidateDataForRanking],
+    modo: Optional[str] = None,
+) -> Tuple[Optional[str], str]:
+    """Ranking servido pelo histórico quando a vaga e as análises dos candidatos não mudaram. Retorna (id, HTML)."""
+    candidatos = sorted(candidatos_analisados, key=lambda c: c.username.lower())
+    modo = gpt_service.resolver_modo_ranking(modo, len(candidatos))
+    return await historico.obter_ou_gerar(
+        tipo="ranking",
+        logins=[c.username for c in candidatos],
+        contexto="ranking" if modo == "unico" else f"ranking_{modo}",
+        snapshot=[c.model_dump() for c in candidatos],
+        gerar=lambda: gerar_ranking_completo(
+            job_description=job_description, candidatos_analisados=candidatos_analisados, modo=modo,
+        ),
+        titulo=f"Ranking de {len(candidatos)} candidato(s): {job_description[:80]}",
+        vaga=job_description,
+    )
+
+
+async def gerar_ranking_para_fila(
+    job_description: str, candidatos_analisados: List[CandidateDataForRanking], modo: Optional[str] = None,
+) -> str:
+    _, ranking_html = await _ranking_com_historico(job_description, candidatos_analisados, modo)
+    return ranking_html
+
+
 # ==============================================================================
 # ENDPOINT DE RANKING DE MÚLTIPLOS CANDIDATOS
 # ==============================================================================
@@ -22,68 +107,51 @@ async def rankear_candidatos(input: RankingInput):
     logging.info(f"🚀 Iniciando ranking para {len(input.candidateUrls)} candidatos.")
 
     candidatos_analisados: List[CandidateDataForRanking] = []
-    
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = []
-        for url_or_username in input.candidateUrls:
-            futures.append(executor.submit(
-                processar_candidato_para_ranking, 
-                url_or_username, 
-                input.jobDescription
-            ))
-        
-        for future in as_completed(futures):
-            try:
-                candidato_analisado = future.result() 
-                if candidato_analisado:
-                    candidatos_analisados.append(candidato_analisado)
-            except HTTPException as he:
-                logging.warning(f"Erro ao processar candidato: {he.detail}. Ignorando este candidato.")
-            except Exception as e:
-                logging.error(f"Erro inesperado ao processar candidato: {e}. Ignorando.")
+
+    resultados = await asyncio.gather(
+        *(processar_candidato_para_ranking(url_or_username, input.jobDescription)
+          for url_or_username in input.candidateUrls),
+        return_exceptions=True,
+    )
+
+    for resultado in resultados:
+        if isinstance(resultado, HTTPException):
+            logging.warning(f"Erro ao processar candidato: {resultado.detail}. Ignorando este candidato.")
+        elif isinstance(resultado, Exception):
+            logging.error(f"Erro inesperado ao processar candidato: {resultado}. Ignorando.")
+        elif resultado:
+            candidatos_analisados.append(resultado)
 
     if not candidatos_analisados:
         raise HTTPException(status_code=404, detail="Nenhum candidato pôde ser analisado com sucesso.")
     
     try:
         logging.info(f"✨ Gerando ranking final da vaga com {len(candidatos_analisados)} análises.")
-        ranking_html = gerar_ranking_completo(
-            job_description=input.jobDescription,
-            candidatos_analisados=candidatos_analisados
+        historico_id, ranking_html = await _ranking_com_historico(
+            input.jobDescription, candidatos_analisados, input.modoRanking
         )
-        return {"analise": ranking_html}
+        return {"analise": ranking_html, "historico_id": historico_id}
     except Exception as e:
         logging.error(f"❌ Erro ao gerar ranking final: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao gerar ranking final: {str(e)}")
 
-# Função auxiliar para processar um único candidato (executada em thread)
-def processar_candidato_para_ranking(username_or_url: str, job_description: str) -> Optional[CandidateDataForRanking]:
+# Função auxiliar para processar um único candidato (executada concorrentemente)
+async def processar_candidato_para_ranking(username_or_url: str, job_description: str) -> Optional[CandidateDataForRanking]:
     try:
-        username = username_or_url
-        if "github.com/" in username_or_url:
-            username = username_or_url.split("github.com/")[-1].split("/")[0]
+        username = extrair_username(username_or_url)
 
-        dados_github = buscar_dados_github(username)
+        dados_github = await buscar_dados_github(username)
         
-        analise_candidato_html = gerar_analise_gpt(
-            nome=dados_github['nome'],
-            login=dados_github['login'],
-            html_url=dados_github['html_url'],
-            bio=dados_github['bio'],
-            seguidores=dados_github['seguidores'],
-            seguindo=dados_github['seguindo'],
-            public_repos=dados_github['public_repos'],
-            linguagens=dados_github['linguagens'],
-            repos_detalhes=dados_github['repos_detalhes'],
-            readme_text=dados_github['readme_text'],
-            contexto="recrutamento"
-        )
+        _, analise_candidato_html = await _analise_com_historico(dados_github, "recrutamento")
         
         return CandidateDataForRanking(
             username=dados_github['login'],
             nome=dados_github['nome'],
             html_url=dados_github['html_url'],
-            analise_html=analise_candidato_html
+            analise_html=analise_candidato_html,
+            bio=dados_github['bio'],
+            linguagens=dados_github['linguagens'],
+            repos_detalhes=dados_github['repos_detalhes'],
         )
     except HTTPException as he:
         logging.warning(f"Erro HTTP ao buscar/analisar {username_or_url}: {he.detail}")
@@ -93,32 +161,67 @@ def processar_candidato_para_ranking(username_or_url: str, job_description: str)
         raise HTTPException(status_code=500, detail=f"Erro inesperado ao processar {username_or_url}: {str(e)}")
 
 
+# ==============================================================================
+# RANKING ASSÍNCRONO (FILA DE JOBS)
+# ==============================================================================
+def _formatar_job(job: dict) -> dict:
+    candidatos = job["candidatos"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "progresso": {
+            "total": len(candidatos),
+            "concluidos": sum(1 for c in candidatos if c["status"] == "concluido"),
+            "erros": sum(1 for c in candidatos if c["status"] == "erro"),
+        },
+        "candidatos": [
+            {"entrada": c["entrada"], "status": c["status"], "username": c["username"], "erro": c["erro"]}
+            for c in candidatos
+        ],
+        "analise": job["resultado"],
+        "erro": job["erro"],
+    }
+
+
+@router.post("/ranking-vaga/jobs", status_code=202)
+async def criar_job_ranking(input: RankingJobInput):
+    job_id = await fila_ranking.enfileirar(input.jobDescription, input.candidateUrls, input.modoRanking)
+    logging.info(f"📥 Job de ranking {job_id} enfileirado com {len(input.candidateUrls)} candidatos.")
+    return {"job_id": job_id, "status": "pendente"}
+
+
+@router.get("/ranking-vaga/jobs/{job_id}")
+async def consultar_job_ranking(job_id: str):
+    job = await fila_ranking.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return _formatar_job(job)
+
+
+@router.get("/ranking-vaga/jobs/{job_id}/resultado")
+async def resultado_job_ranking(job_id: str):
+    job = await fila_ranking.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    if job["status"] == "erro":
+        raise HTTPException(status_code=500, detail=job["erro"])
+    if job["status"] != "concluido":
+        raise HTTPException(status_code=409, detail=f"Job ainda em andamento ({job['status']}).")
+    return {"analise": job["resultado"]}
+
+
 # ==============================================================================
 # ENDPOINT DE ANÁLISE DE PERFIL INDIVIDUAL
 # ==============================================================================
 @router.post("/analisar-perfil")
 async def analisar_perfil(user_input: UserInput):
     try:
-        username = user_input.usernameOrUrl
-        if "github.com/" in username:
-            username = username.split("github.com/")[-1].split("/")[0]
+        username = extrair_username(user_input.usernameOrUrl)
 
-        dados_github = buscar_dados_github(username)
+        dados_github = await buscar_dados_github(username, selecao=user_input.selecaoRepos)
         
-        analise_html = gerar_analise_gpt(
-            nome=dados_github['nome'],
-            login=dados_github['login'],
-            html_url=dados_github['html_url'],
-            bio=dados_github['bio'],
-            seguidores=dados_github['seguidores'],
-            seguindo=dados_github['seguindo'],
-            public_repos=dados_github['public_repos'],
-            linguagens=dados_github['linguagens'],
-            repos_detalhes=dados_github['repos_detalhes'],
-            readme_text=dados_github['readme_text'],
-            contexto=user_input.contexto
-        )
-        return {"analise": analise_html}
+        historico_id, analise_html = await _analise_com_historico(dados_github, user_input.contexto)
+        return {"analise": analise_html, "historico_id": historico_id}
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -126,6 +229,171 @@ async def analisar_perfil(user_input: UserInput):
         raise HTTPException(status_code=400, detail=f"Erro ao acessar GitHub: {str(e)}")
 
 
+# ==============================================================================
+# ENDPOINT DE ANÁLISE DE PERFIL INDIVIDUAL (STREAMING / SSE)
+# ==============================================================================
+def _evento_sse(evento: str, dados: dict) -> str:
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+@router.post("/analisar-perfil/stream")
+async def analisar_perfil_stream(user_input: UserInput):
+    """
+    Mesma análise de /analisar-perfil via Server-Sent Events:
+    `progresso` durante a coleta no GitHub, `token` com cada pedaço do HTML gerado e `fim` ao terminar.
+    """
+    username = extrair_username(user_input.usernameOrUrl)
+
+    async def eventos():
+        fila: asyncio.Queue = asyncio.Queue()
+        yield _evento_sse("progresso", {"mensagem": f"Buscando @{username} no GitHub..."})
+
+        tarefa = asyncio.create_task(buscar_dados_github(
+            username, progresso=fila.put_nowait, selecao=user_input.selecaoRepos
+        ))
+        try:
+            # Repassa as mensagens de progresso enquanto a coleta roda
+            while True:
+                proxima = asyncio.ensure_future(fila.get())
+                await asyncio.wait({tarefa, proxima}, return_when=asyncio.FIRST_COMPLETED)
+                if not proxima.done():
+                    proxima.cancel()
+                    break
+                yield _evento_sse("progresso", {"mensagem": proxima.result()})
+            while not fila.empty():
+                yield _evento_sse("progresso", {"mensagem": fila.get_nowait()})
+
+            try:
+                dados_github = tarefa.result()
+            except HTTPException as he:
+                yield _evento_sse("erro", {"detail": he.detail})
+                return
+            except Exception as e:
+                logging.error(f"❌ Erro ao analisar perfil: {e}")
+                yield _evento_sse("erro", {"detail": f"Erro ao acessar GitHub: {str(e)}"})
+                return
+
+            yield _evento_sse("progresso", {"mensagem": "Gerando análise com IA..."})
+
+            async for pedaco in gerar_analise_gpt_stream(
+                nome=dados_github['nome'],
+                login=dados_github['login'],
+                html_url=dados_github['html_url'],
+                bio=dados_github['bio'],
+                seguidores=dados_github['seguidores'],
+                seguindo=dados_github['seguindo'],
+                public_repos=dados_github['public_repos'],
+                linguagens=dados_github['linguagens'],
+                repos_detalhes=dados_github['repos_detalhes'],
+                readme_text=dados_github['readme_text'],
+                contexto=user_input.contexto
+            ):
+                yield _evento_sse("token", {"texto": pedaco})
+
+            yield _evento_sse("fim", {})
+        finally:
+            if not tarefa.done():
+                tarefa.cancel()
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ==============================================================================
+# ENDPOINT DE ANÁLISE EM LOTE (NDJSON)
+# ==============================================================================
+_COLUNAS_USUARIO = ("username", "usuario", "usuário", "login", "github", "url", "perfil")
+
+
+def _ler_usernames_csv(conteudo: str) -> List[str]:
+    """Lê a coluna de usuário do CSV (pelo cabeçalho) ou, sem cabeçalho reconhecido, a primeira coluna."""
+    linhas = [linha for linha in csv.reader(io.StringIO(conteudo)) if linha and linha[0].strip()]
+    if not linhas:
+        return []
+
+    cabecalho = [col.strip().lower() for col in linhas[0]]
+    coluna = next((i for i, col in enumerate(cabecalho) if col in _COLUNAS_USUARIO), None)
+    if coluna is None:
+        return [linha[0] for linha in linhas]
+    return [linha[coluna] for linha in linhas[1:] if len(linha) > coluna and linha[coluna].strip()]
+
+
+async def _analisar_item_lote(
+    entrada: str, username: str, contexto: str, incluir_analise: bool, selecao: Optional[str] = None
+) -> dict:
+    try:
+        dados_github = await buscar_dados_github(username, selecao=selecao)
+        item = {"entrada": entrada, "username": dados_github["login"], "status": "ok", "dados": dados_github}
+        if incluir_analise:
+            item["analise"] = await gerar_analise_gpt(**dados_github, contexto=contexto)
+        return item
+    except HTTPException as he:
+        return {"entrada": entrada, "username": username, "status": "erro", "codigo": he.status_code, "erro": he.detail}
+    except Exception as e:
+        logging.error(f"❌ Erro ao analisar {username} no lote: {e}")
+        return {"entrada": entrada, "username": username, "status": "erro", "codigo": 500, "erro": str(e)}
+
+
+def _resposta_lote(
+    entradas: List[str], contexto: str, incluir_analise: bool, selecao: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Remove duplicados (mesmo login), analisa com concorrência limitada e devolve
+    uma linha JSON por perfil assim que ele termina, seguida de uma linha de resumo.
+    """
+    unicos = {}
+    for entrada in entradas:
+        username = extrair_username(entrada)
+        if username and username.lower() not in unicos:
+            unicos[username.lower()] = (entrada, username)
+
+    semaforo = asyncio.Semaphore(LOTE_CONCORRENCIA)
+
+    async def analisar(entrada: str, username: str) -> dict:
+        async with semaforo:
+            return await _analisar_item_lote(entrada, username, contexto, incluir_analise, selecao)
+
+    async def linhas():
+        logging.info(f"📦 Lote com {len(entradas)} entradas ({len(unicos)} perfis únicos).")
+        tarefas = [asyncio.create_task(analisar(entrada, username)) for entrada, username in unicos.values()]
+        resumo = {"total": len(unicos), "duplicados": len(entradas) - len(unicos), "ok": 0, "erros": 0}
+        try:
+            for proxima in asyncio.as_completed(tarefas):
+                item = await proxima
+                resumo["ok" if item["status"] == "ok" else "erros"] += 1
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            yield json.dumps({"resumo": resumo}, ensure_ascii=False) + "\n"
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    return StreamingResponse(linhas(), media_type="application/x-ndjson")
+
+
+@router.post("/analisar-lote")
+async def analisar_lote(lote: LoteInput):
+    return _resposta_lote(lote.usernames, lote.contexto, lote.incluirAnalise, lote.selecaoRepos)
+
+
+@router.post("/analisar-lote/csv")
+async def analisar_lote_csv(
+    arquivo: UploadFile = File(...),
+    contexto: str = Form("recrutamento"),
+    incluirAnalise: bool = Form(True),
+    selecaoRepos: Optional[ModoSelecaoRepos] = Form(None),
+):
+    conteudo = (await arquivo.read()).decode("utf-8-sig", errors="replace")
+    usernames = _ler_usernames_csv(conteudo)
+    if not usernames:
+        raise HTTPException(status_code=400, detail="Nenhum usuário encontrado no CSV.")
+    if len(usernames) > LOTE_MAX_ITENS:
+        raise HTTPException(status_code=400, detail=f"O lote aceita no máximo {LOTE_MAX_ITENS} usuários.")
+    return _resposta_lote(usernames, contexto, incluirAnalise, selecaoRepos)
+
+
 # ==============================================================================
 # ENDPOINT DE ANÁLISE COM FILTROS AVANÇADOS
 # ==============================================================================
@@ -149,7 +417,7 @@ async def analisar_com_filtros(filtros: FiltrosInput):
         palavras_chave = filtros.habilidades + filtros.metodologias
         keywords_str = " ".join(palavras_chave) if palavras_chave else None
 
-        dados = buscar_dados_github_com_filtros(
+        dados = await buscar_dados_github_com_filtros(
             linguagens=filtros.linguagens,
             min_repos=filtros.minRepos,
             min_stars=filtros.minStars,
@@ -159,12 +427,10 @@ async def analisar_com_filtros(filtros: FiltrosInput):
             keywords=keywords_str,
         )
 
-        analise = gerar_analise_gpt(**dados, contexto="recrutamento")
-
-        card_style = "border: 1px solid #30363d; border-radius: 8px; padding: 16px; margin-bottom: 16px;"
+        analise = await gerar_analise_gpt(**dados, contexto="recrutamento")
 
         analise_com_filtro = f"""
-        <div style="{card_style}">
+        <div style="{CARD_STYLE}">
             <p><strong>🔎 Perfil encontrado: <a href="{dados['html_url']}" target="_blank" style="color: #58a6ff; text-decoration: none;">@{dados['login']}</a></strong></p>
             <p style="margin-top: 5px;">(Respeitando os filtros selecionados)</p>
         </div>
@@ -178,3 +444,118 @@ async def analisar_com_filtros(filtros: FiltrosInput):
     except Exception as e:
         logging.error(f"❌ Erro na análise com filtros: {e}")
         return {"erro": f"Erro ao analisar com filtros: {str(e)}"}
+
+
+# ==============================================================================
+# HISTÓRICO DE ANÁLISES
+# ==============================================================================
+@router.get("/historico")
+async def listar_historico(
+    login: Optional[str] = None,
+    tipo: Optional[Literal["perfil", "ranking"]] = None,
+    pagina: int = Query(1, ge=1),
+    limite: int = Query(20, ge=1, le=100),
+):
+    """Resumos das análises e rankings salvos (sem o HTML), do mais novo para o mais antigo."""
+    itens, total = await historico.listar(login, tipo, limite, (pagina - 1) * limite)
+    return {"itens": itens, "total": total, "pagina": pagina, "limite": limite}
+
+
+@router.get("/historico/{analise_id}")
+async def obter_historico(analise_id: str):
+    analise = await historico.obter(analise_id)
+    if analise is None:
+        raise HTTPException(status_code=404, detail="Análise não encontrada no histórico.")
+    return analise
+
+
+@router.delete("/historico/{analise_id}", status_code=204)
+async def remover_historico(analise_id: str):
+    if not await historico.remover(analise_id):
+        raise HTTPException(status_code=404, detail="Análise não encontrada no histórico.")
+    return Response(status_code=204)
+
+
+# ==============================================================================
+# ÍNDICE VETORIAL DE PERFIS
+# ==============================================================================
+def _exigir_indice():
+    if not INDICE_PERFIS_HABILITADO:
+        raise HTTPException(status_code=404, detail="Índice de perfis desabilitado (INDICE_PERFIS_HABILITADO).")
+
+
+@router.post("/indice/vaga")
+async def buscar_no_indice_por_vaga(input: BuscaIndiceInput):
+    """Perfis já buscados mais aderentes à descrição da vaga (sem chamadas ao GitHub ou à IA)."""
+    _exigir_indice()
+    resultados = await indice_perfis.buscar_por_vaga(input.jobDescription, input.topK)
+    return {"resultados": resultados, "total_indexados": indice_perfis.estatisticas()["perfis"]}
+
+
+@router.get("/indice/similares/{username}")
+async def buscar_perfis_similares(username: str, topK: int = Query(10, ge=1, le=INDICE_PERFIS_TOP_K_MAX)):
+    """Perfis do índice mais parecidos com @username (que precisa já ter sido buscado)."""
+    _exigir_indice()
+    login = extrair_username(username)
+    resultados = await indice_perfis.similares(login, topK)
+    if resultados is None:
+        raise HTTPException(status_code=404, detail=f"Perfil '{login}' ainda não está no índice.")
+    return {"login": login, "resultados": resultados}
+
+
+@router.post("/indice/filtros")
+async def filtrar_perfis_conhecidos(filtros: FiltrosInput, limite: int = Query(50, ge=1, le=1000)):
+    """
+    Aplica linguagens, minStars, minRepos, minFollowers e atividadeRecente sobre todos os perfis
+    já coletados (estatísticas colunares), sem chamar o GitHub. Devolve os perfis com mais
+    estrelas e a distribuição de linguagens (fração dos bytes) entre os aprovados.
+    """
+    if not PERFIS_COLUNAR_HABILITADO:
+        raise HTTPException(status_code=404, detail="Estatísticas colunares desabilitadas (PERFIS_COLUNAR_HABILITADO).")
+    return await perfis_colunar.filtrar(
+        linguagens=filtros.linguagens,
+        min_stars=filtros.minStars,
+        min_repos=filtros.minRepos,
+        min_followers=filtros.minFollowers,
+        atividade_recente=filtros.atividadeRecente,
+        limite=limite,
+    )
+
+
+# ==============================================================================
+# MÉTRICAS DE CACHE
+# ==============================================================================
+@router.get("/metrics", include_in_schema=False)
+async def metricas_prometheus():
+    """Métricas no formato do Prometheus (etapas do pipeline, chamadas ao GitHub, tokens, caches e erros)."""
+    corpo, content_type = telemetria.exportar()
+    return Response(content=corpo, media_type=content_type)
+
+
+@router.get("/metrics/cache")
+async def metricas_cache():
+    return {
+        "perfis": profile_cache.estatisticas(),
+        "llm": llm_cache.estatisticas(),
+        "indice_perfis": indice_perfis.estatisticas(),
+        "perfis_colunar": perfis_colunar.estatisticas(),
+    }
+
+
+@router.get("/metrics/github-rate-limit")
+async def metricas_rate_limit(github: GitHubClient = Depends(clientes.github)):
+    """Cota atual do GitHub por token e por recurso (core, search, graphql)."""
+    return github.scheduler.estado()
+
+
+@router.get("/ready")
+async def prontidao_servico():
+    """200 quando os clientes e os índices locais já foram aquecidos; 503 enquanto isso (ou se algum falhou)."""
+    estado = prontidao.estado()
+    return JSONResponse(estado, status_code=200 if estado["pronto"] else 503)
+
+
+@router.get("/metrics/coalescing")
+async def metricas_coalescing():
+    """Chamadas executadas e coalescidas (aguardaram uma execução idêntica em andamento)."""
+    return {"github": github_service.voos_github.estatisticas(), "analise": gpt_service.voos_analise.estatisticas()}
@@ -0,0 +1,20 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.api.routes import iniciar_fila_ranking, parar_fila_ranking
+from app.services import clientes, prontidao
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """
+    Startup: inicia a fila de jobs e dispara o aquecimento dos clientes em segundo plano
+    (o app já atende enquanto isso; GET /ready indica quando terminou).
+    Shutdown: para os workers da fila e fecha os pools de conexão com GitHub e OpenAI.
+    Compartilhado pelos dois pontos de entrada (main:app e app.main:app).
+    """
+    await iniciar_fila_ranking()
+    prontidao.iniciar()
+    yield
+    await prontidao.parar()
+    await parar_fila_ranking()
+    await clientes.fechar()
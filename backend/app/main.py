@@ -6,24 +6,34 @@ from fastapi.responses import FileResponse
 import logging
 from dotenv import load_dotenv
 from app.api.routes import router as api_router
+from app.ciclo_de_vida import ciclo_de_vida
+from app.services.telemetria import TelemetriaMiddleware
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+app = FastAPI(lifespan=ciclo_de_vida)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Métricas por requisição e cabeçalho Server-Timing
+app.add_middleware(TelemetriaMiddleware)
+
 # Corrigindo o caminho para frontend
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # sobe 3 níveis para o root do projeto
 FRONTEND_DIR = BASE_DIR / "frontend"
 
-app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+# Montagem da pasta estática (o backend também sobe sem o frontend, ex.: só a API)
+if FRONTEND_DIR.exists():
+    app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+else:
+    logging.warning(f"Pasta do frontend não encontrada em {FRONTEND_DIR}; /static não será servido.")
 
 @app.get("/", include_in_schema=False)
 async def serve_frontend():
@@ -1,11 +1,26 @@
 # app/models/schemas.py
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
+from core.config import INDICE_PERFIS_TOP_K_MAX, JOBS_MAX_CANDIDATOS, LOTE_MAX_ITENS, RANKING_MAX_CANDIDATOS
+
+# Como escolher os repositórios destacados: IA "Olheiro", pontuação local ou ambos
+ModoSelecaoRepos = Literal["ia", "local", "hibrido"]
+
+# Como gerar o ranking da vaga: uma chamada com os finalistas, avaliações em paralelo + fusão, ou automático
+ModoRanking = Literal["unico", "map_reduce", "auto"]
 
 # --- MODELOS PARA ANÁLISE SIMPLES ---
 class UserInput(BaseModel):
     usernameOrUrl: str
     contexto: str
+    selecaoRepos: Optional[ModoSelecaoRepos] = None  # None = SELECAO_REPOS_MODO
+
+# --- MODELOS PARA ANÁLISE EM LOTE ---
+class LoteInput(BaseModel):
+    usernames: List[str] = Field(..., min_length=1, max_length=LOTE_MAX_ITENS)
+    contexto: str = "recrutamento"
+    incluirAnalise: bool = True
+    selecaoRepos: Optional[ModoSelecaoRepos] = None
 
 # --- MODELOS PARA FILTROS ---
 class FiltrosInput(BaseModel):
@@ -21,10 +36,26 @@ class FiltrosInput(BaseModel):
 # --- MODELOS PARA RANKING DE VAGA ---
 class RankingInput(BaseModel):
     jobDescription: str = Field(..., min_length=50, max_length=5000)
-    candidateUrls: List[str] = Field(..., min_items=1, max_items=5)
+    candidateUrls: List[str] = Field(..., min_length=1, max_length=RANKING_MAX_CANDIDATOS)
+    modoRanking: Optional[ModoRanking] = None  # None = RANKING_MODO
+
+# Modo assíncrono (fila de jobs): aceita dezenas de candidatos por vaga
+class RankingJobInput(BaseModel):
+    jobDescription: str = Field(..., min_length=50, max_length=5000)
+    candidateUrls: List[str] = Field(..., min_length=1, max_length=JOBS_MAX_CANDIDATOS)
+    modoRanking: Optional[ModoRanking] = None
+
+# --- MODELOS PARA O ÍNDICE DE PERFIS ---
+class BuscaIndiceInput(BaseModel):
+    jobDescription: str = Field(..., min_length=3, max_length=5000)
+    topK: int = Field(10, ge=1, le=INDICE_PERFIS_TOP_K_MAX)
 
 class CandidateDataForRanking(BaseModel):
     username: str
     nome: str
     html_url: str
     analise_html: str # Análise detalhada gerada pela IA para este candidato
+    # Dados estruturados do GitHub, usados no pré-ranking local
+    bio: str = ""
+    linguagens: Dict[str, int] = {}
+    repos_detalhes: List[str] = []
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class LRUCache:
+    """Cache em memória com limite de itens (descarta o menos usado recentemente)."""
+
+    def __init__(self, max_itens: int):
+        self.max_itens = max_itens
+        self._itens: OrderedDict = OrderedDict()
+
+    def get(self, chave: str):
+        if chave not in self._itens:
+            return None
+        self._itens.move_to_end(chave)
+        return self._itens[chave]
+
+    def set(self, chave: str, valor):
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def remover(self, chave: str):
+        self._itens.pop(chave, None)
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class SQLiteCache:
+    """
+    Armazenamento chave -> JSON em uma tabela SQLite, limitado a `max_itens`
+    (remove as entradas acessadas há mais tempo).
+    Cada operação abre sua própria conexão, então pode ser usado a partir de threads.
+    """
+
+    def __init__(self, caminho: str, tabela: str, max_itens: int):
+        self.caminho = caminho
+        self.tabela = tabela
+        self.max_itens = max_itens
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {tabela} (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_acessado ON {tabela} (acessado_em)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, chave: str) -> Optional[dict]:
+        with self._conectar() as conn:
+            row = conn.execute(f"SELECT valor FROM {self.tabela} WHERE chave = ?", (chave,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(f"UPDATE {self.tabela} SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+        return json.loads(row[0])
+
+    def set(self, chave: str, valor: dict):
+        with self._conectar() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.tabela} (chave, valor, acessado_em) VALUES (?, ?, ?)",
+                (chave, json.dumps(valor, ensure_ascii=False), time.time()),
+            )
+            conn.execute(f"""
+                DELETE FROM {self.tabela} WHERE chave IN (
+                    SELECT chave FROM {self.tabela} ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_itens,))
+
+    def remover(self, chave: str):
+        with self._conectar() as conn:
+            conn.execute(f"DELETE FROM {self.tabela} WHERE chave = ?", (chave,))
+
+    def __len__(self):
+        with self._conectar() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.tabela}").fetchone()[0]
+
+
+class CacheEmCamadas:
+    """
+    LRU em memória na frente de um SQLiteCache em disco, com contadores de acertos.
+    O acesso ao disco roda em thread para não bloquear o event loop.
+    A política de validade (TTL) fica com quem usa o cache.
+    """
+
+    def __init__(self, caminho: str, tabela: str, max_memoria: int, max_disco: int):
+        self.memoria = LRUCache(max_memoria)
+        self.disco = SQLiteCache(caminho, tabela, max_disco)
+        self.contadores = {"hits_memoria": 0, "hits_disco": 0, "misses": 0}
+
+    async def get(self, chave: str) -> Optional[dict]:
+        valor = self.memoria.get(chave)
+        if valor is not None:
+            self.contadores["hits_memoria"] += 1
+            return valor
+
+        valor = await asyncio.to_thread(self.disco.get, chave)
+        if valor is not None:
+            self.contadores["hits_disco"] += 1
+            self.memoria.set(chave, valor)
+            return valor
+
+        self.contadores["misses"] += 1
+        return None
+
+    async def set(self, chave: str, valor: dict):
+        self.memoria.set(chave, valor)
+        await asyncio.to_thread(self.disco.set, chave, valor)
+
+    async def remover(self, chave: str):
+        self.memoria.remover(chave)
+        await asyncio.to_thread(self.disco.remover, chave)
+
+    def estatisticas(self) -> dict:
+        return {**self.contadores, "itens_memoria": len(self.memoria)}
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, List, Optional
+from app.services.github_client import GitHubClient
+from core.config import OPENAI_BASE_URL
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Clientes compartilhados por todas as requisições (pools de conexão e controle de cota).
+# São criados no primeiro uso, não na importação: o app sobe sem o SDK da OpenAI carregado
+# e sem exigir as credenciais até que alguma rota precise delas.
+_github: Optional[GitHubClient] = None
+_openai: Optional["AsyncOpenAI"] = None
+_lock_openai = threading.Lock()  # o aquecimento cria o cliente numa thread
+
+
+def tokens_github() -> List[str]:
+    """GITHUB_TOKEN e GITHUB_TOKENS (vários, separados por vírgula, para somar cotas)."""
+    token = os.getenv("GITHUB_TOKEN")
+    tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
+    if token and token not in tokens:
+        tokens.insert(0, token)
+    return tokens
+
+
+def github() -> GitHubClient:
+    """Cliente do GitHub; também usado como dependência (`Depends`) nas rotas."""
+    global _github
+    if _github is None:
+        tokens = tokens_github()
+        if not tokens:
+            logging.error("❌ GITHUB_TOKEN não encontrado. Verifique seu arquivo .env")
+            raise ValueError("GITHUB_TOKEN não definido no ambiente")
+        _github = GitHubClient(tokens)
+    return _github
+
+
+def openai() -> "AsyncOpenAI":
+    """Cliente da OpenAI; o SDK só é importado aqui."""
+    global _openai
+    if _openai is None:
+        with _lock_openai:
+            if _openai is None:
+                from openai import AsyncOpenAI
+                _openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL)
+    return _openai
+
+
+def configurar(github: Optional[GitHubClient] = None, openai: Optional["AsyncOpenAI"] = None):
+    """Substitui os clientes (ex.: ferramentas que apontam para outro endpoint)."""
+    global _github, _openai
+    if github is not None:
+        _github = github
+    if openai is not None:
+        _openai = openai
+
+
+async def fechar():
+    """Fecha os pools de conexão dos clientes que chegaram a ser criados."""
+    global _github, _openai
+    github_, openai_ = _github, _openai
+    _github = _openai = None
+    if github_ is not None:
+        await github_.fechar()
+    if openai_ is not None:
+        await openai_.close()
+
+
+async def aquecer_github(consultar: bool = True):
+    """Cria o cliente e, com `consultar`, abre a conexão com uma chamada a /rate_limit (não gasta cota)."""
+    cliente = github()
+    if consultar:
+        await cliente.get_json("/rate_limit")
+
+
+async def aquecer_openai():
+    # A importação do SDK é a parte lenta; fica fora do event loop
+    await asyncio.to_thread(openai)
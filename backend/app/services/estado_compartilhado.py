@@ -0,0 +1,131 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from core.config import ESTADO_COMPARTILHADO_DB
+
+# Marca de "sem resultado" (o dono da reserva terminou com erro ou ainda não terminou)
+SEM_RESULTADO = object()
+
+
+class EstadoCompartilhado:
+    """
+    Estado que precisa ser visto por todos os workers quando o backend roda em vários
+    processos (SQLite em WAL no DATA_DIR compartilhado):
+    - reservas (leases) de buscas/análises em andamento e o resultado de cada uma, para
+      coalescer pedidos idênticos entre processos;
+    - última cota conhecida de cada token do GitHub e os bloqueios por limite secundário.
+    Os tokens são guardados só como hash.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS voos (
+                    chave TEXT PRIMARY KEY,
+                    dono TEXT NOT NULL,
+                    expira_em REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS voos_resultados (
+                    chave TEXT PRIMARY KEY,
+                    resultado TEXT NOT NULL,
+                    salvo_em REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cotas (
+                    token_id TEXT NOT NULL,
+                    recurso TEXT NOT NULL,
+                    limite INTEGER,
+                    restante INTEGER NOT NULL,
+                    reset REAL NOT NULL,
+                    PRIMARY KEY (token_id, recurso)
+                );
+                CREATE TABLE IF NOT EXISTS bloqueios (
+                    token_id TEXT PRIMARY KEY,
+                    ate REAL NOT NULL
+                );
+            """)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # --- coalescência entre processos ---
+    def tentar_reservar(self, chave: str, dono: str, duracao: float) -> bool:
+        """Reserva a execução de `chave` para `dono`, se ninguém tiver uma reserva válida."""
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM voos WHERE chave = ? AND expira_em < ?", (chave, agora))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO voos (chave, dono, expira_em) VALUES (?, ?, ?)",
+                (chave, dono, agora + duracao),
+            )
+            return cursor.rowcount > 0
+
+    def liberar(self, chave: str, dono: str, resultado=SEM_RESULTADO, guardar_por: float = 60):
+        """Encerra a reserva e, se houver, publica o resultado para quem está aguardando."""
+        agora = time.time()
+        with self._conectar() as conn:
+            if resultado is not SEM_RESULTADO:
+                conn.execute(
+                    "INSERT OR REPLACE INTO voos_resultados (chave, resultado, salvo_em) VALUES (?, ?, ?)",
+                    (chave, json.dumps(resultado, ensure_ascii=False), agora),
+                )
+            conn.execute("DELETE FROM voos WHERE chave = ? AND dono = ?", (chave, dono))
+            conn.execute("DELETE FROM voos_resultados WHERE salvo_em < ?", (agora - guardar_por,))
+
+    def consultar(self, chave: str, desde: float) -> Tuple[object, bool]:
+        """(resultado publicado a partir de `desde` ou SEM_RESULTADO, se ainda há reserva válida)."""
+        with self._conectar() as conn:
+            row = conn.execute(
+                "SELECT resultado FROM voos_resultados WHERE chave = ? AND salvo_em >= ?", (chave, desde)
+            ).fetchone()
+            reservado = conn.execute(
+                "SELECT 1 FROM voos WHERE chave = ? AND expira_em >= ?", (chave, time.time())
+            ).fetchone() is not None
+        return (json.loads(row[0]) if row else SEM_RESULTADO), reservado
+
+    # --- cota do GitHub ---
+    def sincronizar_cotas(
+        self, cotas: List[Tuple[str, str, Optional[int], int, float]], bloqueios: Dict[str, float]
+    ) -> Tuple[List[Tuple[str, str, Optional[int], int, float]], Dict[str, float]]:
+        """
+        Grava as cotas vistas por este processo (token_id, recurso, limite, restante, reset) e os
+        bloqueios, e devolve o estado combinado de todos os processos. Na mesma janela de reset
+        vale o menor restante; uma janela mais nova substitui a antiga.
+        """
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for token_id, recurso, limite, restante, reset in cotas:
+                conn.execute("""
+                    INSERT INTO cotas (token_id, recurso, limite, restante, reset) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (token_id, recurso) DO UPDATE SET
+                        limite = COALESCE(excluded.limite, cotas.limite),
+                        restante = CASE
+                            WHEN excluded.reset > cotas.reset THEN excluded.restante
+                            WHEN excluded.reset = cotas.reset THEN MIN(excluded.restante, cotas.restante)
+                            ELSE cotas.restante END,
+                        reset = MAX(excluded.reset, cotas.reset)
+                """, (token_id, recurso, limite, restante, reset))
+            for token_id, ate in bloqueios.items():
+                conn.execute("""
+                    INSERT INTO bloqueios (token_id, ate) VALUES (?, ?)
+                    ON CONFLICT (token_id) DO UPDATE SET ate = MAX(excluded.ate, bloqueios.ate)
+                """, (token_id, ate))
+            todas = conn.execute("SELECT token_id, recurso, limite, restante, reset FROM cotas").fetchall()
+            todos_bloqueios = dict(conn.execute("SELECT token_id, ate FROM bloqueios").fetchall())
+        return [tuple(row) for row in todas], todos_bloqueios
+
+
+_estado: Optional[EstadoCompartilhado] = None
+
+
+def obter_estado() -> EstadoCompartilhado:
+    global _estado
+    if _estado is None:
+        _estado = EstadoCompartilhado(ESTADO_COMPARTILHADO_DB)
+    return _estado
@@ -0,0 +1,162 @@
+import re
+import time
+import logging
+import httpx
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from app.services import telemetria
+from app.services.rate_limit import RateLimitScheduler, RateLimitExcedido, recurso_da_requisicao
+from core.config import (
+    GITHUB_API_URL,
+    GITHUB_GRAPHQL_URL,
+    GITHUB_TIMEOUT,
+    GITHUB_MAX_CONEXOES,
+    GITHUB_TENTATIVAS,
+)
+
+
+class GitHubNaoEncontrado(Exception):
+    """Recurso inexistente na API do GitHub (HTTP 404)."""
+
+
+class GraphQLError(Exception):
+    """Erro retornado pela API GraphQL do GitHub (campo `errors`)."""
+
+
+_LINK_NEXT = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# Espera (segundos) em um limite secundário com `Retry-After` ilegível; o GitHub recomenda ao menos 1 minuto
+_ESPERA_PADRAO_LIMITE_SECUNDARIO = 60.0
+
+
+def _segundos_retry_after(valor: str) -> float:
+    """`Retry-After` em segundos: aceita um número de segundos ou uma data HTTP (RFC 9110)."""
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+        if data.tzinfo is None:  # "-0000": data em UTC sem fuso informado
+            data = data.replace(tzinfo=timezone.utc)
+        return max(0.0, data.timestamp() - time.time())
+    except (TypeError, ValueError):
+        logging.warning(f"Retry-After inválido ({valor!r}); aguardando {_ESPERA_PADRAO_LIMITE_SECUNDARIO:.0f}s.")
+        return _ESPERA_PADRAO_LIMITE_SECUNDARIO
+
+
+class GitHubClient:
+    """
+    Cliente assíncrono da API do GitHub (REST + GraphQL) sobre um único
+    `httpx.AsyncClient`, com pool de conexões compartilhado entre as requisições.
+    Toda chamada passa pelo RateLimitScheduler, que escolhe o token e controla a cota.
+    """
+
+    def __init__(self, tokens: List[str], transport: Optional[httpx.AsyncBaseTransport] = None):
+        """`transport` substitui a rede (ex.: `httpx.ASGITransport` do tools/stub_server.py nos testes)."""
+        self.scheduler = RateLimitScheduler(tokens)
+        self._http = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            transport=transport,
+            headers={
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=GITHUB_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GITHUB_MAX_CONEXOES,
+                max_keepalive_connections=GITHUB_MAX_CONEXOES,
+            ),
+        )
+
+    async def _enviar(self, method: str, url: str, headers: Optional[dict] = None, **kwargs) -> httpx.Response:
+        """Envia a chamada com o token escolhido pelo scheduler, repetindo em limites secundários."""
+        recurso = recurso_da_requisicao(url)
+        for tentativa in range(1, GITHUB_TENTATIVAS + 1):
+            token = await self.scheduler.adquirir(recurso)
+            response = None
+            try:
+                response = await self._http.request(
+                    method, url, headers={**(headers or {}), "Authorization": f"Bearer {token}"}, **kwargs
+                )
+            finally:
+                self.scheduler.liberar(token, recurso, response)
+            telemetria.registrar_chamada_github(recurso, response.status_code)
+
+            if response.status_code not in (403, 429):
+                return response
+
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                # Limite secundário: tira o token de uso pelo tempo pedido e tenta de novo
+                espera = _segundos_retry_after(retry_after)
+                logging.warning(f"⏳ Limite secundário do GitHub em {url}; aguardando {espera:.0f}s (tentativa {tentativa}).")
+                self.scheduler.bloquear(token, espera)
+            elif response.headers.get("X-RateLimit-Remaining") != "0":
+                return response
+            # Cota primária esgotada: o scheduler já sabe e escolhe outro token ou espera o reset
+
+        raise RateLimitExcedido(f"Limite de requisições do GitHub atingido em {url}.")
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        response = await self._enviar(method, url, **kwargs)
+        if response.status_code == 404:
+            raise GitHubNaoEncontrado(f"{method} {url}")
+        response.raise_for_status()
+        return response
+
+    async def get_json(self, url: str, params: Optional[dict] = None):
+        response = await self.request("GET", url, params=params)
+        return response.json()
+
+    async def get_condicional(self, url: str, etag: Optional[str] = None, params: Optional[dict] = None) -> Tuple[bool, Optional[str]]:
+        """
+        GET com `If-None-Match`. Retorna (mudou, etag_atual).
+        Respostas 304 não consomem a cota de requisições do GitHub.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await self._enviar("GET", url, params=params, headers=headers)
+        if response.status_code == 304:
+            return False, etag
+        if response.status_code == 404:
+            raise GitHubNaoEncontrado(f"GET {url}")
+        response.raise_for_status()
+        return True, response.headers.get("ETag")
+
+    async def get_raw(self, url: str) -> str:
+        """Baixa o conteúdo bruto (ex.: README) sem o envelope base64."""
+        response = await self.request("GET", url, headers={"Accept": "application/vnd.github.raw"})
+        return response.text
+
+    async def paginar(self, url: str, params: Optional[dict] = None) -> AsyncIterator[dict]:
+        """
+        Itera pelos itens de um endpoint paginado seguindo o cabeçalho `Link`.
+        Aceita listas e respostas de busca (`{"items": [...]}`).
+        """
+        while url:
+            response = await self.request("GET", url, params=params)
+            dados = response.json()
+            for item in (dados["items"] if isinstance(dados, dict) else dados):
+                yield item
+
+            match = _LINK_NEXT.search(response.headers.get("Link", ""))
+            url = match.group(1) if match else None
+            params = None  # a URL do `next` já carrega os parâmetros
+
+    async def graphql(self, query: str, variables: dict) -> dict:
+        """Executa uma consulta GraphQL e devolve o campo `data`."""
+        response = await self.request("POST", GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables})
+        payload = response.json()
+
+        if payload.get("errors"):
+            # Usuário inexistente vem como erro NOT_FOUND com `user: null`
+            if any(err.get("type") == "NOT_FOUND" for err in payload["errors"]):
+                return payload.get("data") or {}
+            mensagens = "; ".join(err.get("message", "erro desconhecido") for err in payload["errors"])
+            raise GraphQLError(mensagens)
+
+        return payload.get("data") or {}
+
+    async def fechar(self):
+        await self._http.aclose()
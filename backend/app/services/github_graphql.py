@@ -0,0 +1,141 @@
+import logging
+from typing import Optional
+from fastapi import HTTPException
+from app.services.github_client import GitHubClient, GitHubNaoEncontrado
+
+# Uma única consulta traz o perfil, o README do perfil e uma página de repositórios
+# (com linguagens, estrelas, descrição, tamanho, tópicos, data do último push e a lista
+# de arquivos da raiz para detectar o README).
+# O README do perfil vem pelo nome mais comum (README.md); outras variantes (readme.md,
+# README.rst, docs/README...) são buscadas pela REST, que resolve o nome como no caminho REST.
+PERFIL_QUERY = """
+query($login: String!, $pageSize: Int!, $after: String) {
+  user(login: $login) {
+    login
+    name
+    bio
+    url
+    followers { totalCount }
+    following { totalCount }
+    publicRepos: repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }
+    profileRepo: repository(name: $login) {
+      readme: object(expression: "HEAD:README.md") {
+        ... on Blob { text }
+      }
+    }
+    repositories(
+      first: $pageSize
+      after: $after
+      isFork: false
+      ownerAffiliations: OWNER
+      privacy: PUBLIC
+      orderBy: {field: PUSHED_AT, direction: DESC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        stargazerCount
+        diskUsage
+        pushedAt
+        repositoryTopics(first: 10) {
+          nodes { topic { name } }
+        }
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+        root: object(expression: "HEAD:") {
+          ... on Tree { entries { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _tem_readme(node: dict) -> bool:
+    root = node.get("root") or {}
+    return any(entry["name"].lower().startswith("readme") for entry in root.get("entries") or [])
+
+
+async def _readme_rest(client: GitHubClient, username: str) -> Optional[str]:
+    """README do repositório do perfil com qualquer nome aceito pelo GitHub."""
+    try:
+        return await client.get_raw(f"/repos/{username}/{username}/readme")
+    except GitHubNaoEncontrado:
+        return None
+    except Exception as e:
+        logging.warning(f"Erro ao tentar buscar README do perfil de {username}: {e}")
+        return None
+
+
+async def coletar_perfil_graphql(client: GitHubClient, username: str, max_repos: int) -> dict:
+    """
+    Coleta o perfil e até `max_repos` repositórios (sem forks e sem o repo do perfil)
+    em uma ou duas consultas paginadas.
+    Retorna {"perfil": {...}, "repos": [{"nome", "descricao", "stars", "linguagens", "tem_readme",
+    "tamanho", "topicos", "pushed_at", "bytes_linguagens"}]}.
+    """
+    perfil = None
+    repos = []
+    cursor = None
+
+    while True:
+        data = await client.graphql(PERFIL_QUERY, {
+            "login": username,
+            # +1 para compensar o repositório do perfil, que é ignorado
+            "pageSize": min(max_repos - len(repos) + 1, 100),
+            "after": cursor,
+        })
+
+        user = data.get("user")
+        if not user:
+            raise HTTPException(status_code=404, detail=f"Usuário GitHub '{username}' não encontrado.")
+
+        if perfil is None:
+            perfil_repo = user.get("profileRepo")
+            readme_text = ((perfil_repo or {}).get("readme") or {}).get("text")
+            if perfil_repo and not readme_text:
+                readme_text = await _readme_rest(client, username)
+            if readme_text:
+                logging.info(f"✅ README do perfil de {username} encontrado.")
+            else:
+                logging.warning(f"README de perfil de {username} não encontrado.")
+                readme_text = "Nenhum README de perfil público encontrado."
+
+            perfil = {
+                "nome": user.get("name") or username,
+                "login": user["login"],
+                "html_url": user["url"],
+                "bio": user.get("bio") or "Sem biografia.",
+                "seguidores": user["followers"]["totalCount"],
+                "seguindo": user["following"]["totalCount"],
+                "public_repos": user["publicRepos"]["totalCount"],
+                "readme_text": readme_text,
+            }
+
+        pagina = user["repositories"]
+        for node in pagina["nodes"]:
+            if len(repos) >= max_repos:
+                break
+            if node["name"] == username:
+                continue
+            bytes_linguagens = {lang["node"]["name"]: lang["size"] for lang in node["languages"]["edges"]}
+            repos.append({
+                "nome": node["name"],
+                "descricao": node.get("description"),
+                "stars": node["stargazerCount"],
+                "linguagens": list(bytes_linguagens),
+                "tem_readme": _tem_readme(node),
+                "tamanho": node.get("diskUsage") or 0,
+                "topicos": [t["topic"]["name"] for t in (node.get("repositoryTopics") or {}).get("nodes", [])],
+                "pushed_at": node.get("pushedAt"),
+                "bytes_linguagens": bytes_linguagens,
+            })
+
+        if len(repos) >= max_repos or not pagina["pageInfo"]["hasNextPage"]:
+            break
+        cursor = pagina["pageInfo"]["endCursor"]
+
+    return {"perfil": perfil, "repos": repos}
@@ -1,105 +1,294 @@
-import os
+import json
+import math
+import time
+import asyncio
+import heapq
 import logging
-import random
-from github import Github, UnknownObjectException
+from datetime import datetime, timezone
 from fastapi import HTTPException
-from typing import Optional, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from typing import Callable, Optional, List, Tuple
 from app.services.gpt_service import selecionar_repositorios_com_ia
+from app.services.github_client import GitHubNaoEncontrado
+from app.services.rate_limit import RateLimitExcedido
+from app.services.github_graphql import coletar_perfil_graphql
+from app.services import clientes, indice_perfis, perfis_colunar, profile_cache, telemetria
+from app.services.repo_scorer import ranquear_repositorios, selecionar_repositorios_local
+from app.services.singleflight import criar_singleflight
+from core.config import (
+    ATIVIDADE_CACHE_TTL,
+    ATIVIDADE_RECENTE_DIAS,
+    GITHUB_CONCORRENCIA_GLOBAL,
+    GITHUB_CONCORRENCIA_POR_PERFIL,
+    GITHUB_USE_GRAPHQL,
+    MAX_REPOS_TO_SCAN,
+    PERFIL_CACHE_HABILITADO,
+    PERFIL_INCREMENTAL_HABILITADO,
+    SELECAO_REPOS_MODO,
+    SELECAO_REPOS_PREFILTRO,
+    SELECAO_REPOS_REGISTRO,
+)
+
+# Coalesce buscas simultâneas do mesmo login
+voos_github = criar_singleflight("github")
+
+# Teto de sub-requisições de detalhes de repositórios em andamento, somando todos os perfis
+_limite_global_detalhes = asyncio.Semaphore(GITHUB_CONCORRENCIA_GLOBAL)
+
+
+async def _detalhes_repo(full_name: str, limite_perfil: asyncio.Semaphore) -> Tuple[dict, bool]:
+    """
+    Linguagens (bytes por linguagem) e presença de README de um repositório, buscadas em paralelo.
+    O README é checado com HEAD, sem baixar o conteúdo.
+    """
+    async def limitado(chamada):
+        # Sempre na mesma ordem (perfil, global) para não haver espera circular
+        async with limite_perfil, _limite_global_detalhes:
+            return await chamada()
 
-# Carrega o .env
-load_dotenv()
+    async def linguagens() -> dict:
+        return await clientes.github().get_json(f"/repos/{full_name}/languages")
+
+    async def tem_readme() -> bool:
+        try:
+            await clientes.github().request("HEAD", f"/repos/{full_name}/readme")
+            return True
+        except GitHubNaoEncontrado:
+            return False
 
-# Pega o token do GitHub
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-if not GITHUB_TOKEN:
-    logging.error("❌ GITHUB_TOKEN não encontrado. Verifique seu arquivo .env")
-    raise ValueError("GITHUB_TOKEN não definido no ambiente")
+    bytes_linguagens, readme = await asyncio.gather(limitado(linguagens), limitado(tem_readme))
+    return bytes_linguagens, readme
 
-# Inicializa o cliente do GitHub
-g = Github(GITHUB_TOKEN)
 
-def buscar_dados_github(username: str):
+async def _coletar_perfil_rest(username: str) -> dict:
     """
-    Busca dados, usa IA para selecionar os 5 repositórios mais complexos e retorna os dados prontos para a análise final.
+    Caminho REST: uma chamada de linguagens e uma de README por repositório, feitas em
+    paralelo (até GITHUB_CONCORRENCIA_POR_PERFIL por perfil e GITHUB_CONCORRENCIA_GLOBAL no total).
+    Com a coleta incremental, repositórios cujo `pushed_at` não mudou desde a
+    última coleta reaproveitam esses detalhes do snapshot.
+    Retorna o mesmo formato de `coletar_perfil_graphql`.
     """
-    try:
-        user = g.get_user(username)
-
-        # --- Coletar dados básicos do perfil ---
-        nome = user.name or username
-        bio = user.bio or "Sem biografia."
-        seguidores = user.followers
-        seguindo = user.following
-        public_repos = user.public_repos
+    with telemetria.etapa("github_usuario"):
+        user = await clientes.github().get_json(f"/users/{username}")
 
-        readme_text = ""
+    readme_text = ""
+    with telemetria.etapa("github_readme"):
         try:
-            readme_repo = user.get_repo(username)
-            readme_content = readme_repo.get_readme().decoded_content.decode('utf-8')
-            readme_text = readme_content
+            readme_text = await clientes.github().get_raw(f"/repos/{username}/{username}/readme")
             logging.info(f"✅ README do perfil de {username} encontrado.")
-        except UnknownObjectException:
+        except GitHubNaoEncontrado:
             logging.warning(f"README de perfil de {username} não encontrado.")
             readme_text = "Nenhum README de perfil público encontrado."
         except Exception as e:
             logging.warning(f"Erro ao tentar buscar README do perfil de {username}: {e}")
             readme_text = "Erro ao processar README do perfil."
 
-        # --- Mapear todos os repositórios (máx 30) ---
-        # Usado 'pushed' para pegar os mais recentes, que são geralmente relevantes
-        repos = user.get_repos(sort="pushed", direction="desc")
-        
-        linguagens = {}
-        repos_map = {} # Mapeia nome -> detalhes completos
-        repos_para_selecao = [] # Lista simples para a IA "Olheiro"
-        
-        repo_count = 0
-        MAX_REPOS_TO_SCAN = 30
+    perfil = {
+        "nome": user.get("name") or username,
+        "login": user["login"],
+        "html_url": user["html_url"],
+        "bio": user.get("bio") or "Sem biografia.",
+        "seguidores": user["followers"],
+        "seguindo": user["following"],
+        "public_repos": user["public_repos"],
+        "readme_text": readme_text,
+    }
+
+    # --- Mapear todos os repositórios (máx MAX_REPOS_TO_SCAN) ---
+    # Usado 'pushed' para pegar os mais recentes, que são geralmente relevantes
+    anteriores = await profile_cache.obter_repos(user["login"]) if PERFIL_INCREMENTAL_HABILITADO else {}
+    limite_perfil = asyncio.Semaphore(GITHUB_CONCORRENCIA_POR_PERFIL)
+
+    async def processar(repo: dict) -> Optional[Tuple[dict, dict]]:
+        try:
+            # Cada repo é comparado ao snapshot pelo próprio `pushed_at`: só os novos ou com
+            # push desde a última coleta têm linguagens e README consultados de novo
+            anterior = anteriores.get(repo["name"])
+            if anterior and anterior["pushed_at"] == repo["pushed_at"]:
+                linguagens_repo = anterior["linguagens"]
+                bytes_linguagens = anterior.get("bytes_linguagens", {})
+                tem_readme = anterior["tem_readme"]
+                profile_cache.contadores["repos_reaproveitados"] += 1
+            else:
+                bytes_linguagens, tem_readme = await _detalhes_repo(repo["full_name"], limite_perfil)
+                linguagens_repo = list(bytes_linguagens.keys())
+                profile_cache.contadores["repos_buscados"] += 1
+
+            return {
+                "nome": repo["name"],
+                "descricao": repo["description"],
+                "stars": repo["stargazers_count"],
+                "linguagens": linguagens_repo,
+                "tem_readme": tem_readme,
+                "tamanho": repo.get("size", 0),
+                "topicos": repo.get("topics", []),
+                "pushed_at": repo["pushed_at"],
+                "bytes_linguagens": bytes_linguagens,
+            }, {
+                "pushed_at": repo["pushed_at"],
+                "stars": repo["stargazers_count"],
+                "linguagens": linguagens_repo,
+                "bytes_linguagens": bytes_linguagens,
+                "tem_readme": tem_readme,
+            }
+        except Exception as e:
+            logging.warning(f"Erro ao processar repo {repo['name']}: {e}")
+            return None
 
-        for repo in repos:
-            if repo_count >= MAX_REPOS_TO_SCAN:
+    selecionados = []
+    params = {"sort": "pushed", "direction": "desc", "per_page": 100}
+    with telemetria.etapa("github_repos"):
+        async for repo in clientes.github().paginar(f"/users/{username}/repos", params):
+            if len(selecionados) >= MAX_REPOS_TO_SCAN:
                 break
-            
+
             # Ignorar forks e o repo do perfil
-            if repo.fork or repo.name == username:
+            if repo["fork"] or repo["name"] == username:
                 continue
-            
-            try:
-                langs = repo.get_languages()
-                for lang in langs:
-                    linguagens[lang] = linguagens.get(lang, 0) + 1
-
-                desc = repo.description or "Sem descrição"
-                stars = repo.stargazers_count
-                lang_str = ", ".join(langs.keys()) or "sem linguagem"
-
-                readme_info = ""
-                try:
-                    repo.get_readme()
-                    readme_info = "✅ README"
-                except UnknownObjectException:
-                    readme_info = "❌ Sem README"
-                
-                # Detalhes completos para a "Análise Final"
-                detalhes_completos = f"{repo.name} ({lang_str}) - {readme_info} - ⭐ {stars} - {desc}"
-                
-                # Detalhes simples para a IA "Olheiro"
-                detalhes_simples = f"{repo.name} - {desc} ({lang_str})"
-                
-                repos_map[repo.name] = detalhes_completos
-                repos_para_selecao.append(detalhes_simples)
-                repo_count += 1
-
-            except Exception as e:
-                logging.warning(f"Erro ao processar repo {repo.name}: {e}")
-
-        # --- Usar IA "Olheiro" para selecionar os 5 melhores ---
-        logging.info(f"Enviando {len(repos_para_selecao)} repositórios para a IA 'Olheiro' selecionar os 5 melhores...")
-        nomes_selecionados = selecionar_repositorios_com_ia(repos_para_selecao)
-        logging.info(f"IA 'Olheiro' selecionou: {nomes_selecionados}")
+            selecionados.append(repo)
+
+        # Os detalhes saem em paralelo; `gather` mantém a ordem da listagem (por push)
+        resultados = await asyncio.gather(*(processar(repo) for repo in selecionados))
+
+    repos = []
+    snapshot = {}
+    for repo, resultado in zip(selecionados, resultados):
+        if resultado is not None:
+            repos.append(resultado[0])
+            snapshot[repo["name"]] = resultado[1]
+
+    if PERFIL_INCREMENTAL_HABILITADO:
+        await profile_cache.salvar_repos(user["login"], snapshot)
+
+    return {"perfil": perfil, "repos": repos}
+
+
+async def _coletar_perfil(username: str) -> dict:
+    """Usa o coletor GraphQL quando habilitado, com o caminho REST como fallback."""
+    if GITHUB_USE_GRAPHQL:
+        try:
+            with telemetria.etapa("github_graphql"):
+                return await coletar_perfil_graphql(clientes.github(), username, MAX_REPOS_TO_SCAN)
+        except (HTTPException, RateLimitExcedido):
+            raise
+        except Exception as e:
+            logging.warning(f"Falha na coleta GraphQL de {username}, usando REST: {e}")
+    return await _coletar_perfil_rest(username)
+
+
+def _registrar_selecao(login: str, modo: str, repos: List[dict], selecionados: List[str], latencia: float):
+    """Acrescenta a seleção da IA ao arquivo de registro (para tools/avaliar_selecao_repos.py)."""
+    linha = json.dumps({
+        "login": login,
+        "modo": modo,
+        "repos": repos,
+        "selecionados": selecionados,
+        "latencia": round(latencia, 3),
+    }, ensure_ascii=False)
+    with open(SELECAO_REPOS_REGISTRO, "a", encoding="utf-8") as arquivo:
+        arquivo.write(linha + "\n")
+
+
+async def _selecionar_repositorios(login: str, repos: List[dict], repos_para_selecao: List[str], modo: str) -> List[str]:
+    """
+    Escolhe os repositórios destacados na análise final:
+    - "ia": a IA "Olheiro" escolhe entre todos os repositórios mapeados;
+    - "local": pontuação determinística de `repo_scorer`, sem chamada à IA;
+    - "hibrido": a pontuação local pré-filtra os `SELECAO_REPOS_PREFILTRO` melhores e a IA escolhe entre eles.
+    """
+    if modo == "local":
+        return selecionar_repositorios_local(repos)
+
+    candidatos = list(zip(repos, repos_para_selecao))
+    if modo == "hibrido":
+        melhores = {repo["nome"] for repo, _ in ranquear_repositorios(repos)[:SELECAO_REPOS_PREFILTRO]}
+        candidatos = [(repo, texto) for repo, texto in candidatos if repo["nome"] in melhores]
+
+    logging.info(f"Enviando {len(candidatos)} repositórios para a IA 'Olheiro' selecionar os 5 melhores...")
+    inicio = time.perf_counter()
+    nomes_selecionados = await selecionar_repositorios_com_ia([texto for _, texto in candidatos])
+    logging.info(f"IA 'Olheiro' selecionou: {nomes_selecionados}")
+
+    if SELECAO_REPOS_REGISTRO:
+        try:
+            await asyncio.to_thread(
+                _registrar_selecao, login, modo, [repo for repo, _ in candidatos],
+                nomes_selecionados, time.perf_counter() - inicio,
+            )
+        except Exception as e:
+            logging.warning(f"Não foi possível registrar a seleção de {login}: {e}")
+    return nomes_selecionados
+
+
+async def buscar_dados_github(
+    username: str,
+    progresso: Optional[Callable[[str], None]] = None,
+    selecao: Optional[str] = None,
+):
+    """
+    Busca dados, seleciona os 5 repositórios mais complexos e retorna os dados prontos para a análise final.
+    `selecao` escolhe como ("ia", "local" ou "hibrido"); o padrão vem de SELECAO_REPOS_MODO.
+    Passa pelo cache de perfis (TTL + revalidação por ETag) quando habilitado.
+    `progresso`, se informado, recebe mensagens curtas a cada etapa (usado no streaming).
+    Buscas simultâneas do mesmo login são coalescidas em uma só.
+    Todo perfil devolvido entra no índice vetorial local (indice_perfis).
+    """
+    modo = selecao or SELECAO_REPOS_MODO
+
+    async def buscar():
+        if not PERFIL_CACHE_HABILITADO:
+            return await _buscar_dados_github_sem_cache(username, progresso, modo)
+        return await profile_cache.obter_perfil(
+            clientes.github(), username, lambda: _buscar_dados_github_sem_cache(username, progresso, modo), progresso,
+            # Snapshots do modo "ia" mantêm a chave original do cache
+            variante="" if modo == "ia" else modo,
+        )
+
+    dados = await voos_github.executar((username.lower(), modo), buscar)
+    await indice_perfis.indexar(dados, "perfil")
+    return dados
+
+
+async def _buscar_dados_github_sem_cache(
+    username: str,
+    progresso: Optional[Callable[[str], None]] = None,
+    selecao: str = "ia",
+):
+    try:
+        if progresso:
+            progresso(f"Coletando perfil e repositórios de @{username}...")
+        coleta = await _coletar_perfil(username)
+        perfil = coleta["perfil"]
+        await perfis_colunar.registrar(perfil, coleta["repos"], "perfil")
+        # A coleta lista os repositórios por push: o maior pushed_at é o último push do perfil
+        await profile_cache.registrar_atividade(perfil["login"], (r["pushed_at"] for r in coleta["repos"]), completo=True)
+
+        linguagens = {}
+        repos_map = {} # Mapeia nome -> detalhes completos
+        repos_para_selecao = [] # Lista simples para a IA "Olheiro"
+
+        for repo in coleta["repos"]:
+            for lang in repo["linguagens"]:
+                linguagens[lang] = linguagens.get(lang, 0) + 1
+
+            desc = repo["descricao"] or "Sem descrição"
+            stars = repo["stars"]
+            lang_str = ", ".join(repo["linguagens"]) or "sem linguagem"
+            readme_info = "✅ README" if repo["tem_readme"] else "❌ Sem README"
+
+            # Detalhes completos para a "Análise Final"
+            detalhes_completos = f"{repo['nome']} ({lang_str}) - {readme_info} - ⭐ {stars} - {desc}"
+
+            # Detalhes simples para a IA "Olheiro"
+            detalhes_simples = f"{repo['nome']} - {desc} ({lang_str})"
+
+            repos_map[repo["nome"]] = detalhes_completos
+            repos_para_selecao.append(detalhes_simples)
+
+        # --- Selecionar os 5 melhores (IA "Olheiro", pontuação local ou ambos) ---
+        if progresso:
+            progresso(f"{len(repos_para_selecao)} repositórios mapeados. Selecionando os mais relevantes...")
+        with telemetria.etapa("selecao_repos"):
+            nomes_selecionados = await _selecionar_repositorios(perfil["login"], coleta["repos"], repos_para_selecao, selecao)
 
         repos_detalhes_finais = []
         for nome in nomes_selecionados:
@@ -108,83 +297,322 @@ def buscar_dados_github(username: str):
 
         # Se a seleção da IA falhar ou retornar nomes errados
         if not repos_detalhes_finais:
-            # Pegue os 5 primeiros do mapa (que já estão ordenados por 'pushed')
-            repos_detalhes_finais = list(repos_map.values())[:5]
+            # Usa os 5 melhores da pontuação local
+            repos_detalhes_finais = [repos_map[nome] for nome in selecionar_repositorios_local(coleta["repos"])]
 
         # --- Retornar o pacote de dados completo ---
         return {
-            "nome": nome,
-            "login": user.login,
-            "html_url": user.html_url,
-            "bio": bio,
-            "seguidores": seguidores,
-            "seguindo": seguindo,
-            "public_repos": public_repos,
+            "nome": perfil["nome"],
+            "login": perfil["login"],
+            "html_url": perfil["html_url"],
+            "bio": perfil["bio"],
+            "seguidores": perfil["seguidores"],
+            "seguindo": perfil["seguindo"],
+            "public_repos": perfil["public_repos"],
             "linguagens": linguagens,
             "repos_detalhes": repos_detalhes_finais,
-            "readme_text": readme_text,
+            "readme_text": perfil["readme_text"],
         }
 
-    except UnknownObjectException:
+    except HTTPException:
+        raise
+    except GitHubNaoEncontrado:
         logging.error(f"Usuário GitHub '{username}' não encontrado.")
+        telemetria.registrar_erro("github_nao_encontrado")
         raise HTTPException(status_code=404, detail=f"Usuário GitHub '{username}' não encontrado.")
+    except RateLimitExcedido as e:
+        logging.error(f"Cota do GitHub esgotada ao buscar {username}: {e}")
+        telemetria.registrar_erro("github_rate_limit")
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logging.error(f"Erro ao buscar dados do GitHub: {e}")
+        telemetria.registrar_erro("github")
         raise HTTPException(status_code=400, detail=f"Erro ao acessar GitHub: {str(e)}")
 
-def processar_usuario_com_filtros(user, min_stars: int, linguagens_filtro: Optional[List[str]] = None):
-    """Processa dados do usuário com filtros, limitando repositórios e somando stars."""
+def _passa_filtros_baratos(
+    user: dict,
+    min_repos: int = 0,
+    min_followers: int = 0,
+    localizacao: Optional[str] = None,
+) -> bool:
+    """Filtros que só dependem do perfil (uma chamada), avaliados antes de varrer repositórios."""
+    if user.get("type", "User") != "User":
+        return False
+    if user.get("followers", 0) < min_followers or user.get("public_repos", 0) < min_repos:
+        return False
+    if localizacao and localizacao.lower() not in (user.get("location") or "").lower():
+        return False
+    return True
+
+
+async def _ativo_recentemente(login: str, consultar: bool = True) -> Optional[bool]:
+    """
+    Se `login` teve push nos últimos ATIVIDADE_RECENTE_DIAS, pelo último push em cache (tirado
+    dos repositórios já carregados em coletas e buscas anteriores). Só quando o cache não
+    decide, e `consultar` é True, faz uma chamada: o repositório com push mais recente.
+    Com `consultar=False` devolve None nesse caso.
+    """
+    limite = time.time() - ATIVIDADE_RECENTE_DIAS * 86400
+    atividade = await profile_cache.obter_atividade(login)
+    if atividade:
+        if atividade["ultimo_push"] >= limite:
+            telemetria.registrar_cache("atividade", "hit")
+            return True
+        if atividade["completo"] and time.time() - atividade["verificado_em"] < ATIVIDADE_CACHE_TTL:
+            telemetria.registrar_cache("atividade", "hit")
+            return False
+    if not consultar:
+        return None
+
+    telemetria.registrar_cache("atividade", "miss")
+    params = {"sort": "pushed", "direction": "desc", "per_page": 1}
+    repos = await clientes.github().get_json(f"/users/{login}/repos", params)
+    atividade = await profile_cache.registrar_atividade(login, (r.get("pushed_at") for r in repos), completo=True)
+    return atividade["ultimo_push"] >= limite
+
+
+def _pontuacao(aderencia: float, stars: int, seguidores: int, public_repos: int) -> float:
+    return (
+        3 * aderencia
+        + math.log1p(stars)
+        + 0.5 * math.log1p(seguidores)
+        + 0.25 * math.log1p(public_repos)
+    )
+
+
+def pontuar_candidato(dados: dict, total_stars: int, linguagens_filtro: Optional[List[str]] = None) -> float:
+    """
+    Pontuação determinística usada para ordenar os perfis que passaram nos filtros.
+    `total_stars` é a soma numérica das estrelas; fica fora de `dados`, que vai para a análise.
+    """
+    aderencia = 0.0
+    if linguagens_filtro and dados["linguagens"]:
+        usadas = {lang.lower(): qtd for lang, qtd in dados["linguagens"].items()}
+        total = sum(usadas.values())
+        aderencia = sum(usadas.get(lang.lower(), 0) for lang in linguagens_filtro) / total
+
+    return _pontuacao(aderencia, total_stars, dados["seguidores"], dados["public_repos"])
+
+
+async def processar_usuario_com_filtros(
+    user: dict,
+    min_stars: int,
+    linguagens_filtro: Optional[List[str]] = None,
+    corte: Optional[Callable[[], float]] = None,
+) -> Optional[Tuple[dict, int]]:
+    """
+    Processa dados do usuário com filtros, limitando repositórios e somando stars.
+    Retorna (dados para a análise, total de estrelas) ou None se o perfil for reprovado.
+    `corte` devolve a menor pontuação que ainda entra no resultado; se nem com aderência
+    total às linguagens o perfil chegaria a ela, é descartado sem buscar as linguagens.
+    """
     try:
         total_stars = 0
+        selecionados = []
+
+        # A listagem já traz as estrelas: decide quais repositórios entram (máx 10, ou
+        # até atingir min_stars) e descarta o usuário antes de qualquer chamada por repositório.
+        params = {"sort": "stargazers", "direction": "desc", "per_page": 10}
+        repos = await clientes.github().get_json(f"/users/{user['login']}/repos", params)
+        await profile_cache.registrar_atividade(user["login"], (r.get("pushed_at") for r in repos), completo=False)
+        for repo in repos[:10]:
+            selecionados.append(repo)
+            total_stars += repo["stargazers_count"]
+            if min_stars > 0 and total_stars >= min_stars:
+                break
+
+        if min_stars > 0 and total_stars < min_stars:
+            return None
+
+        if corte:
+            teto = _pontuacao(1.0 if linguagens_filtro else 0.0, total_stars, user["followers"], user["public_repos"])
+            if teto < corte():
+                return None
+
+        todas_langs = await asyncio.gather(*(
+            clientes.github().get_json(f"/repos/{repo['full_name']}/languages") for repo in selecionados
+        ))
+
+        # Mesmo reprovado no filtro de linguagem, o perfil entra nas estatísticas colunares
+        await perfis_colunar.registrar(
+            {"login": user["login"], "seguidores": user["followers"], "public_repos": user["public_repos"]},
+            [
+                {"stars": repo["stargazers_count"], "pushed_at": repo.get("pushed_at"), "bytes_linguagens": langs}
+                for repo, langs in zip(selecionados, todas_langs)
+            ],
+            "filtro",
+        )
+
         linguagens_usuario = {}
         repos_detalhes = []
-
-        repos = user.get_repos(sort="stargazers", direction="desc")
-        count = 0
         tem_linguagem_requerida = not linguagens_filtro
 
-        for repo in repos:
-            langs = repo.get_languages()
-
+        for repo, langs in zip(selecionados, todas_langs):
             if linguagens_filtro:
                 if any(lang.lower() in (l.lower() for l in langs.keys()) for lang in linguagens_filtro):
                     tem_linguagem_requerida = True
 
-            total_stars += repo.stargazers_count
-
             for lang in langs:
                 linguagens_usuario[lang] = linguagens_usuario.get(lang, 0) + 1
 
-            desc = repo.description or "Sem descrição"
+            desc = repo["description"] or "Sem descrição"
             lang_str = ", ".join(langs.keys()) or "sem linguagem"
-            detalhes = f"{repo.name} - {desc} ({lang_str}) - ⭐ {repo.stargazers_count}"
+            detalhes = f"{repo['name']} - {desc} ({lang_str}) - ⭐ {repo['stargazers_count']}"
             repos_detalhes.append(detalhes)
 
-            count += 1
-            if count >= 10 or (min_stars > 0 and total_stars >= min_stars):
-                break
-
-        if not tem_linguagem_requerida or (min_stars > 0 and total_stars < min_stars):
+        if not tem_linguagem_requerida:
             return None
 
-        return {
-            "nome": user.name or user.login,
-            "login": user.login, 
-            "html_url": user.html_url,
-            "bio": user.bio or "Sem biografia.",
-            "seguidores": user.followers,
-            "seguindo": user.following,
-            "public_repos": user.public_repos,
+        resultado = {
+            "nome": user.get("name") or user["login"],
+            "login": user["login"],
+            "html_url": user["html_url"],
+            "bio": user.get("bio") or "Sem biografia.",
+            "seguidores": user["followers"],
+            "seguindo": user["following"],
+            "public_repos": user["public_repos"],
             "linguagens": linguagens_usuario,
             "repos_detalhes": repos_detalhes,
-            "readme_text": f"README do perfil de {user.login} não buscado (análise de filtro)."
+            "readme_text": f"README do perfil de {user['login']} não buscado (análise de filtro)."
         }
+        await indice_perfis.indexar(resultado, "filtro")
+        return resultado, total_stars
 
     except Exception as e:
-        logging.warning(f"Erro ao buscar repositórios de {user.login}: {e}")
+        logging.warning(f"Erro ao buscar repositórios de {user['login']}: {e}")
         return None
 
-def buscar_dados_github_com_filtros(
+
+_BUSCA_USUARIOS = "/search/users"
+_BUSCA_REPOSITORIOS = "/search/repositories"
+
+
+def _query_busca(
+    linguagens: Optional[List[str]],
+    min_repos: int,
+    min_followers: int,
+    atividade_recente: bool,
+    localizacao: Optional[str],
+    keywords: Optional[str],
+) -> Tuple[str, str]:
+    """
+    Endpoint de busca e query para os filtros. A busca de usuários não aceita `pushed:`; com
+    `atividade_recente` a busca é de repositórios com `pushed:>=` (data de ATIVIDADE_RECENTE_DIAS
+    atrás) e os candidatos são os donos. Essa busca não filtra por repositórios, seguidores e
+    localização, que ficam para os filtros baratos do perfil.
+    """
+    linguagens_query = " ".join(f"language:{ling}" for ling in linguagens or [])
+    if atividade_recente:
+        desde = datetime.fromtimestamp(time.time() - ATIVIDADE_RECENTE_DIAS * 86400, timezone.utc).date()
+        query_parts = [f"pushed:>={desde.isoformat()}", linguagens_query, keywords or ""]
+        return _BUSCA_REPOSITORIOS, " ".join(p for p in query_parts if p).strip()
+
+    query_parts = [linguagens_query]
+    if min_repos > 0:
+        query_parts.append(f"repos:>={min_repos}")
+    if min_followers > 0:
+        query_parts.append(f"followers:>={min_followers}")
+    if localizacao:
+        query_parts.append(f"location:{localizacao}")
+    if keywords:
+        query_parts.append(keywords)
+    return _BUSCA_USUARIOS, " ".join(p for p in query_parts if p).strip()
+
+
+async def buscar_candidatos_com_filtros(
+    linguagens: Optional[List[str]] = None,
+    min_repos: int = 0,
+    min_stars: int = 0,
+    min_followers: int = 0,
+    atividade_recente: bool = False,
+    localizacao: Optional[str] = None,
+    keywords: Optional[str] = None,
+    max_usuarios: int = 20,
+    top_k: int = 1,
+) -> List[dict]:
+    """
+    Busca usuários aplicando filtros e retorna os `top_k` melhores pela `pontuar_candidato`.
+
+    Com `atividade_recente`, os candidatos vêm da busca de repositórios com push recente
+    (ver `_query_busca`), e o push de cada resultado já alimenta o cache de atividade.
+    Os resultados da busca são avaliados em paralelo (máx 5 por vez), primeiro pelos
+    filtros baratos do perfil, depois pela atividade recente (cache do último push; no máximo
+    uma chamada por perfil ainda desconhecido) e só então pelos repositórios. Todos os resultados
+    são avaliados, porque a ordem da busca não segue a pontuação; o corte é pela pontuação: com
+    `top_k` aprovados, um perfil cujo teto (estrelas e seguidores já conhecidos, aderência total)
+    fica abaixo do `top_k`-ésimo melhor é descartado antes das chamadas de linguagens.
+    """
+    caminho, query = _query_busca(linguagens, min_repos, min_followers, atividade_recente, localizacao, keywords)
+    if not query:
+        raise HTTPException(status_code=400, detail="Filtros insuficientes para busca.")
+
+    logging.info(f"📡 Buscando usuários com query: {query} ({caminho})")
+
+    # Limita a 5 usuários processados ao mesmo tempo
+    semaforo = asyncio.Semaphore(5)
+
+    # Pontuações dos aprovados até aqui (heap mínimo com as `top_k` maiores)
+    melhores: List[float] = []
+
+    def corte() -> float:
+        return melhores[0] if len(melhores) >= top_k else -math.inf
+
+    async def avaliar(login: str, pushed_at: Optional[str] = None):
+        async with semaforo:
+            if pushed_at:
+                # Push visto no resultado da busca de repositórios: ativo sem nenhuma chamada
+                await profile_cache.registrar_atividade(login, [pushed_at], completo=False)
+            # Perfis sabidamente inativos saem antes de qualquer chamada
+            if atividade_recente and await _ativo_recentemente(login, consultar=False) is False:
+                return None
+            user = await clientes.github().get_json(f"/users/{login}")
+            if not _passa_filtros_baratos(user, min_repos, min_followers, localizacao):
+                return None
+            if atividade_recente and not await _ativo_recentemente(user["login"]):
+                return None
+            processado = await processar_usuario_com_filtros(user, min_stars, linguagens, corte)
+            if processado is None:
+                return None
+            dados, total_stars = processado
+            pontuacao = pontuar_candidato(dados, total_stars, linguagens)
+            heapq.heappush(melhores, pontuacao)
+            if len(melhores) > top_k:
+                heapq.heappop(melhores)
+            return dados, pontuacao
+
+    tarefas = []
+    vistos = set()
+    params = {"q": query, "per_page": 100 if caminho == _BUSCA_REPOSITORIOS else min(max_usuarios, 100)}
+    try:
+        async for item in clientes.github().paginar(caminho, params):
+            if len(tarefas) >= max_usuarios:
+                break
+            if caminho == _BUSCA_REPOSITORIOS:
+                # Candidatos são os donos (só usuários, sem repetir) dos repositórios com push recente
+                dono = item.get("owner") or {}
+                if dono.get("type") != "User" or dono.get("login", "").lower() in vistos:
+                    continue
+                vistos.add(dono["login"].lower())
+                tarefas.append(asyncio.create_task(avaliar(dono["login"], item.get("pushed_at"))))
+            else:
+                tarefas.append(asyncio.create_task(avaliar(item["login"])))
+        resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+    aprovados = []
+    for resultado in resultados:
+        if isinstance(resultado, Exception):
+            logging.warning(f"Erro ao avaliar usuário da busca: {resultado}")
+        elif resultado:
+            aprovados.append(resultado)
+
+    aprovados.sort(key=lambda item: (-item[1], item[0]["login"].lower()))
+    return [dados for dados, _ in aprovados[:top_k]]
+
+
+async def buscar_dados_github_com_filtros(
     linguagens: Optional[List[str]] = None,
     min_repos: int = 0,
     min_stars: int = 0,
@@ -194,45 +622,31 @@ def buscar_dados_github_com_filtros(
     keywords: Optional[str] = None,
     max_usuarios: int = 20
 ):
-    """Busca usuários aplicando filtros e retorna um usuário aleatório."""
+    """Busca usuários aplicando filtros e retorna o perfil melhor pontuado."""
     try:
-        query_parts = []
-
-        if linguagens:
-            query_parts.append(" ".join(f"language:{ling}" for ling in linguagens))
-        if min_repos > 0:
-            query_parts.append(f"repos:>={min_repos}")
-        if min_followers > 0:
-            query_parts.append(f"followers:>={min_followers}")
-        if localizacao:
-            query_parts.append(f"location:{localizacao}")
-        if keywords:
-            query_parts.append(keywords)
-
-        query = " ".join(query_parts).strip()
-
-        if not query:
-            raise HTTPException(status_code=400, detail="Filtros insuficientes para busca.")
-
-        logging.info(f"📡 Buscando usuários com query: {query}")
-
-        usuarios = g.search_users(query)
-        usuarios_filtrados = []
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(processar_usuario_com_filtros, g.get_user(u.login), min_stars, linguagens)
-                       for u in usuarios[:max_usuarios]]
-
-            for future in as_completed(futures):
-                resultado = future.result()
-                if resultado:
-                    usuarios_filtrados.append(resultado)
-
-        if not usuarios_filtrados:
+        candidatos = await buscar_candidatos_com_filtros(
+            linguagens=linguagens,
+            min_repos=min_repos,
+            min_stars=min_stars,
+            min_followers=min_followers,
+            atividade_recente=atividade_recente,
+            localizacao=localizacao,
+            keywords=keywords,
+            max_usuarios=max_usuarios,
+        )
+
+        if not candidatos:
             raise HTTPException(status_code=404, detail="Nenhum usuário encontrado com os filtros especificados.")
 
-        return random.choice(usuarios_filtrados)
+        return candidatos[0]
 
+    except HTTPException:
+        raise
+    except RateLimitExcedido as e:
+        logging.error(f"Cota do GitHub esgotada na busca com filtros: {e}")
+        telemetria.registrar_erro("github_rate_limit")
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logging.error(f"Erro ao buscar dados do GitHub com filtros: {e}")
+        telemetria.registrar_erro("github")
         raise HTTPException(status_code=400, detail=f"Erro ao acessar GitHub: {str(e)}")
@@ -1,10 +1,170 @@
-import os
+import re
+import asyncio
 import json
-from openai import OpenAI
-from typing import List
+import time
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
 from app.models.schemas import CandidateDataForRanking
+from app.services import clientes, llm_cache, telemetria
+from app.services.pre_ranking import pontuar_candidatos, compactar_analise
+from app.services.prompt_budget import (
+    ajustar_ao_orcamento,
+    contar_tokens,
+    cortar_tokens,
+    limpar_markdown,
+    resumir_markdown,
+)
+from app.services.singleflight import criar_singleflight
+from app.templates.analysis_template import (
+    CARD_STYLE,
+    REPO_CARD_STYLE,
+    renderizar_analise,
+    renderizar_erro,
+    renderizar_ranking,
+)
+from core.config import (
+    LLM_CACHE_HABILITADO,
+    LLM_CACHE_FUNCOES_DESATIVADAS,
+    RANKING_TOP_K,
+    RANKING_MODO,
+    RANKING_MAPA_CONCORRENCIA,
+    RANKING_RESUMO_MAX_CHARS,
+    ANALISE_MAX_TOKENS_ENTRADA,
+    ANALISE_README_MAX_TOKENS,
+    RANKING_MAX_TOKENS_ENTRADA,
+)
+
+# Coalesce análises simultâneas do mesmo (login, contexto)
+voos_analise = criar_singleflight("analise")
+
+# Teto de avaliações individuais do ranking map-reduce em andamento, somando todos os rankings
+_limite_avaliacoes = asyncio.Semaphore(RANKING_MAPA_CONCORRENCIA)
+
+
+# --- CHAMADA À IA (COM CACHE) ---
+def _cache_ativo(funcao: str, usar_cache: bool) -> bool:
+    return usar_cache and LLM_CACHE_HABILITADO and funcao not in LLM_CACHE_FUNCOES_DESATIVADAS
+
+
+async def _chat(
+    prompt: str, model: str, max_tokens: int, temperature: float, funcao: str,
+    usar_cache: bool = True, tokens_prompt: Optional[int] = None, formato_json: bool = False,
+) -> str:
+    """
+    Envia o prompt ao modelo e devolve o texto bruto da resposta.
+    Respostas bem-sucedidas ficam no cache endereçado por (model, temperature, prompt);
+    erros sobem como exceção, então os cards de erro nunca são cacheados.
+    `tokens_prompt` evita recontar prompts já medidos pelo montador com orçamento.
+    Com `formato_json` o modelo é forçado a responder um objeto JSON, e respostas
+    que não são JSON válido não vão para o cache.
+    """
+    telemetria.registrar_prompt(funcao, tokens_prompt if tokens_prompt is not None else contar_tokens(prompt, model))
+    usar_cache = _cache_ativo(funcao, usar_cache)
+    chave = llm_cache.gerar_chave(model, temperature, prompt)
+
+    if usar_cache:
+        conteudo = await llm_cache.obter(chave, funcao)
+        if conteudo is not None:
+            return conteudo
+
+    extras = {"response_format": {"type": "json_object"}} if formato_json else {}
+    inicio = time.perf_counter()
+    response = await clientes.openai().chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        **extras,
+    )
+    latencia = time.perf_counter() - inicio
+
+    conteudo = response.choices[0].message.content
+    usage = response.usage
+    if usage:
+        telemetria.registrar_tokens(funcao, usage.prompt_tokens, usage.completion_tokens)
+
+    if usar_cache and conteudo and (not formato_json or _json_valido(conteudo)):
+        await llm_cache.salvar(
+            chave,
+            conteudo,
+            tokens_entrada=usage.prompt_tokens if usage else 0,
+            tokens_saida=usage.completion_tokens if usage else 0,
+            latencia=latencia,
+        )
+
+    return conteudo
+
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+async def _chat_stream(
+    prompt: str, model: str, max_tokens: int, temperature: float, funcao: str,
+    usar_cache: bool = True, tokens_prompt: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Versão em streaming de `_chat`: repassa os tokens conforme chegam.
+    Em um acerto de cache a resposta inteira sai em um único pedaço.
+    """
+    telemetria.registrar_prompt(funcao, tokens_prompt if tokens_prompt is not None else contar_tokens(prompt, model))
+    usar_cache = _cache_ativo(funcao, usar_cache)
+    chave = llm_cache.gerar_chave(model, temperature, prompt)
+
+    if usar_cache:
+        conteudo = await llm_cache.obter(chave, funcao)
+        if conteudo is not None:
+            yield conteudo
+            return
+
+    inicio = time.perf_counter()
+    stream = await clientes.openai().chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+
+    partes = []
+    usage = None
+    async for chunk in stream:
+        if chunk.usage:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            partes.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+
+    if usage:
+        telemetria.registrar_tokens(funcao, usage.prompt_tokens, usage.completion_tokens)
+
+    if usar_cache and partes:
+        await llm_cache.salvar(
+            chave,
+            "".join(partes),
+            tokens_entrada=usage.prompt_tokens if usage else 0,
+            tokens_saida=usage.completion_tokens if usage else 0,
+            latencia=time.perf_counter() - inicio,
+        )
+# --- FIM ---
+
+# --- RESPOSTAS EM JSON ---
+def extrair_json(conteudo: str) -> dict:
+    """Objeto JSON da resposta da IA, tolerando cercas de markdown ou texto em volta."""
+    inicio = conteudo.find("{")
+    fim = conteudo.rfind("}") + 1
+    if inicio == -1 or fim <= inicio:
+        raise ValueError("A resposta da IA não contém um objeto JSON.")
+    dados = json.loads(conteudo[inicio:fim])
+    if not isinstance(dados, dict):
+        raise ValueError("A resposta da IA não é um objeto JSON.")
+    return dados
+
+
+def _json_valido(conteudo: str) -> bool:
+    try:
+        extrair_json(conteudo)
+        return True
+    except ValueError:
+        return False
+# --- FIM ---
 
 # --- FUNÇÃO "LIMPADORA" ---
 def clean_ai_response(raw_html: str) -> str:
@@ -25,10 +185,64 @@ def clean_ai_response(raw_html: str) -> str:
         raw_html = raw_html[:-3]
         
     return raw_html.strip()
+
+
+class LimpadorStreaming:
+    """
+    Versão incremental de `clean_ai_response`: remove a cerca inicial assim que
+    ela pode ser identificada e segura apenas a cauda que ainda pode ser a cerca final.
+    """
+
+    _CAUDA = re.compile(r"\s*`{0,3}\s*$")
+
+    def __init__(self):
+        self._inicio = ""
+        self._decidido = False
+        self._pular_espacos = False
+        self._cauda = ""
+
+    def alimentar(self, pedaco: str) -> str:
+        """Recebe um pedaço da resposta e devolve o trecho já limpo que pode ser emitido."""
+        if not self._decidido:
+            self._inicio += pedaco
+            texto = self._inicio.lstrip()
+            # Ainda pode ser o começo de ```html
+            if not texto or (len(texto) < 7 and "```html".startswith(texto)):
+                return ""
+
+            if texto.startswith("```html"):
+                texto = texto[7:]
+            elif texto.startswith("```"):
+                texto = texto[3:]
+            self._decidido = True
+            self._pular_espacos = True
+            self._inicio = ""
+            pedaco = texto
+
+        if self._pular_espacos:
+            pedaco = pedaco.lstrip()
+            if not pedaco:
+                return ""
+            self._pular_espacos = False
+
+        pendente = self._cauda + pedaco
+        corte = self._CAUDA.search(pendente).start()
+        self._cauda = pendente[corte:]
+        return pendente[:corte]
+
+    def finalizar(self) -> str:
+        """Devolve o que restou, sem a cerca final."""
+        if not self._decidido:
+            return clean_ai_response(self._inicio)
+
+        cauda = self._cauda.rstrip()
+        if cauda.endswith("```"):
+            cauda = cauda[:-3]
+        return cauda.rstrip()
 # --- FIM ---
 
 
-def selecionar_repositorios_com_ia(repos_lista: list) -> list:
+async def selecionar_repositorios_com_ia(repos_lista: list, usar_cache: bool = True) -> list:
     """
     Usa a IA para selecionar os 5 repositórios mais complexos e relevantes de uma lista.
     """
@@ -52,14 +266,15 @@ Exemplo de resposta:
 """
 
     try:
-        response = client.chat.completions.create(
+        content = await _chat(
+            prompt,
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
             max_tokens=300,
             temperature=0.2,
+            funcao="selecionar_repositorios_com_ia",
+            usar_cache=usar_cache,
         )
-        
-        content = response.choices[0].message.content.strip()
+        content = content.strip()
         
         json_start = content.find('[')
         json_end = content.rfind(']') + 1
@@ -72,33 +287,105 @@ Exemplo de resposta:
             return [repo.split(' ')[0] for repo in repos_lista[:5]]
 
     except Exception as e:
-        print(f"Erro ao selecionar repositórios com IA: {e}")
+        logging.error(f"❌ Erro ao selecionar repositórios com IA: {e}")
+        telemetria.registrar_erro("openai")
         return [repo.split(' ')[0] for repo in repos_lista[:5]]
 
 
-def gerar_analise_gpt(nome, bio, seguidores, seguindo, public_repos, linguagens, repos_detalhes, readme_text="", contexto: str = "recrutamento", login: str = "", html_url: str = ""):
-    try:
-        if isinstance(linguagens, dict):
-            principais_lista = sorted(linguagens, key=linguagens.get, reverse=True)[:3]
-            principais = ", ".join(principais_lista) if principais_lista else "N/A"
-        elif isinstance(linguagens, list):
-            principais = ", ".join(linguagens[:3]) if linguagens else "N/A"
-        else:
-            principais = "N/A"
+def _montar_prompt_analise_json(nome, bio, principais, repos_detalhes, readme_limitado, contexto: str, login: str) -> str:
+    """Prompt da análise pedindo só os dados em JSON; o HTML é montado por `renderizar_analise`."""
+    destacados_str = "\n".join(f"- {repo}" for repo in repos_detalhes) or "- Nenhum repositório de projeto encontrado."
 
-        destacados_lista = repos_detalhes 
-        destacados_str = "\n".join([f"<li>{repo}</li>" for repo in destacados_lista])
-        if not destacados_str:
-            destacados_str = "<li>Nenhum repositório de projeto encontrado.</li>"
+    regras_json = """
+REGRAS DE GERAÇÃO:
+1.  **Responda APENAS com um objeto JSON válido**, no formato abaixo. Sem Markdown e sem HTML: o relatório é montado a partir dos seus dados.
+2.  Cada campo de texto deve ter de 1 a 3 frases objetivas, em português.
+3.  Inclua em "repositorios" TODOS os repositórios da lista, na mesma ordem, com o nome exato.
+4.  **IDENTIFICAÇÃO:** Refira-se ao candidato APENAS pelo Nome e (@username). NUNCA use o nome de um repositório como se fosse o apelido ou "conhecido como" do candidato. Repositórios são projetos.
+"""
 
-        readme_limitado = readme_text[:2000] if readme_text else "Nenhum README de perfil fornecido."
+    dados_perfil = f"""DADOS DO PERFIL:
+- Nome: {nome} (@{login})
+- Bio: {bio}
+- README do Perfil: "{readme_limitado}"
+- Principais Tecnologias: {principais}
+- Repositórios Selecionados pela IA (os mais complexos):
+{destacados_str}
+"""
 
-        prompt = ""
-        
-        card_style = "border: 1px solid #30363d; border-radius: 8px; padding: 16px; margin-bottom: 16px;"
-        repo_card_style = "border-top: 1px solid #30363d; padding-top: 12px; margin-top: 12px;"
+    if contexto == "autoanalise":
+        return f"""
+{regras_json}
+PERSONA: Você é um Mentor de Carreira e Desenvolvedor Sênior (Tech Lead).
+OBJETIVO: Analisar o perfil de {nome} e fornecer um plano de ação detalhado para melhoria, focando nos projetos.
+{dados_perfil}
+FORMATO DE SAÍDA:
+{{
+  "pontos_fortes": "Os pontos fortes atuais do perfil.",
+  "repositorios": [
+    {{
+      "nome": "Nome-do-Projeto",
+      "bem_feito": "O que foi bem feito.",
+      "melhoria": "Ponto de melhoria (ação), usando ✅/❌.",
+      "proximo_nivel": "Sugestão para o próximo nível."
+    }}
+  ],
+  "plano_acao": "Resumo do plano de ação."
+}}
+"""
+
+    return f"""
+{regras_json}
+PERSONA: Você é um Analista Técnico Sênior (Tech Recruiter).
+OBJETIVO: Avaliar o perfil de {nome} para uma vaga de desenvolvedor, focando na análise técnica de seus repositórios.
+{dados_perfil}
+FORMATO DE SAÍDA:
+{{
+  "resumo": "João Paulo (@leonciodev) é um desenvolvedor com foco em... (JAMAIS confunda o nome de um repositório com o nome do candidato)",
+  "veredito": {{"nivel": "recomendado | com_ressalvas | nao_recomendado", "texto": "Veredito em uma frase."}},
+  "repositorios": [
+    {{
+      "nome": "Nome-do-Projeto",
+      "objetivo": "Objetivo inferido.",
+      "analise_tecnica": "Análise técnica.",
+      "qualidade": "Qualidade e documentação, usando ✅/❌.",
+      "senioridade": "Sinal de senioridade."
+    }}
+  ]
+}}
+"""
+
+
+def _montar_prompt_analise(nome, bio, linguagens, repos_detalhes, readme_text="", contexto: str = "recrutamento", login: str = "", formato: str = "json") -> str:
+    """
+    Monta o prompt da análise individual. `formato="json"` pede só os dados (o HTML é
+    renderizado localmente); `formato="html"` é usado pelo streaming, que precisa
+    emitir o HTML conforme o modelo gera.
+    """
+    if isinstance(linguagens, dict):
+        principais_lista = sorted(linguagens, key=linguagens.get, reverse=True)[:3]
+        principais = ", ".join(principais_lista) if principais_lista else "N/A"
+    elif isinstance(linguagens, list):
+        principais = ", ".join(linguagens[:3]) if linguagens else "N/A"
+    else:
+        principais = "N/A"
+
+    destacados_lista = repos_detalhes 
+    destacados_str = "\n".join([f"<li>{repo}</li>" for repo in destacados_lista])
+    if not destacados_str:
+        destacados_str = "<li>Nenhum repositório de projeto encontrado.</li>"
+
+    readme_limitado = readme_text if readme_text else "Nenhum README de perfil fornecido."
 
-        regras_html = f"""
+    if formato == "json":
+        return _montar_prompt_analise_json(nome, bio, principais, repos_detalhes, readme_limitado, contexto, login)
+
+    prompt = ""
+    
+    card_style = CARD_STYLE
+    repo_card_style = REPO_CARD_STYLE
+
+    regras_html = f"""
 REGRAS DE GERAÇÃO:
 1.  **Gere APENAS HTML.** Nenhum Markdown (como `###` ou `**...**`) deve ser usado.
 2.  **NÃO** inclua `<html>`, `<body>`, `<head>`, `<style>` ou `<script>`. Gere apenas as tags de conteúdo.
@@ -110,8 +397,8 @@ REGRAS DE GERAÇÃO:
 7.  **IDENTIFICAÇÃO:** Refira-se ao candidato APENAS pelo Nome e (@username). NUNCA use o nome de um repositório como se fosse o apelido ou "conhecido como" do candidato. Repositórios são projetos.
 """
 
-        if contexto == "autoanalise":
-            prompt = f"""
+    if contexto == "autoanalise":
+        prompt = f"""
 {regras_html}
 PERSONA: Você é um Mentor de Carreira e Desenvolvedor Sênior (Tech Lead).
 OBJETIVO: Analisar o perfil de {nome} e fornecer um plano de ação detalhado para melhoria, focando nos projetos.
@@ -157,8 +444,8 @@ ESTRUTURA HTML DE SAÍDA (use-a como guia):
     <p>...</p>
 </div>
 """
-        else:
-            prompt = f"""
+    else:
+        prompt = f"""
 {regras_html}
 PERSONA: Você é um Analista Técnico Sênior (Tech Recruiter).
 OBJETIVO: Avaliar o perfil de {nome} para uma vaga de desenvolvedor, focando na análise técnica de seus repositórios.
@@ -205,131 +492,454 @@ ESTRUTURA HTML DE SAÍDA (use-a como guia):
     </div>
 </div>
 """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=2000, 
-            temperature=0.4,
-        )
-        
-        raw_html = response.choices[0].message.content
-        return clean_ai_response(raw_html)
+    return prompt
+
+
+def _montar_prompt_analise_orcado(nome, bio, linguagens, repos_detalhes, readme_text="", contexto: str = "recrutamento", login: str = "", formato: str = "json") -> Tuple[str, int]:
+    """
+    Prompt da análise dentro de ANALISE_MAX_TOKENS_ENTRADA. O README sempre vai limpo
+    (sem badges, imagens e HTML) e limitado a ANALISE_README_MAX_TOKENS; se ainda
+    passar do orçamento, corta em ordem: README resumido, descrições longas dos
+    repositórios, repositórios do fim da seleção e, por último, o README.
+    Retorna (prompt, tokens).
+    """
+    estado = {
+        "readme": cortar_tokens(limpar_markdown(readme_text or ""), ANALISE_README_MAX_TOKENS),
+        "repos": list(repos_detalhes),
+        "resumido": False,
+        "encurtado": False,
+    }
+
+    def montar():
+        return _montar_prompt_analise(nome, bio, linguagens, estado["repos"], estado["readme"], contexto, login, formato)
+
+    def resumir_readme():
+        if estado["resumido"] or not estado["readme"]:
+            return False
+        estado["readme"] = cortar_tokens(resumir_markdown(estado["readme"]), ANALISE_README_MAX_TOKENS // 2)
+        estado["resumido"] = True
+        return True
+
+    def encurtar_repos():
+        if estado["encurtado"]:
+            return False
+        estado["repos"] = [cortar_tokens(repo, 60) for repo in estado["repos"]]
+        estado["encurtado"] = True
+        return True
+
+    def remover_repo():
+        if len(estado["repos"]) <= 1:
+            return False
+        estado["repos"].pop()
+        return True
+
+    def remover_readme():
+        if not estado["readme"]:
+            return False
+        estado["readme"] = ""
+        return True
+
+    prompt, tokens, cortes = ajustar_ao_orcamento(
+        montar,
+        [
+            ("resumir_readme", resumir_readme),
+            ("encurtar_repos", encurtar_repos),
+            ("remover_repo", remover_repo),
+            ("remover_readme", remover_readme),
+        ],
+        ANALISE_MAX_TOKENS_ENTRADA,
+    )
+    if cortes:
+        logging.info(f"✂️ Prompt da análise de {login or nome} ajustado ao orçamento ({tokens} tokens): {cortes}")
+    return prompt, tokens
+
+
+async def gerar_analise_gpt(nome, bio, seguidores, seguindo, public_repos, linguagens, repos_detalhes, readme_text="", contexto: str = "recrutamento", login: str = "", html_url: str = "", usar_cache: bool = True):
+    try:
+        prompt, tokens_prompt = _montar_prompt_analise_orcado(nome, bio, linguagens, repos_detalhes, readme_text, contexto, login)
+        modelo, temperatura = "gpt-4o", 0.4
+
+        async def chamar():
+            return await _chat(
+                prompt,
+                model=modelo,
+                max_tokens=2000,
+                temperature=temperatura,
+                funcao="gerar_analise_gpt",
+                usar_cache=usar_cache,
+                tokens_prompt=tokens_prompt,
+                formato_json=True,
+            )
+
+        # Análises simultâneas com o mesmo prompt aguardam a mesma chamada. A chave é a do cache
+        # de respostas: o mesmo login com outros repositórios (outro modo de seleção, resumo da
+        # busca com filtros x perfil completo) gera outro prompt e não reaproveita a resposta.
+        with telemetria.etapa("analise"):
+            conteudo = await voos_analise.executar(llm_cache.gerar_chave(modelo, temperatura, prompt), chamar)
+        return renderizar_analise(extrair_json(conteudo), contexto)
 
     except Exception as e:
-        print(f"Erro ao gerar análise GPT: {e}")
-        card_style_erro = "border: 1px solid #ff6b6b; border-radius: 8px; padding: 16px; margin-bottom: 16px; background-color: #ff6b6b20;"
-        return f'<div style="{card_style_erro}"><h2>❌ Erro ao Gerar Análise</h2><p class="erro">Detalhe: {e}</p></div>'
+        logging.error(f"❌ Erro ao gerar análise GPT: {e}")
+        telemetria.registrar_erro("openai")
+        return renderizar_erro("Erro ao Gerar Análise", e)
+
+async def gerar_analise_gpt_stream(nome, bio, seguidores, seguindo, public_repos, linguagens, repos_detalhes, readme_text="", contexto: str = "recrutamento", login: str = "", html_url: str = "", usar_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Igual a `gerar_analise_gpt`, mas emite o HTML em pedaços conforme o modelo gera.
+    Por isso aqui o modelo continua gerando o HTML em vez do JSON.
+    """
+    limpador = LimpadorStreaming()
+    try:
+        prompt, tokens_prompt = _montar_prompt_analise_orcado(nome, bio, linguagens, repos_detalhes, readme_text, contexto, login, formato="html")
+
+        with telemetria.etapa("analise"):
+            async for pedaco in _chat_stream(
+                prompt,
+                model="gpt-4o",
+                max_tokens=2000,
+                temperature=0.4,
+                funcao="gerar_analise_gpt",
+                usar_cache=usar_cache,
+                tokens_prompt=tokens_prompt,
+            ):
+                texto = limpador.alimentar(pedaco)
+                if texto:
+                    yield texto
+
+        final = limpador.finalizar()
+        if final:
+            yield final
+
+    except Exception as e:
+        logging.error(f"❌ Erro ao gerar análise GPT: {e}")
+        telemetria.registrar_erro("openai")
+        yield renderizar_erro("Erro ao Gerar Análise", e)
 
 # --- FUNÇÃO DE RANKING ---
-def gerar_ranking_completo(job_description: str, candidatos_analisados: List[CandidateDataForRanking]) -> str:
+def _html_demais_candidatos(demais: list, titulo: str = "pré-ranking local", rotulo: str = "aderência", inicio: int = RANKING_TOP_K + 1) -> str:
     """
-    Usa a IA para comparar e ranquear múltiplos candidatos com base em uma descrição de vaga.
+    Card com os candidatos que ficaram fora do ranking da IA, na ordem do pré-ranking local (ou das notas).
+    `inicio` é a posição do primeiro da lista, continuando a numeração dos anteriores.
     """
-    if not candidatos_analisados:
-        return "<h3>Nenhum candidato analisado para ranking.</h3>"
+    if not demais:
+        return ""
+    itens = "\n".join(
+        f'<li><a href="{cand.html_url}" target="_blank" style="color: #58a6ff; text-decoration: none;">'
+        f'{cand.nome} (@{cand.username})</a> — {rotulo} {pontuacao}</li>'
+        for cand, pontuacao in demais
+    )
+    return f"""
+<div style="{CARD_STYLE}">
+    <h2>📋 Demais Candidatos ({titulo})</h2>
+    <ol start="{inicio}">
+{itens}
+    </ol>
+</div>
+"""
 
+def _montar_prompt_ranking(job_description: str, finalistas: list, resumo_max_chars: int) -> str:
+    """
+    Monta o prompt do ranking com a análise de cada finalista resumida em `resumo_max_chars`.
+    O modelo devolve só os dados em JSON; o HTML é montado por `renderizar_ranking`.
+    """
     analises_formatadas = []
-    for i, cand in enumerate(candidatos_analisados):
+    for i, (cand, pontuacao) in enumerate(finalistas):
+        principais = ", ".join(sorted(cand.linguagens, key=cand.linguagens.get, reverse=True)[:5]) or "N/A"
         analises_formatadas.append(f"""
 --- CANDIDATO {i+1}: {cand.nome} (@{cand.username}) ---
 Link do Perfil: {cand.html_url}
-<Detalhes da Análise Gerada Pela IA>
-{cand.analise_html}
-</Detalhes da Análise Gerada Pela IA>
+Principais Tecnologias: {principais}
+Aderência à vaga (pré-ranking local, 0 a 1): {pontuacao}
+<Resumo da Análise Gerada Pela IA>
+{compactar_analise(cand.analise_html, resumo_max_chars)}
+</Resumo da Análise Gerada Pela IA>
 """)
 
     analises_concatenadas = "\n".join(analises_formatadas)
 
-    card_style = "border: 1px solid #30363d; border-radius: 8px; padding: 16px; margin-bottom: 16px;"
-
     prompt = f"""
 Você é um Recrutador Técnico Sênior com vasta experiência em análise de perfis GitHub e descrição de vagas.
 Sua tarefa é ranquear candidatos para uma vaga específica e fornecer um relatório claro e objetivo.
 
 REGRAS DE GERAÇÃO:
-1.  **Gere APENAS HTML.** Nenhum Markdown (como `###` ou `**...**`) deve ser usado.
-2.  **NÃO** inclua `<html>`, `<body>`, `<head>`, `<style>` ou `<script>`. Gere apenas as tags de conteúdo.
-3.  Use `<h2>` para títulos de seção, `<h3>` para nomes de candidatos, `<h4>` para subtítulos de análise.
-4.  Use `<strong>` para ênfase, `<p>` para parágrafos, `<ul>` e `<li>` para listas.
-5.  **ESTRUTURA VISUAL:** Envolva CADA seção principal em um `<div>` com este estilo inline exato:
-    `<div style="{card_style}">...</div>`
-6.  Coloque o título da seção (ex: `<h2>...</h2>`) DENTRO de cada `<div>`.
-7.  Use divs para separar a análise de cada candidato dentro da seção.
-8. Seja objetivo e direto em suas análises e justificativas.
-9. Considere a descrição da vaga cuidadosamente ao ranquear os candidatos.
-10. Comece mencionando o nome completo do desenvolvedor, seguido pelo seu username entre parênteses (ex: João (@joao)).
-11. **IMPORTANTE:** NUNCA use o nome de um repositório como se fosse o apelido do desenvolvedor (ex: não diga "conhecido como ProjectX").
+1.  **Responda APENAS com um objeto JSON válido**, no formato abaixo. Sem Markdown e sem HTML: o relatório é montado a partir dos seus dados.
+2.  Seja objetivo e direto em suas análises e justificativas.
+3.  Considere a descrição da vaga cuidadosamente ao ranquear os candidatos.
+4.  Identifique cada candidato pelo @username exato (sem o "@") no campo "username".
+5.  **IMPORTANTE:** NUNCA use o nome de um repositório como se fosse o apelido do desenvolvedor (ex: não diga "conhecido como ProjectX").
 
 DESCRIÇÃO DA VAGA:
 ---
 {job_description}
 ---
 
-ANÁLISES DETALHADAS DOS CANDIDATOS:
-(Cada candidato teve seu perfil e projetos mais complexos analisados individualmente pela IA. Use estas análises como base para seu ranking.)
+ANÁLISES DOS CANDIDATOS FINALISTAS:
+(Cada candidato teve seu perfil e projetos mais complexos analisados individualmente pela IA. Abaixo estão resumos dessas análises e a aderência à vaga calculada localmente. Use-os como base para seu ranking.)
 {analises_concatenadas}
 
 TAREFA:
-Gere um relatório HTML com as seguintes seções:
+1.  Ordene TODOS os candidatos acima em "ranking", do mais ao menos indicado para a vaga, com:
+    * "pontos_fortes": 2-3 pontos fortes diretamente relacionados à JD.
+    * "pontos_a_observar": 1-2 pontos que podem ser desenvolvidos ou que não se alinham perfeitamente à JD.
+2.  Em "justificativa", um parágrafo explicando a lógica geral por trás do ranking (por que o 1º é o 1º, etc.).
+3.  Em "proximos_passos", as 3 principais recomendações (ex: "Recomendar entrevista técnica para X", "Solicitar portfólio de Y").
+
+FORMATO DE SAÍDA:
+{{
+  "ranking": [
+    {{"username": "username1", "pontos_fortes": "...", "pontos_a_observar": "..."}},
+    {{"username": "username2", "pontos_fortes": "...", "pontos_a_observar": "..."}}
+  ],
+  "justificativa": "Com base na análise...",
+  "proximos_passos": ["...", "...", "..."]
+}}
+"""
+    return prompt
 
-1.  **"📊 Ranking de Candidatos para a Vaga"**:
-    * Um `<h3>` para cada candidato, com seu nome e @username (ex: "1º - João Silva (@joaosilva)").
-    * Abaixo de cada `<h3>`, uma lista `<ul>` com 2 `<li>`s:
-        * `<li><strong>Pontos Fortes para a Vaga:</strong> Descreva 2-3 pontos fortes diretamente relacionados à JD.</li>`
-        * `<li><strong>Pontos a Observar:</strong> Descreva 1-2 pontos que podem ser desenvolvidos ou que não se alinham perfeitamente à JD.</li>`
 
-2.  **"⭐ Justificativa Final do Ranking"**:
-    * Um parágrafo (`<p>`) explicando a lógica geral por trás do ranking (por que o 1º é o 1º, etc.).
-    * Um `<ul>` com 3 `<li>`s para as principais recomendações/próximos passos (ex: "Recomendar entrevista técnica para X", "Solicitar portfólio de Y").
+def _montar_prompt_avaliacao(job_description: str, cand: CandidateDataForRanking, pontuacao: float) -> str:
+    """Etapa "map" do ranking: aderência de um único candidato à vaga, em JSON curto."""
+    principais = ", ".join(sorted(cand.linguagens, key=cand.linguagens.get, reverse=True)[:5]) or "N/A"
+    return f"""
+Você é um Recrutador Técnico Sênior. Avalie a aderência de UM candidato a uma vaga.
 
-ESTRUTURA HTML DE SAÍDA (use-a como guia):
+REGRAS:
+1.  **Responda APENAS com um objeto JSON válido**, no formato abaixo, sem Markdown e sem HTML.
+2.  Seja objetivo: cada campo de texto com no máximo 2 frases.
+3.  NUNCA use o nome de um repositório como se fosse o apelido do desenvolvedor.
 
-<div style="{card_style}">
-    <h2>📋 Descrição da Vaga</h2>
-    <p>{job_description}</p>
-</div>
+DESCRIÇÃO DA VAGA:
+---
+{job_description}
+---
 
-<div style="{card_style}">
-    <h2>📊 Ranking de Candidatos para a Vaga</h2>
-    <div>
-        <h3>1º - Nome do Candidato 1 (@username1)</h3>
-        <ul>
-            <li><strong>Pontos Fortes para a Vaga:</strong> ...</li>
-            <li><strong>Pontos a Observar:</strong> ...</li>
-        </ul>
-    </div>
-    <div style="border-top: 1px solid #30363d; padding-top: 12px; margin-top: 12px;">
-        <h3>2º - Nome do Candidato 2 (@username2)</h3>
-        <ul>
-            <li>...</li>
-        </ul>
-    </div>
-    
-</div>
+CANDIDATO: {cand.nome} (@{cand.username})
+Principais Tecnologias: {principais}
+Aderência à vaga (pré-ranking local, 0 a 1): {pontuacao}
+<Resumo da Análise Gerada Pela IA>
+{compactar_analise(cand.analise_html, RANKING_RESUMO_MAX_CHARS)}
+</Resumo da Análise Gerada Pela IA>
+
+FORMATO DE SAÍDA:
+{{
+  "nota": 0,
+  "pontos_fortes": "pontos fortes diretamente relacionados à vaga",
+  "pontos_a_observar": "o que não se alinha perfeitamente à vaga",
+  "resumo": "uma frase sobre a aderência"
+}}
+"nota" é um inteiro de 0 (nada aderente) a 100 (perfeito para a vaga).
+"""
 
-<div style="{card_style}">
-    <h2>⭐ Justificativa Final do Ranking</h2>
-    <p>Com base na análise...</p>
-    <ul>
-        <li><strong>Próximo Passo 1:</strong> ...</li>
-        <li><strong>Próximo Passo 2:</strong> ...</li>
-    </ul>
-</div>
+
+def _montar_prompt_fusao(job_description: str, avaliados: list) -> str:
+    """Etapa "reduce" do ranking: ordena os finalistas a partir das avaliações individuais."""
+    linhas = "\n".join(
+        f"- @{cand.username} | nota {avaliacao['nota']} | fortes: {avaliacao['pontos_fortes']} | "
+        f"a observar: {avaliacao['pontos_a_observar']} | {avaliacao['resumo']}"
+        for cand, avaliacao in avaliados
+    )
+    return f"""
+Você é um Recrutador Técnico Sênior. Cada candidato abaixo já foi avaliado individualmente
+para a vaga (nota de 0 a 100). Compare-os entre si e produza o ranking final.
+
+REGRAS:
+1.  **Responda APENAS com um objeto JSON válido**, no formato abaixo, sem Markdown e sem HTML.
+2.  Use exatamente os usernames listados (sem o "@") e inclua TODOS eles em "ordem".
+3.  As notas são um ponto de partida: ajuste a ordem quando a comparação direta justificar.
+
+DESCRIÇÃO DA VAGA:
+---
+{job_description}
+---
+
+AVALIAÇÕES:
+{linhas}
+
+FORMATO DE SAÍDA:
+{{
+  "ordem": ["username1", "username2"],
+  "justificativa": "um parágrafo com a lógica geral do ranking (por que o 1º é o 1º, etc.)",
+  "proximos_passos": ["...", "...", "..."]
+}}
 """
 
+
+async def _avaliar_candidato(job_description: str, cand: CandidateDataForRanking, pontuacao: float, usar_cache: bool) -> Optional[dict]:
+    """Avaliação individual (etapa "map"); None se a chamada falhar ou a resposta for inválida."""
+    try:
+        async with _limite_avaliacoes:
+            conteudo = await _chat(
+                _montar_prompt_avaliacao(job_description, cand, pontuacao),
+                model="gpt-4o-mini",
+                max_tokens=400,
+                temperature=0.2,
+                funcao="avaliar_candidato_vaga",
+                usar_cache=usar_cache,
+                formato_json=True,
+            )
+        dados = extrair_json(conteudo)
+        return {
+            "nota": max(0, min(100, int(dados["nota"]))),
+            "pontos_fortes": str(dados.get("pontos_fortes") or ""),
+            "pontos_a_observar": str(dados.get("pontos_a_observar") or ""),
+            "resumo": str(dados.get("resumo") or ""),
+        }
+    except Exception as e:
+        logging.warning(f"Falha na avaliação individual de {cand.username}: {e}")
+        telemetria.registrar_erro("openai")
+        return None
+
+
+async def _ranking_map_reduce(job_description: str, candidatos_analisados: List[CandidateDataForRanking], usar_cache: bool) -> str:
+    """
+    Ranking hierárquico para vagas com muitos candidatos:
+    1. map: uma avaliação curta por candidato, todas em paralelo (até RANKING_MAPA_CONCORRENCIA);
+    2. reduce local: ordem pelas notas (empate pelo pré-ranking local);
+    3. reduce na IA: os RANKING_TOP_K primeiros são comparados entre si numa chamada pequena,
+       que define a ordem final, a justificativa e os próximos passos.
+    A latência fica perto de duas chamadas, qualquer que seja o número de candidatos.
+    """
+    with telemetria.etapa("pre_ranking"):
+        pontuados = pontuar_candidatos(job_description, candidatos_analisados)
+
+    with telemetria.etapa("ranking_mapa"):
+        avaliacoes = await asyncio.gather(*(
+            _avaliar_candidato(job_description, cand, pontuacao, usar_cache) for cand, pontuacao in pontuados
+        ))
+
+    # `pontuados` já vem do maior para o menor pré-ranking: a ordenação estável o usa como desempate
+    avaliados = sorted(
+        [(cand, avaliacao) for (cand, _), avaliacao in zip(pontuados, avaliacoes) if avaliacao],
+        key=lambda item: -item[1]["nota"],
+    )
+    sem_avaliacao = [(cand, pontuacao) for (cand, pontuacao), avaliacao in zip(pontuados, avaliacoes) if not avaliacao]
+    if not avaliados:
+        logging.warning("Nenhuma avaliação individual concluída; gerando o ranking em uma única chamada.")
+        return await _ranking_unico(job_description, candidatos_analisados, usar_cache)
+
+    finalistas = avaliados[:RANKING_TOP_K]
+    por_username = {cand.username.lower(): (cand, avaliacao) for cand, avaliacao in finalistas}
+    ordem, justificativa, proximos_passos = [], None, []
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=2500,
-            temperature=0.7,
+        with telemetria.etapa("ranking_fusao"):
+            conteudo = await _chat(
+                _montar_prompt_fusao(job_description, finalistas),
+                model="gpt-4o",
+                max_tokens=800,
+                temperature=0.7,
+                funcao="fundir_ranking",
+                usar_cache=usar_cache,
+                formato_json=True,
+            )
+        dados = extrair_json(conteudo)
+        for username in dados.get("ordem") or []:
+            chave = str(username).lstrip("@").lower()
+            if chave in por_username and chave not in ordem:
+                ordem.append(chave)
+        justificativa = dados.get("justificativa")
+        proximos_passos = dados.get("proximos_passos") or []
+    except Exception as e:
+        logging.warning(f"Falha na fusão do ranking, mantendo a ordem das notas: {e}")
+        telemetria.registrar_erro("openai")
+
+    # Finalistas que a fusão omitiu entram na ordem das notas
+    ordem += [cand.username.lower() for cand, _ in finalistas if cand.username.lower() not in ordem]
+    ranking = []
+    for chave in ordem:
+        cand, avaliacao = por_username[chave]
+        ranking.append({
+            "username": cand.username,
+            "pontos_fortes": avaliacao["pontos_fortes"],
+            "pontos_a_observar": f"{avaliacao['pontos_a_observar']} (nota individual: {avaliacao['nota']}/100)",
+        })
+
+    dados_ranking = {
+        "ranking": ranking,
+        "justificativa": justificativa or "Ordem definida pelas notas das avaliações individuais de cada candidato.",
+        "proximos_passos": proximos_passos,
+    }
+    nomes = {cand.username.lower(): cand.nome for cand, _ in finalistas}
+    demais = [(cand, f"{avaliacao['nota']}/100") for cand, avaliacao in avaliados[RANKING_TOP_K:]]
+    return (
+        renderizar_ranking(dados_ranking, job_description, nomes)
+        + _html_demais_candidatos(demais, titulo="notas das avaliações individuais", rotulo="nota", inicio=len(finalistas) + 1)
+        + _html_demais_candidatos(sem_avaliacao, titulo="sem avaliação individual, pré-ranking local", inicio=len(avaliados) + 1)
+    )
+
+
+def resolver_modo_ranking(modo: Optional[str], total: int) -> str:
+    """Modo efetivo do ranking ("unico" ou "map_reduce") para `total` candidatos."""
+    modo = modo or RANKING_MODO
+    if modo == "auto":
+        return "map_reduce" if total > RANKING_TOP_K else "unico"
+    return modo
+
+
+async def gerar_ranking_completo(
+    job_description: str,
+    candidatos_analisados: List[CandidateDataForRanking],
+    usar_cache: bool = True,
+    modo: Optional[str] = None,
+) -> str:
+    """
+    Usa a IA para comparar e ranquear múltiplos candidatos com base em uma descrição de vaga.
+    `modo` ("unico", "map_reduce" ou "auto") escolhe a estratégia; o padrão vem de RANKING_MODO.
+    """
+    if not candidatos_analisados:
+        return "<h3>Nenhum candidato analisado para ranking.</h3>"
+
+    if resolver_modo_ranking(modo, len(candidatos_analisados)) == "map_reduce":
+        return await _ranking_map_reduce(job_description, candidatos_analisados, usar_cache)
+    return await _ranking_unico(job_description, candidatos_analisados, usar_cache)
+
+
+async def _ranking_unico(job_description: str, candidatos_analisados: List[CandidateDataForRanking], usar_cache: bool) -> str:
+    """Pré-ranking local e uma única chamada com os RANKING_TOP_K finalistas."""
+
+    # Pré-ranking local: só os RANKING_TOP_K mais aderentes à vaga vão para o modelo,
+    # com a análise resumida em texto puro em vez do HTML completo.
+    with telemetria.etapa("pre_ranking"):
+        pontuados = pontuar_candidatos(job_description, candidatos_analisados)
+    finalistas = pontuados[:RANKING_TOP_K]
+    demais = pontuados[RANKING_TOP_K:]
+
+    # Os resumos das análises encolhem até o prompt caber em RANKING_MAX_TOKENS_ENTRADA
+    estado = {"resumo_max_chars": RANKING_RESUMO_MAX_CHARS}
+
+    def montar():
+        return _montar_prompt_ranking(job_description, finalistas, estado["resumo_max_chars"])
+
+    def encurtar_resumos():
+        if estado["resumo_max_chars"] <= 200:
+            return False
+        estado["resumo_max_chars"] = max(int(estado["resumo_max_chars"] * 0.7), 200)
+        return True
+
+    prompt, tokens_prompt, cortes = ajustar_ao_orcamento(
+        montar, [("encurtar_resumos", encurtar_resumos)], RANKING_MAX_TOKENS_ENTRADA
+    )
+    if cortes:
+        logging.info(
+            f"✂️ Prompt do ranking ajustado ao orçamento ({tokens_prompt} tokens, "
+            f"resumos de {estado['resumo_max_chars']} caracteres)."
         )
-        
-        raw_html = response.choices[0].message.content
-        return clean_ai_response(raw_html)
+
+    try:
+        with telemetria.etapa("ranking"):
+            conteudo = await _chat(
+                prompt,
+                model="gpt-4o",
+                max_tokens=2500,
+                temperature=0.7,
+                funcao="gerar_ranking_completo",
+                usar_cache=usar_cache,
+                tokens_prompt=tokens_prompt,
+                formato_json=True,
+            )
+        nomes = {cand.username.lower(): cand.nome for cand, _ in finalistas}
+        return renderizar_ranking(extrair_json(conteudo), job_description, nomes) + _html_demais_candidatos(demais)
         
     except Exception as e:
-        print(f"Erro ao gerar ranking final: {e}")
-        card_style_erro = "border: 1px solid #ff6b6b; border-radius: 8px; padding: 16px; margin-bottom: 16px; background-color: #ff6b6b20;"
-        return f'<div style="{card_style_erro}"><h2>❌ Erro ao Gerar Ranking</h2><p class="erro">Detalhe: {e}</p></div>'
+        logging.error(f"❌ Erro ao gerar ranking final: {e}")
+        telemetria.registrar_erro("openai")
+        return renderizar_erro("Erro ao Gerar Ranking", e)
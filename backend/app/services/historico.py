@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.services import telemetria
+from core.config import (
+    HISTORICO_HABILITADO,
+    HISTORICO_DB,
+    HISTORICO_RETENCAO_DIAS,
+    HISTORICO_MAX_ITENS,
+)
+
+
+def hash_conteudo(valor) -> str:
+    """sha256 de um valor JSON (ordem das chaves normalizada)."""
+    conteudo = json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _eh_card_de_erro(html: str) -> bool:
+    # Os cards de erro de gpt_service (renderizar_erro) nunca vão para o histórico
+    return '<p class="erro">' in html
+
+
+class HistoricoStore:
+    """
+    Análises e rankings já gerados, em SQLite com o HTML comprimido (zlib).
+    Cada resultado é identificado pela chave (tipo, logins, contexto, hash da vaga, hash dos dados
+    usados): a mesma combinação devolve o resultado salvo sem nova chamada à IA.
+    Os logins de cada resultado (o perfil analisado ou todos os candidatos de um ranking) ficam
+    na tabela `participantes`, usada no filtro por login.
+    """
+
+    def __init__(self, caminho: str, retencao_dias: float, max_itens: int):
+        self.caminho = caminho
+        self.retencao_s = retencao_dias * 86400
+        self.max_itens = max_itens
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analises (
+                    id TEXT PRIMARY KEY,
+                    chave TEXT NOT NULL UNIQUE,
+                    tipo TEXT NOT NULL,
+                    login TEXT NOT NULL,
+                    contexto TEXT NOT NULL,
+                    vaga_hash TEXT,
+                    snapshot_hash TEXT NOT NULL,
+                    titulo TEXT NOT NULL,
+                    conteudo BLOB NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_analises_login ON analises (login, criado_em);
+                CREATE INDEX IF NOT EXISTS idx_analises_criado ON analises (criado_em);
+                CREATE TABLE IF NOT EXISTS participantes (
+                    login TEXT NOT NULL,
+                    analise_id TEXT NOT NULL,
+                    PRIMARY KEY (login, analise_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_participantes_analise ON participantes (analise_id);
+            """)
+            # Bancos anteriores à tabela `participantes`: rankings guardavam os logins unidos por vírgula
+            sem_participantes = conn.execute("""
+                SELECT id, tipo, login FROM analises
+                WHERE id NOT IN (SELECT analise_id FROM participantes)
+            """).fetchall()
+            for row in sem_participantes:
+                logins = row["login"].split(",") if row["tipo"] == "ranking" else [row["login"]]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO participantes (login, analise_id) VALUES (?, ?)",
+                    [(login, row["id"]) for login in logins if login],
+                )
+                if row["tipo"] == "ranking":
+                    conn.execute("UPDATE analises SET login = '' WHERE id = ?", (row["id"],))
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _participantes(conn: sqlite3.Connection, ids: List[str]) -> dict:
+        """id -> logins do resultado, em ordem alfabética."""
+        logins = {analise_id: [] for analise_id in ids}
+        if ids:
+            marcadores = ",".join("?" * len(ids))
+            for row in conn.execute(
+                f"SELECT analise_id, login FROM participantes WHERE analise_id IN ({marcadores}) ORDER BY login", ids
+            ):
+                logins[row["analise_id"]].append(row["login"])
+        return logins
+
+    @staticmethod
+    def _resumo(row: sqlite3.Row, logins: List[str]) -> dict:
+        """`login` é o perfil analisado (vazio nos rankings); `logins` traz todos os participantes."""
+        return {
+            "id": row["id"],
+            "tipo": row["tipo"],
+            "login": row["login"],
+            "logins": logins,
+            "contexto": row["contexto"],
+            "titulo": row["titulo"],
+            "tamanho": row["tamanho"],
+            "criado_em": row["criado_em"],
+        }
+
+    def _completo(self, conn: sqlite3.Connection, row: sqlite3.Row) -> dict:
+        logins = self._participantes(conn, [row["id"]])[row["id"]]
+        return {**self._resumo(row, logins), "analise": zlib.decompress(row["conteudo"]).decode("utf-8")}
+
+    def buscar(self, chave: str) -> Optional[dict]:
+        with self._conectar() as conn:
+            row = conn.execute(
+                "SELECT * FROM analises WHERE chave = ? AND criado_em >= ?", (chave, time.time() - self.retencao_s)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE analises SET acessado_em = ? WHERE id = ?", (time.time(), row["id"]))
+            return self._completo(conn, row)
+
+    def obter(self, analise_id: str) -> Optional[dict]:
+        with self._conectar() as conn:
+            row = conn.execute("SELECT * FROM analises WHERE id = ?", (analise_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE analises SET acessado_em = ? WHERE id = ?", (time.time(), analise_id))
+            return self._completo(conn, row)
+
+    def salvar(
+        self, chave: str, tipo: str, login: str, logins: List[str], contexto: str, vaga_hash: Optional[str],
+        snapshot_hash: str, titulo: str, html: str,
+    ) -> str:
+        analise_id = uuid.uuid4().hex
+        agora = time.time()
+        with self._conectar() as conn:
+            # INSERT OR REPLACE pela chave troca o id: os participantes do resultado anterior saem junto
+            conn.execute(
+                "DELETE FROM participantes WHERE analise_id IN (SELECT id FROM analises WHERE chave = ?)", (chave,)
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO analises
+                    (id, chave, tipo, login, contexto, vaga_hash, snapshot_hash, titulo, conteudo, tamanho, criado_em, acessado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    analise_id, chave, tipo, login.lower(), contexto, vaga_hash, snapshot_hash, titulo,
+                    zlib.compress(html.encode("utf-8"), 6), len(html), agora, agora,
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO participantes (login, analise_id) VALUES (?, ?)",
+                [(participante.lower(), analise_id) for participante in logins],
+            )
+        return analise_id
+
+    def listar(self, login: Optional[str], tipo: Optional[str], limite: int, offset: int) -> Tuple[List[dict], int]:
+        """Resumos (sem o HTML), do mais novo para o mais antigo, e o total de resultados do filtro."""
+        condicoes, params = ["criado_em >= ?"], [time.time() - self.retencao_s]
+        if login:
+            condicoes.append("id IN (SELECT analise_id FROM participantes WHERE login = ?)")
+            params.append(login.lower())
+        if tipo:
+            condicoes.append("tipo = ?")
+            params.append(tipo)
+        where = " AND ".join(condicoes)
+        with self._conectar() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM analises WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT id, tipo, login, contexto, titulo, tamanho, criado_em FROM analises
+                WHERE {where} ORDER BY criado_em DESC LIMIT ? OFFSET ?
+                """,
+                (*params, limite, offset),
+            ).fetchall()
+            logins = self._participantes(conn, [row["id"] for row in rows])
+        return [self._resumo(row, logins[row["id"]]) for row in rows], total
+
+    def remover(self, analise_id: str) -> bool:
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM participantes WHERE analise_id = ?", (analise_id,))
+            return conn.execute("DELETE FROM analises WHERE id = ?", (analise_id,)).rowcount > 0
+
+    def expurgar(self) -> int:
+        """Remove os resultados fora da retenção e, acima de `max_itens`, os acessados há mais tempo."""
+        with self._conectar() as conn:
+            removidos = conn.execute(
+                "DELETE FROM analises WHERE criado_em < ?", (time.time() - self.retencao_s,)
+            ).rowcount
+            removidos += conn.execute("""
+                DELETE FROM analises WHERE id IN (
+                    SELECT id FROM analises ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_itens,)).rowcount
+            conn.execute("DELETE FROM participantes WHERE analise_id NOT IN (SELECT id FROM analises)")
+        return removidos
+
+
+_store: Optional[HistoricoStore] = None
+
+
+def _get_store() -> HistoricoStore:
+    global _store
+    if _store is None:
+        _store = HistoricoStore(HISTORICO_DB, HISTORICO_RETENCAO_DIAS, HISTORICO_MAX_ITENS)
+    return _store
+
+
+async def obter_ou_gerar(
+    tipo: str,
+    logins: List[str],
+    contexto: str,
+    snapshot,
+    gerar: Callable[[], Awaitable[str]],
+    titulo: str,
+    vaga: Optional[str] = None,
+) -> Tuple[Optional[str], str]:
+    """
+    Devolve (id no histórico, HTML). Se o mesmo resultado já foi gerado para os mesmos dados
+    (`snapshot`) e vaga, serve o salvo; senão executa `gerar()` e salva o HTML.
+    `logins` são os perfis do resultado: o analisado (tipo "perfil") ou os candidatos do ranking;
+    o resultado aparece no histórico de cada um deles.
+    Cards de erro são devolvidos com id None e não ficam no histórico.
+    """
+    if not HISTORICO_HABILITADO:
+        return None, await gerar()
+
+    vaga_hash = hash_conteudo(vaga) if vaga is not None else None
+    snapshot_hash = hash_conteudo(snapshot)
+    logins = sorted({participante.lower() for participante in logins})
+    # Mesma chave de antes da tabela `participantes`, para os resultados já salvos continuarem valendo
+    chave = hash_conteudo([tipo, ",".join(logins), contexto, vaga_hash, snapshot_hash])
+    login = logins[0] if tipo == "perfil" else ""
+    store = _get_store()
+
+    salvo = await asyncio.to_thread(store.buscar, chave)
+    if salvo is not None:
+        telemetria.registrar_cache("historico", "hit")
+        logging.info(f"🗂️ {tipo.capitalize()} de {', '.join(logins)} servido pelo histórico ({salvo['id']}).")
+        return salvo["id"], salvo["analise"]
+    telemetria.registrar_cache("historico", "miss")
+
+    html = await gerar()
+    if _eh_card_de_erro(html):
+        return None, html
+
+    analise_id = await asyncio.to_thread(
+        store.salvar, chave, tipo, login, logins, contexto, vaga_hash, snapshot_hash, titulo, html
+    )
+    await asyncio.to_thread(store.expurgar)
+    return analise_id, html
+
+
+async def listar(login: Optional[str] = None, tipo: Optional[str] = None, limite: int = 20, offset: int = 0) -> Tuple[List[dict], int]:
+    return await asyncio.to_thread(_get_store().listar, login, tipo, limite, offset)
+
+
+async def obter(analise_id: str) -> Optional[dict]:
+    return await asyncio.to_thread(_get_store().obter, analise_id)
+
+
+async def remover(analise_id: str) -> bool:
+    return await asyncio.to_thread(_get_store().remover, analise_id)
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from app.services.historico import hash_conteudo
+from app.services.pre_ranking import tokenizar
+from core.config import (
+    INDICE_PERFIS_HABILITADO,
+    INDICE_PERFIS_DB,
+    INDICE_PERFIS_PESO_LINGUAGENS,
+    INDICE_PERFIS_README_MAX_CHARS,
+)
+
+# Dimensões do vetor: [distribuição de linguagens | bag-of-words com hashing]
+DIM_LINGUAGENS = 64
+DIM_TEXTO = 1024
+DIM = DIM_LINGUAGENS + DIM_TEXTO
+
+# Textos de preenchimento que não descrevem o perfil
+_SEM_CONTEUDO = {"Sem biografia.", "Sem descrição", "Nenhum README de perfil público encontrado."}
+_README_NAO_BUSCADO = re.compile(r"^README do perfil de .+ não buscado")
+
+
+def _posicao(termo: str, dimensao: int):
+    """Bucket e sinal estáveis entre processos (crc32, não o hash() do Python)."""
+    h = zlib.crc32(termo.encode("utf-8"))
+    return h % dimensao, (1.0 if h & 0x80000000 else -1.0)
+
+
+def _normalizar(vetor: np.ndarray) -> np.ndarray:
+    norma = float(np.linalg.norm(vetor))
+    return vetor / norma if norma else vetor
+
+
+def _bloco_linguagens(linguagens: Dict[str, float]) -> np.ndarray:
+    bloco = np.zeros(DIM_LINGUAGENS, dtype=np.float32)
+    total = sum(linguagens.values())
+    for lang, qtd in linguagens.items():
+        if qtd > 0:
+            i, _ = _posicao(lang.lower(), DIM_LINGUAGENS)
+            bloco[i] += qtd / total
+    return _normalizar(bloco)
+
+
+def _bloco_texto(termos: Counter) -> np.ndarray:
+    bloco = np.zeros(DIM_TEXTO, dtype=np.float32)
+    for termo, qtd in termos.items():
+        i, sinal = _posicao(termo, DIM_TEXTO)
+        bloco[i] += sinal * (1 + np.log(qtd))
+    return _normalizar(bloco)
+
+
+def _combinar(linguagens: np.ndarray, texto: np.ndarray) -> np.ndarray:
+    vetor = np.concatenate([INDICE_PERFIS_PESO_LINGUAGENS * linguagens, texto]).astype(np.float32)
+    return _normalizar(vetor)
+
+
+def vetorizar_perfil(dados: dict) -> np.ndarray:
+    """Vetor do perfil: linguagens (fração dos repositórios) + termos da bio, repositórios e README."""
+    termos = Counter()
+    bio = dados.get("bio") or ""
+    if bio not in _SEM_CONTEUDO:
+        termos.update(tokenizar(bio))
+    for detalhe in dados.get("repos_detalhes") or []:
+        detalhe = detalhe.replace("Sem descrição", "").replace("-", " ").replace("_", " ")
+        termos.update(tokenizar(detalhe))
+    readme = dados.get("readme_text") or ""
+    if readme not in _SEM_CONTEUDO and not _README_NAO_BUSCADO.match(readme):
+        termos.update(tokenizar(readme[:INDICE_PERFIS_README_MAX_CHARS]))
+    linguagens = dados.get("linguagens") or {}
+    for lang, qtd in linguagens.items():
+        for token in tokenizar(lang):
+            termos[token] += qtd
+    return _combinar(_bloco_linguagens(linguagens), _bloco_texto(termos))
+
+
+class IndicePerfis:
+    """
+    Índice vetorial local dos perfis já buscados no GitHub.
+    Os vetores ficam em SQLite (float32) e numa matriz NumPy em memória; cada inserção grava
+    uma linha e a matriz é atualizada de forma incremental pelo campo `versao`, o que também
+    traz os perfis indexados por outros workers. As consultas são um produto matriz-vetor.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._matriz = np.zeros((0, DIM), dtype=np.float32)
+        self._n = 0
+        self._linhas: Dict[str, int] = {}
+        self._meta: List[dict] = []
+        self._assinaturas: Dict[str, str] = {}
+        self._linguagens_conhecidas: set = set()
+        self._versao = 0
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS perfis (
+                    login TEXT PRIMARY KEY,
+                    login_original TEXT NOT NULL,
+                    nome TEXT,
+                    html_url TEXT,
+                    linguagens TEXT NOT NULL,
+                    origem TEXT NOT NULL,
+                    assinatura TEXT NOT NULL,
+                    vetor BLOB NOT NULL,
+                    versao INTEGER NOT NULL,
+                    atualizado_em REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_perfis_versao ON perfis (versao);
+            """)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _atualizar(self):
+        """Carrega na matriz as linhas gravadas desde a última leitura (por este ou outro processo)."""
+        with self._conectar() as conn:
+            rows = conn.execute(
+                "SELECT * FROM perfis WHERE versao > ? ORDER BY versao", (self._versao,)
+            ).fetchall()
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                vetor = np.frombuffer(row["vetor"], dtype=np.float32)
+                if vetor.shape[0] != DIM:
+                    continue
+                login = row["login"]
+                meta = {
+                    "login": row["login_original"],
+                    "nome": row["nome"],
+                    "html_url": row["html_url"],
+                    "linguagens": json.loads(row["linguagens"]),
+                    "atualizado_em": row["atualizado_em"],
+                }
+                linha = self._linhas.get(login)
+                if linha is None:
+                    if self._n == self._matriz.shape[0]:
+                        maior = np.zeros((max(64, 2 * self._n), DIM), dtype=np.float32)
+                        maior[:self._n] = self._matriz[:self._n]
+                        self._matriz = maior
+                    linha = self._n
+                    self._n += 1
+                    self._linhas[login] = linha
+                    self._meta.append(meta)
+                else:
+                    self._meta[linha] = meta
+                self._matriz[linha] = vetor
+                self._assinaturas[login] = row["assinatura"]
+                self._linguagens_conhecidas.update(lang.lower() for lang in meta["linguagens"])
+            self._versao = max(self._versao, rows[-1]["versao"])
+
+    def indexar(self, dados: dict, origem: str) -> bool:
+        """
+        Grava (ou atualiza) o vetor do perfil. Perfis completos (`origem="perfil"`) não são
+        substituídos pelos resumidos da busca com filtros. Devolve False se nada mudou.
+        """
+        login = dados["login"].lower()
+        assinatura = hash_conteudo([
+            dados.get("bio"), dados.get("linguagens"), dados.get("repos_detalhes"), dados.get("readme_text"),
+        ])
+        if self._assinaturas.get(login) == assinatura:
+            return False
+        vetor = vetorizar_perfil(dados)
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            versao = conn.execute("SELECT COALESCE(MAX(versao), 0) + 1 FROM perfis").fetchone()[0]
+            alterado = conn.execute(
+                """
+                INSERT INTO perfis
+                    (login, login_original, nome, html_url, linguagens, origem, assinatura, vetor, versao, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (login) DO UPDATE SET
+                    login_original = excluded.login_original, nome = excluded.nome,
+                    html_url = excluded.html_url, linguagens = excluded.linguagens,
+                    origem = excluded.origem, assinatura = excluded.assinatura, vetor = excluded.vetor,
+                    versao = excluded.versao, atualizado_em = excluded.atualizado_em
+                WHERE perfis.assinatura != excluded.assinatura
+                  AND NOT (excluded.origem = 'filtro' AND perfis.origem = 'perfil')
+                """,
+                (
+                    login, dados["login"], dados.get("nome"), dados.get("html_url"),
+                    json.dumps(dados.get("linguagens") or {}, ensure_ascii=False), origem, assinatura,
+                    vetor.tobytes(), versao, time.time(),
+                ),
+            ).rowcount > 0
+        if not alterado:
+            # Mantém a assinatura conhecida para não reescrever o mesmo perfil resumido
+            self._assinaturas[login] = assinatura
+        self._atualizar()
+        return alterado
+
+    def _top_k(self, consulta: np.ndarray, k: int, excluir: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            n = self._n
+            if n == 0:
+                return []
+            pontuacoes = self._matriz[:n] @ consulta
+            if excluir is not None:
+                pontuacoes[excluir] = -np.inf
+                n -= 1
+            k = min(k, n)
+            if k <= 0:
+                return []
+            melhores = np.argpartition(-pontuacoes, k - 1)[:k]
+            melhores = melhores[np.argsort(-pontuacoes[melhores], kind="stable")]
+            return [
+                {**self._meta[i], "similaridade": round(float(pontuacoes[i]), 4)}
+                for i in melhores
+            ]
+
+    def buscar_por_vaga(self, job_description: str, k: int) -> List[dict]:
+        self._atualizar()
+        texto = job_description.lower()
+        # Linguagens (já vistas no índice) citadas na vaga entram no bloco de linguagens com o mesmo peso
+        citadas = {
+            lang: 1.0 for lang in list(self._linguagens_conhecidas)
+            if re.search(rf"(?<![\w+#]){re.escape(lang)}(?![\w+#])", texto)
+        }
+        consulta = _combinar(_bloco_linguagens(citadas), _bloco_texto(Counter(tokenizar(job_description))))
+        return self._top_k(consulta, k)
+
+    def similares(self, login: str, k: int) -> Optional[List[dict]]:
+        """Perfis mais próximos de `login` (None se ele não estiver no índice)."""
+        self._atualizar()
+        with self._lock:
+            linha = self._linhas.get(login.lower())
+            if linha is None:
+                return None
+            consulta = self._matriz[linha].copy()
+        return self._top_k(consulta, k, excluir=linha)
+
+    def estatisticas(self) -> dict:
+        return {"perfis": self._n, "dimensoes": DIM}
+
+
+_indice: Optional[IndicePerfis] = None
+
+
+def _get_indice() -> IndicePerfis:
+    global _indice
+    if _indice is None:
+        _indice = IndicePerfis(INDICE_PERFIS_DB)
+    return _indice
+
+
+async def indexar(dados: Optional[dict], origem: str = "perfil"):
+    """Indexa um perfil buscado no GitHub; falhas só geram aviso (nunca derrubam a busca)."""
+    if not INDICE_PERFIS_HABILITADO or not dados:
+        return
+    try:
+        await asyncio.to_thread(_get_indice().indexar, dados, origem)
+    except Exception as e:
+        logging.warning(f"Não foi possível indexar o perfil de {dados.get('login')}: {e}")
+
+
+async def buscar_por_vaga(job_description: str, k: int = 10) -> List[dict]:
+    return await asyncio.to_thread(_get_indice().buscar_por_vaga, job_description, k)
+
+
+async def similares(login: str, k: int = 10) -> Optional[List[dict]]:
+    return await asyncio.to_thread(_get_indice().similares, login, k)
+
+
+async def aquecer():
+    """Carrega os vetores já gravados na matriz em memória (usado no aquecimento do startup)."""
+    if INDICE_PERFIS_HABILITADO:
+        await asyncio.to_thread(lambda: _get_indice()._atualizar())
+
+
+def estatisticas() -> dict:
+    if not INDICE_PERFIS_HABILITADO:
+        return {"habilitado": False}
+    return _get_indice().estatisticas()
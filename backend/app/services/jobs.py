@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from fastapi import HTTPException
+from app.models.schemas import CandidateDataForRanking
+from core.config import JOBS_DB, JOBS_WORKERS, JOBS_CONCORRENCIA_CANDIDATOS, JOBS_LEASE_SEGUNDOS, MULTIPROCESSO
+
+
+class JobStore:
+    """Persistência dos jobs de ranking e do progresso de cada candidato em SQLite."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    job_description TEXT NOT NULL,
+                    resultado TEXT,
+                    erro TEXT,
+                    criado_em REAL NOT NULL,
+                    atualizado_em REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, criado_em);
+                CREATE TABLE IF NOT EXISTS job_candidatos (
+                    job_id TEXT NOT NULL,
+                    posicao INTEGER NOT NULL,
+                    entrada TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    username TEXT,
+                    nome TEXT,
+                    html_url TEXT,
+                    analise_html TEXT,
+                    dados TEXT,
+                    erro TEXT,
+                    PRIMARY KEY (job_id, posicao)
+                );
+            """)
+            colunas = {row["name"] for row in conn.execute("PRAGMA table_info(job_candidatos)")}
+            if "dados" not in colunas:
+                conn.execute("ALTER TABLE job_candidatos ADD COLUMN dados TEXT")
+            colunas = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "modo_ranking" not in colunas:
+                conn.execute("ALTER TABLE jobs ADD COLUMN modo_ranking TEXT")
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def criar(self, job_description: str, entradas: List[str], modo_ranking: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (id, status, job_description, modo_ranking, criado_em, atualizado_em)
+                VALUES (?, 'pendente', ?, ?, ?, ?)
+                """,
+                (job_id, job_description, modo_ranking, agora, agora),
+            )
+            conn.executemany(
+                "INSERT INTO job_candidatos (job_id, posicao, entrada, status) VALUES (?, ?, ?, 'pendente')",
+                [(job_id, i, entrada) for i, entrada in enumerate(entradas)],
+            )
+        return job_id
+
+    def reivindicar_proximo(self) -> Optional[str]:
+        """Marca o job pendente mais antigo como 'processando' e devolve seu id."""
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'pendente' ORDER BY criado_em LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'processando', atualizado_em = ? WHERE id = ?",
+                (time.time(), row["id"]),
+            )
+            return row["id"]
+
+    def reenfileirar_interrompidos(self, sem_sinal_ha: float = 0) -> int:
+        """
+        Volta para 'pendente' os jobs em andamento sem sinal de vida há mais de `sem_sinal_ha`
+        segundos (0 = todos, quando só existe este processo e ele acabou de iniciar).
+        """
+        agora = time.time()
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'pendente', atualizado_em = ? WHERE status = 'processando' AND atualizado_em <= ?",
+                (agora, agora - sem_sinal_ha),
+            )
+            return cursor.rowcount
+
+    def sinal_de_vida(self, job_id: str):
+        """Renova o `atualizado_em` do job em processamento (lease do worker que o reivindicou)."""
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE jobs SET atualizado_em = ? WHERE id = ? AND status = 'processando'",
+                (time.time(), job_id),
+            )
+
+    def atualizar_job(self, job_id: str, status: str, resultado: Optional[str] = None, erro: Optional[str] = None):
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, resultado = ?, erro = ?, atualizado_em = ? WHERE id = ?",
+                (status, resultado, erro, time.time(), job_id),
+            )
+
+    def atualizar_candidato(self, job_id: str, posicao: int, status: str, **campos):
+        colunas = ", ".join(f"{nome} = ?" for nome in campos)
+        sets = f"status = ?, {colunas}" if colunas else "status = ?"
+        with self._conectar() as conn:
+            conn.execute(
+                f"UPDATE job_candidatos SET {sets} WHERE job_id = ? AND posicao = ?",
+                (status, *campos.values(), job_id, posicao),
+            )
+
+    def obter(self, job_id: str) -> Optional[dict]:
+        with self._conectar() as conn:
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            candidatos = conn.execute(
+                "SELECT * FROM job_candidatos WHERE job_id = ? ORDER BY posicao", (job_id,)
+            ).fetchall()
+        return {**dict(job), "candidatos": [dict(c) for c in candidatos]}
+
+
+class FilaDeJobs:
+    """
+    Executa jobs de ranking em segundo plano com `JOBS_WORKERS` workers.
+    Os jobs ficam no SQLite, então sobrevivem a reinícios do servidor. No modo MULTIPROCESSO
+    todos os processos consomem a mesma fila; o worker renova o lease do job enquanto o
+    processa e jobs sem sinal de vida por JOBS_LEASE_SEGUNDOS voltam para a fila.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        processar_candidato: Callable[[str, str], Awaitable[Optional[CandidateDataForRanking]]],
+        gerar_ranking: Callable[..., Awaitable[str]],
+    ):
+        self.store = store
+        self.processar_candidato = processar_candidato
+        self.gerar_ranking = gerar_ranking
+        self._novo_job = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+
+    async def _reenfileirar(self):
+        # Com vários processos, os jobs em andamento podem ser de outro worker vivo: só os sem sinal de vida voltam
+        sem_sinal_ha = JOBS_LEASE_SEGUNDOS if MULTIPROCESSO else 0
+        reenfileirados = await asyncio.to_thread(self.store.reenfileirar_interrompidos, sem_sinal_ha)
+        if reenfileirados:
+            logging.info(f"🔁 {reenfileirados} job(s) de ranking interrompido(s) voltaram para a fila.")
+
+    async def iniciar(self):
+        await self._reenfileirar()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(JOBS_WORKERS)]
+
+    async def parar(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enfileirar(self, job_description: str, entradas: List[str], modo_ranking: Optional[str] = None) -> str:
+        job_id = await asyncio.to_thread(self.store.criar, job_description, entradas, modo_ranking)
+        self._novo_job.set()
+        return job_id
+
+    async def obter(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.obter, job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await asyncio.to_thread(self.store.reivindicar_proximo)
+            if job_id is None:
+                self._novo_job.clear()
+                try:
+                    # Verifica a fila periodicamente mesmo sem aviso (ex.: jobs reenfileirados)
+                    await asyncio.wait_for(self._novo_job.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    if MULTIPROCESSO:
+                        await self._reenfileirar()
+                continue
+
+            sinal = asyncio.create_task(self._manter_lease(job_id))
+            try:
+                await self._executar(job_id)
+            except Exception as e:
+                logging.error(f"❌ Erro no job de ranking {job_id}: {e}")
+                await asyncio.to_thread(self.store.atualizar_job, job_id, "erro", None, str(e))
+            finally:
+                sinal.cancel()
+
+    async def _manter_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOBS_LEASE_SEGUNDOS / 3)
+            await asyncio.to_thread(self.store.sinal_de_vida, job_id)
+
+    async def _executar(self, job_id: str):
+        job = await asyncio.to_thread(self.store.obter, job_id)
+        job_description = job["job_description"]
+        logging.info(f"🚀 Job {job_id}: ranking de {len(job['candidatos'])} candidatos.")
+
+        semaforo = asyncio.Semaphore(JOBS_CONCORRENCIA_CANDIDATOS)
+
+        async def processar(candidato: dict) -> Optional[CandidateDataForRanking]:
+            posicao = candidato["posicao"]
+            # Candidatos já concluídos antes de um reinício não são refeitos
+            if candidato["status"] == "concluido":
+                return CandidateDataForRanking(
+                    username=candidato["username"],
+                    nome=candidato["nome"],
+                    html_url=candidato["html_url"],
+                    analise_html=candidato["analise_html"],
+                    **json.loads(candidato["dados"] or "{}"),
+                )
+
+            async with semaforo:
+                await asyncio.to_thread(self.store.atualizar_candidato, job_id, posicao, "processando")
+                try:
+                    resultado = await self.processar_candidato(candidato["entrada"], job_description)
+                except HTTPException as he:
+                    await asyncio.to_thread(self.store.atualizar_candidato, job_id, posicao, "erro", erro=str(he.detail))
+                    return None
+                except Exception as e:
+                    await asyncio.to_thread(self.store.atualizar_candidato, job_id, posicao, "erro", erro=str(e))
+                    return None
+
+            await asyncio.to_thread(
+                self.store.atualizar_candidato, job_id, posicao, "concluido",
+                username=resultado.username,
+                nome=resultado.nome,
+                html_url=resultado.html_url,
+                analise_html=resultado.analise_html,
+                dados=json.dumps(
+                    {"bio": resultado.bio, "linguagens": resultado.linguagens, "repos_detalhes": resultado.repos_detalhes},
+                    ensure_ascii=False,
+                ),
+            )
+            return resultado
+
+        resultados = await asyncio.gather(*(processar(c) for c in job["candidatos"]))
+        candidatos_analisados = [r for r in resultados if r]
+
+        if not candidatos_analisados:
+            await asyncio.to_thread(
+                self.store.atualizar_job, job_id, "erro", None, "Nenhum candidato pôde ser analisado com sucesso."
+            )
+            return
+
+        logging.info(f"✨ Job {job_id}: gerando ranking final com {len(candidatos_analisados)} análises.")
+        ranking_html = await self.gerar_ranking(
+            job_description=job_description,
+            candidatos_analisados=candidatos_analisados,
+            modo=job["modo_ranking"],
+        )
+        await asyncio.to_thread(self.store.atualizar_job, job_id, "concluido", ranking_html)
+        logging.info(f"✅ Job {job_id} concluído.")
+
+
+def criar_fila(processar_candidato, gerar_ranking) -> FilaDeJobs:
+    return FilaDeJobs(JobStore(JOBS_DB), processar_candidato, gerar_ranking)
@@ -0,0 +1,64 @@
+import hashlib
+import json
+from typing import Optional
+from app.services import telemetria
+from app.services.cache import CacheEmCamadas
+from core.config import LLM_CACHE_DB, LLM_CACHE_MAX_MEMORIA, LLM_CACHE_MAX_DISCO
+
+# Respostas da IA endereçadas pelo conteúdo da chamada:
+# sha256(model, temperature, prompt) -> {"conteudo", "tokens_entrada", "tokens_saida", "latencia"}
+_cache: Optional[CacheEmCamadas] = None
+
+# Métricas por função de gpt_service
+metricas: dict = {}
+
+
+def _get_cache() -> CacheEmCamadas:
+    global _cache
+    if _cache is None:
+        _cache = CacheEmCamadas(LLM_CACHE_DB, "respostas_llm", LLM_CACHE_MAX_MEMORIA, LLM_CACHE_MAX_DISCO)
+    return _cache
+
+
+def _metricas_funcao(funcao: str) -> dict:
+    return metricas.setdefault(funcao, {
+        "hits": 0,
+        "misses": 0,
+        "tokens_entrada_economizados": 0,
+        "tokens_saida_economizados": 0,
+        "latencia_economizada_s": 0.0,
+    })
+
+
+def gerar_chave(model: str, temperature: float, prompt: str) -> str:
+    conteudo = json.dumps([model, temperature, prompt], ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+async def obter(chave: str, funcao: str) -> Optional[str]:
+    entrada = await _get_cache().get(chave)
+    m = _metricas_funcao(funcao)
+    if entrada is None:
+        m["misses"] += 1
+        telemetria.registrar_cache("llm", "miss")
+        return None
+
+    m["hits"] += 1
+    telemetria.registrar_cache("llm", "hit")
+    m["tokens_entrada_economizados"] += entrada["tokens_entrada"]
+    m["tokens_saida_economizados"] += entrada["tokens_saida"]
+    m["latencia_economizada_s"] += entrada["latencia"]
+    return entrada["conteudo"]
+
+
+async def salvar(chave: str, conteudo: str, tokens_entrada: int, tokens_saida: int, latencia: float):
+    await _get_cache().set(chave, {
+        "conteudo": conteudo,
+        "tokens_entrada": tokens_entrada,
+        "tokens_saida": tokens_saida,
+        "latencia": latencia,
+    })
+
+
+def estatisticas() -> dict:
+    return {"por_funcao": metricas, **_get_cache().estatisticas()}
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from core.config import (
+    PERFIS_COLUNAR_HABILITADO,
+    PERFIS_COLUNAR_DB,
+    ATIVIDADE_RECENTE_DIAS,
+)
+
+
+def _timestamp(pushed_at: Optional[str]) -> float:
+    """ISO 8601 do GitHub ("2024-05-01T12:00:00Z") -> epoch; 0 quando não há push."""
+    if not pushed_at:
+        return 0.0
+    return datetime.fromisoformat(pushed_at.replace("Z", "+00:00")).timestamp()
+
+
+def registro_do_perfil(perfil: dict, repos: List[dict]) -> dict:
+    """Formato compacto guardado por login: números do perfil + [estrelas, push, {linguagem: bytes}] por repo."""
+    return {
+        "seguidores": perfil["seguidores"],
+        "public_repos": perfil["public_repos"],
+        "repos": [
+            [repo["stars"], _timestamp(repo.get("pushed_at")), repo.get("bytes_linguagens") or {}]
+            for repo in repos
+        ],
+    }
+
+
+class _Coluna:
+    """Array NumPy que cresce por duplicação (inserções incrementais sem realocar a cada linha)."""
+
+    def __init__(self, dtype):
+        self.dados = np.zeros(64, dtype=dtype)
+        self.n = 0
+
+    def estender(self, valores):
+        valores = np.asarray(valores, dtype=self.dados.dtype)
+        fim = self.n + len(valores)
+        if fim > len(self.dados):
+            maior = np.zeros(max(fim, 2 * len(self.dados)), dtype=self.dados.dtype)
+            maior[:self.n] = self.dados[:self.n]
+            self.dados = maior
+        self.dados[self.n:fim] = valores
+        self.n = fim
+
+    def __call__(self) -> np.ndarray:
+        return self.dados[:self.n]
+
+
+class PerfisColunar:
+    """
+    Estatísticas de todos os perfis já coletados, em colunas NumPy, para filtrar e agregar
+    milhares de perfis sem laços em Python:
+    - por perfil: seguidores, repositórios públicos, soma de estrelas, último push e o trecho
+      [inicio, inicio + qtd) das colunas de linguagem que pertence a ele;
+    - por (perfil, linguagem): bytes de código somados nos repositórios;
+    - por linguagem: as linhas dos perfis que a usam (o filtro só toca essas linhas).
+    Cada login é gravado no SQLite (fonte de verdade, compartilhada entre workers) e as colunas
+    em memória são atualizadas de forma incremental pelo campo `versao`. Um perfil atualizado
+    ganha uma linha nova e a antiga é marcada como inativa; as colunas são compactadas quando
+    as linhas inativas passam da metade.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._versao = 0
+        self._limpar()
+        if caminho is None:
+            return
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS perfis (
+                    login TEXT PRIMARY KEY,
+                    login_original TEXT NOT NULL,
+                    origem TEXT NOT NULL,
+                    registro TEXT NOT NULL,
+                    versao INTEGER NOT NULL,
+                    atualizado_em REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_perfis_versao ON perfis (versao);
+            """)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _limpar(self):
+        self._logins: List[str] = []
+        self._linha_por_login: Dict[str, int] = {}
+        self._p_ativo = _Coluna(np.bool_)
+        self._p_seguidores = _Coluna(np.int64)
+        self._p_repos = _Coluna(np.int64)
+        self._p_stars = _Coluna(np.int64)
+        self._p_ultimo_push = _Coluna(np.float64)
+        self._p_inicio = _Coluna(np.int64)
+        self._p_qtd = _Coluna(np.int64)
+        self._l_ling = _Coluna(np.int32)
+        self._l_bytes = _Coluna(np.int64)
+        self._perfis_por_ling: List[_Coluna] = []
+        self._ling_ids: Dict[str, int] = {}
+        self._ling_nomes: List[str] = []
+        self._inativos = 0
+
+    # --- escrita ---
+    def adicionar(self, login: str, registro: dict):
+        """Insere (ou substitui) o perfil nas colunas em memória."""
+        with self._lock:
+            self._adicionar(login, registro)
+
+    def _adicionar(self, login: str, registro: dict):
+        chave = login.lower()
+        anterior = self._linha_por_login.get(chave)
+        if anterior is not None:
+            self._p_ativo.dados[anterior] = False
+            self._inativos += 1
+
+        linha = len(self._logins)
+        self._logins.append(login)
+        self._linha_por_login[chave] = linha
+
+        repos = registro["repos"]
+        self._p_ativo.estender([True])
+        self._p_seguidores.estender([registro["seguidores"]])
+        self._p_repos.estender([registro["public_repos"]])
+        self._p_stars.estender([sum(stars for stars, _, _ in repos)])
+        self._p_ultimo_push.estender([max((push for _, push, _ in repos), default=0.0)])
+
+        bytes_por_ling: Dict[int, int] = {}
+        for _, _, bytes_linguagens in repos:
+            for nome, qtd in bytes_linguagens.items():
+                ling = self._ling_ids.get(nome.lower())
+                if ling is None:
+                    ling = self._ling_ids[nome.lower()] = len(self._ling_nomes)
+                    self._ling_nomes.append(nome)
+                    self._perfis_por_ling.append(_Coluna(np.int32))
+                bytes_por_ling[ling] = bytes_por_ling.get(ling, 0) + qtd
+        self._p_inicio.estender([self._l_ling.n])
+        self._p_qtd.estender([len(bytes_por_ling)])
+        self._l_ling.estender(list(bytes_por_ling))
+        self._l_bytes.estender(list(bytes_por_ling.values()))
+        for ling in bytes_por_ling:
+            self._perfis_por_ling[ling].estender([linha])
+
+        if self._inativos > 1000 and self._inativos * 2 > len(self._logins):
+            self._compactar()
+
+    def _entradas(self, linhas: np.ndarray) -> np.ndarray:
+        """Posições nas colunas de linguagem de todas as `linhas` (trechos contíguos concatenados)."""
+        qtd = self._p_qtd()[linhas]
+        total = int(qtd.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        deslocamento = np.repeat(self._p_inicio()[linhas] - (np.cumsum(qtd) - qtd), qtd)
+        return deslocamento + np.arange(total)
+
+    def _compactar(self):
+        """Reconstrói as colunas só com as linhas ativas."""
+        ativo = self._p_ativo()
+        linhas = np.flatnonzero(ativo)
+        entradas = self._entradas(linhas)
+        qtd = self._p_qtd()[linhas]
+        l_ling = self._l_ling()[entradas]
+        l_perfil = np.repeat(np.arange(len(linhas), dtype=np.int32), qtd)
+        colunas = {
+            "logins": [self._logins[i] for i in linhas],
+            "seguidores": self._p_seguidores()[linhas],
+            "repos": self._p_repos()[linhas],
+            "stars": self._p_stars()[linhas],
+            "ultimo_push": self._p_ultimo_push()[linhas],
+            "qtd": qtd,
+            "l_bytes": self._l_bytes()[entradas],
+        }
+        ling_ids, ling_nomes = self._ling_ids, self._ling_nomes
+        self._limpar()
+        self._ling_ids, self._ling_nomes = ling_ids, ling_nomes
+        self._logins = colunas["logins"]
+        self._linha_por_login = {login.lower(): i for i, login in enumerate(self._logins)}
+        self._p_ativo.estender(np.ones(len(linhas), dtype=np.bool_))
+        self._p_seguidores.estender(colunas["seguidores"])
+        self._p_repos.estender(colunas["repos"])
+        self._p_stars.estender(colunas["stars"])
+        self._p_ultimo_push.estender(colunas["ultimo_push"])
+        self._p_inicio.estender(np.cumsum(colunas["qtd"]) - colunas["qtd"])
+        self._p_qtd.estender(colunas["qtd"])
+        self._l_ling.estender(l_ling)
+        self._l_bytes.estender(colunas["l_bytes"])
+        ordem = np.argsort(l_ling, kind="stable")
+        grupos = np.split(l_perfil[ordem], np.cumsum(np.bincount(l_ling, minlength=len(ling_nomes)))[:-1])
+        for grupo in grupos:
+            coluna = _Coluna(np.int32)
+            coluna.estender(grupo)
+            self._perfis_por_ling.append(coluna)
+
+    def salvar(self, login: str, registro: dict, origem: str):
+        """
+        Grava o perfil no SQLite e atualiza as colunas. Perfis completos (`origem="perfil"`)
+        não são substituídos pelos parciais da busca com filtros (só os 10 repos mais estrelados).
+        """
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            versao = conn.execute("SELECT COALESCE(MAX(versao), 0) + 1 FROM perfis").fetchone()[0]
+            conn.execute(
+                """
+                INSERT INTO perfis (login, login_original, origem, registro, versao, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (login) DO UPDATE SET
+                    login_original = excluded.login_original, origem = excluded.origem,
+                    registro = excluded.registro, versao = excluded.versao, atualizado_em = excluded.atualizado_em
+                WHERE NOT (excluded.origem = 'filtro' AND perfis.origem = 'perfil')
+                """,
+                (login.lower(), login, origem, json.dumps(registro, separators=(",", ":")), versao, time.time()),
+            )
+        self.atualizar()
+
+    def atualizar(self):
+        """Carrega nas colunas os perfis gravados desde a última leitura (por este ou outro processo)."""
+        if self.caminho is None:
+            return
+        with self._conectar() as conn:
+            rows = conn.execute(
+                "SELECT login_original, registro, versao FROM perfis WHERE versao > ? ORDER BY versao",
+                (self._versao,),
+            ).fetchall()
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._adicionar(row["login_original"], json.loads(row["registro"]))
+            self._versao = max(self._versao, rows[-1]["versao"])
+
+    # --- consulta ---
+    def _mascara(
+        self,
+        linguagens: Optional[List[str]],
+        min_stars: int,
+        min_repos: int,
+        min_followers: int,
+        atividade_recente: bool,
+    ) -> np.ndarray:
+        mascara = self._p_ativo().copy()
+        if min_followers > 0:
+            mascara &= self._p_seguidores() >= min_followers
+        if min_repos > 0:
+            mascara &= self._p_repos() >= min_repos
+        if min_stars > 0:
+            mascara &= self._p_stars() >= min_stars
+        if atividade_recente:
+            mascara &= self._p_ultimo_push() >= time.time() - ATIVIDADE_RECENTE_DIAS * 86400
+        if linguagens:
+            # Mesma regra da busca com filtros: ao menos uma das linguagens em algum repositório
+            tem_linguagem = np.zeros(len(mascara), dtype=np.bool_)
+            for lang in linguagens:
+                ling = self._ling_ids.get(lang.lower())
+                if ling is not None:
+                    tem_linguagem[self._perfis_por_ling[ling]()] = True
+            mascara &= tem_linguagem
+        return mascara
+
+    def filtrar(
+        self,
+        linguagens: Optional[List[str]] = None,
+        min_stars: int = 0,
+        min_repos: int = 0,
+        min_followers: int = 0,
+        atividade_recente: bool = False,
+        limite: int = 50,
+        top_linguagens: int = 10,
+    ) -> dict:
+        """
+        Perfis que passam nos filtros (os `limite` com mais estrelas) e a distribuição agregada
+        de linguagens (bytes) entre todos eles.
+        """
+        self.atualizar()
+        with self._lock:
+            mascara = self._mascara(linguagens, min_stars, min_repos, min_followers, atividade_recente)
+            linhas = np.flatnonzero(mascara)
+            stars = self._p_stars()[linhas]
+            ordem = linhas[np.argsort(-stars, kind="stable")[:limite]]
+
+            entradas = self._entradas(linhas)
+            por_linguagem = np.bincount(
+                self._l_ling()[entradas],
+                weights=self._l_bytes()[entradas],
+                minlength=len(self._ling_nomes),
+            )
+            principais = np.argsort(-por_linguagem, kind="stable")[:top_linguagens]
+            total_bytes = float(por_linguagem.sum()) or 1.0
+
+            return {
+                "total": int(len(linhas)),
+                "perfis": [
+                    {
+                        "login": self._logins[i],
+                        "seguidores": int(self._p_seguidores.dados[i]),
+                        "public_repos": int(self._p_repos.dados[i]),
+                        "stars": int(self._p_stars.dados[i]),
+                        "ultimo_push": float(self._p_ultimo_push.dados[i]) or None,
+                    }
+                    for i in ordem
+                ],
+                "linguagens": {
+                    self._ling_nomes[i]: round(float(por_linguagem[i]) / total_bytes, 4)
+                    for i in principais if por_linguagem[i] > 0
+                },
+            }
+
+    def estatisticas(self) -> dict:
+        return {
+            "perfis": len(self._logins) - self._inativos,
+            "entradas_linguagem": int(self._p_qtd()[self._p_ativo()].sum()),
+            "linguagens": len(self._ling_nomes),
+        }
+
+
+_store: Optional[PerfisColunar] = None
+
+
+def _get_store() -> PerfisColunar:
+    global _store
+    if _store is None:
+        _store = PerfisColunar(PERFIS_COLUNAR_DB)
+    return _store
+
+
+async def registrar(perfil: dict, repos: List[dict], origem: str = "perfil"):
+    """Registra os números de um perfil coletado; falhas só geram aviso (nunca derrubam a busca)."""
+    if not PERFIS_COLUNAR_HABILITADO:
+        return
+    try:
+        registro = registro_do_perfil(perfil, repos)
+        await asyncio.to_thread(_get_store().salvar, perfil["login"], registro, origem)
+    except Exception as e:
+        logging.warning(f"Não foi possível registrar as estatísticas de {perfil.get('login')}: {e}")
+
+
+async def filtrar(**filtros) -> dict:
+    return await asyncio.to_thread(_get_store().filtrar, **filtros)
+
+
+async def aquecer():
+    """Carrega as colunas a partir do SQLite (usado no aquecimento do startup)."""
+    if PERFIS_COLUNAR_HABILITADO:
+        await asyncio.to_thread(lambda: _get_store().atualizar())
+
+
+def estatisticas() -> dict:
+    if not PERFIS_COLUNAR_HABILITADO:
+        return {"habilitado": False}
+    return _get_store().estatisticas()
@@ -0,0 +1,89 @@
+import html
+import math
+import re
+from collections import Counter
+from typing import List, Tuple
+from app.models.schemas import CandidateDataForRanking
+
+# Palavras sem valor para comparar vaga e perfil (pt + en)
+_STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na", "nos", "nas",
+    "um", "uma", "para", "por", "com", "sem", "que", "se", "ou", "ao", "aos", "como", "mais",
+    "the", "and", "or", "of", "to", "in", "for", "with", "on", "an", "is", "are", "be", "by",
+    "descrição", "readme", "linguagem", "vaga", "experiência", "conhecimento", "conhecimentos",
+}
+
+_TOKEN = re.compile(r"\w[\w+#.\-]*")
+_STARS = re.compile(r"⭐\s*(\d+)")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Minúsculas, mantendo termos técnicos como c++, c# e node.js."""
+    tokens = []
+    for token in _TOKEN.findall(texto.lower()):
+        token = token.strip(".-")
+        if len(token) > 1 and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _documento(candidato: CandidateDataForRanking) -> Counter:
+    """Termos do perfil: bio, nomes/descrições dos repositórios e linguagens (pesadas pelo nº de repos)."""
+    termos = Counter(tokenizar(candidato.bio))
+    for detalhe in candidato.repos_detalhes:
+        termos.update(tokenizar(detalhe.replace("-", " ").replace("_", " ")))
+    for lang, qtd in candidato.linguagens.items():
+        for token in tokenizar(lang):
+            termos[token] += qtd
+    return termos
+
+
+def _vetor(termos: Counter, idf: dict) -> dict:
+    return {t: (1 + math.log(qtd)) * idf[t] for t, qtd in termos.items() if t in idf}
+
+
+def _cosseno(a: dict, b: dict) -> float:
+    produto = sum(peso * b[t] for t, peso in a.items() if t in b)
+    norma = math.sqrt(sum(p * p for p in a.values())) * math.sqrt(sum(p * p for p in b.values()))
+    return produto / norma if norma else 0.0
+
+
+def total_stars(candidato: CandidateDataForRanking) -> int:
+    return sum(int(m) for d in candidato.repos_detalhes for m in _STARS.findall(d))
+
+
+def pontuar_candidatos(job_description: str, candidatos: List[CandidateDataForRanking]) -> List[Tuple[CandidateDataForRanking, float]]:
+    """
+    Pré-ranking local e determinístico: similaridade TF-IDF (cosseno) entre a vaga e os
+    dados estruturados de cada candidato, com um pequeno bônus por estrelas.
+    Devolve (candidato, pontuação) do maior para o menor.
+    """
+    vaga = Counter(tokenizar(job_description))
+    documentos = [_documento(c) for c in candidatos]
+
+    # IDF calculado sobre os candidatos + a própria vaga
+    n = len(documentos) + 1
+    df = Counter()
+    for termos in documentos + [vaga]:
+        df.update(termos.keys())
+    idf = {t: math.log((1 + n) / (1 + qtd)) + 1 for t, qtd in df.items()}
+
+    vetor_vaga = _vetor(vaga, idf)
+    pontuados = []
+    for candidato, termos in zip(candidatos, documentos):
+        similaridade = _cosseno(vetor_vaga, _vetor(termos, idf))
+        pontuacao = similaridade + 0.02 * math.log1p(total_stars(candidato))
+        pontuados.append((candidato, round(pontuacao, 4)))
+
+    pontuados.sort(key=lambda item: (-item[1], item[0].username.lower()))
+    return pontuados
+
+
+def compactar_analise(analise_html: str, max_chars: int) -> str:
+    """Texto puro da análise (sem tags e estilos inline), cortado em `max_chars`."""
+    texto = html.unescape(_TAG.sub(" ", analise_html))
+    texto = re.sub(r"\s+", " ", texto).strip()
+    if len(texto) > max_chars:
+        texto = texto[:max_chars].rsplit(" ", 1)[0] + "…"
+    return texto
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from app.services import telemetria
+from app.services.cache import CacheEmCamadas
+from app.services.github_client import GitHubClient
+from core.config import (
+    ATIVIDADE_CACHE_MAX_DISCO,
+    ATIVIDADE_CACHE_MAX_MEMORIA,
+    PERFIL_CACHE_DB,
+    PERFIL_CACHE_TTL,
+    PERFIL_CACHE_MAX_MEMORIA,
+    PERFIL_CACHE_MAX_DISCO,
+)
+
+# Snapshots de `buscar_dados_github` por login:
+# {"dados": {...}, "etags": {url: etag}, "salvo_em": timestamp}
+_cache: Optional[CacheEmCamadas] = None
+
+# Detalhes por repositório de cada login, para a atualização incremental:
+# {"repos": {nome: {"pushed_at", "stars", "linguagens", "bytes_linguagens", "tem_readme"}}}
+_cache_repos: Optional[CacheEmCamadas] = None
+
+# Último push conhecido de cada login, para o filtro de atividade recente:
+# {"ultimo_push": epoch, "completo": bool, "verificado_em": epoch}
+# `completo` indica que o valor veio de uma listagem por push (é o último push de fato);
+# sem ele é só um limite inferior (ex.: os repositórios mais estrelados da busca com filtros).
+_cache_atividade: Optional[CacheEmCamadas] = None
+
+contadores = {"hits": 0, "revalidados_304": 0, "misses": 0, "repos_reaproveitados": 0, "repos_buscados": 0}
+
+
+def _get_cache() -> CacheEmCamadas:
+    global _cache
+    if _cache is None:
+        _cache = CacheEmCamadas(PERFIL_CACHE_DB, "perfis", PERFIL_CACHE_MAX_MEMORIA, PERFIL_CACHE_MAX_DISCO)
+    return _cache
+
+
+def _get_cache_repos() -> CacheEmCamadas:
+    global _cache_repos
+    if _cache_repos is None:
+        _cache_repos = CacheEmCamadas(PERFIL_CACHE_DB, "repos_por_login", PERFIL_CACHE_MAX_MEMORIA, PERFIL_CACHE_MAX_DISCO)
+    return _cache_repos
+
+
+async def obter_repos(login: str) -> Dict[str, dict]:
+    """Último snapshot dos repositórios de `login` (nome -> detalhes), ou {}."""
+    entrada = await _get_cache_repos().get(login.lower())
+    return entrada["repos"] if entrada else {}
+
+
+async def salvar_repos(login: str, repos: Dict[str, dict]):
+    await _get_cache_repos().set(login.lower(), {"repos": repos})
+
+
+def _get_cache_atividade() -> CacheEmCamadas:
+    global _cache_atividade
+    if _cache_atividade is None:
+        _cache_atividade = CacheEmCamadas(PERFIL_CACHE_DB, "atividade", ATIVIDADE_CACHE_MAX_MEMORIA, ATIVIDADE_CACHE_MAX_DISCO)
+    return _cache_atividade
+
+
+def _timestamp(pushed_at: str) -> float:
+    return datetime.fromisoformat(pushed_at.replace("Z", "+00:00")).timestamp()
+
+
+async def obter_atividade(login: str) -> Optional[dict]:
+    return await _get_cache_atividade().get(login.lower())
+
+
+async def registrar_atividade(login: str, pushes: Iterable[Optional[str]], completo: bool) -> Optional[dict]:
+    """
+    Atualiza o último push de `login` a partir dos `pushed_at` de repositórios já carregados.
+    O valor guardado só avança; `completo` marca uma listagem ordenada por push.
+    """
+    ultimo = max((_timestamp(p) for p in pushes if p), default=None)
+    anterior = await obter_atividade(login)
+    if ultimo is None and not completo:
+        return anterior
+
+    atividade = dict(anterior or {"ultimo_push": 0.0, "completo": False, "verificado_em": 0.0})
+    atividade["ultimo_push"] = max(atividade["ultimo_push"], ultimo or 0.0)
+    if completo:
+        atividade["completo"] = True
+        atividade["verificado_em"] = time.time()
+    if atividade != anterior:
+        await _get_cache_atividade().set(login.lower(), atividade)
+    return atividade
+
+
+def _validadores(login: str) -> list:
+    """
+    Recursos cujo ETag muda quando o snapshot fica desatualizado: o perfil
+    (bio, seguidores...) e a 1ª página de repositórios por push (pushes, estrelas, descrições).
+    """
+    return [
+        (f"/users/{login}", None),
+        (f"/users/{login}/repos", {"sort": "pushed", "direction": "desc", "per_page": 100}),
+    ]
+
+
+async def _revalidar(client: GitHubClient, login: str, etags: dict) -> Tuple[bool, dict]:
+    """Faz os GETs condicionais. Retorna (algum recurso mudou, novos etags)."""
+    validadores = _validadores(login)
+    respostas = await asyncio.gather(*(
+        client.get_condicional(url, etags.get(url), params) for url, params in validadores
+    ))
+    mudou = any(m for m, _ in respostas)
+    novos_etags = {url: etag for (url, _), (_, etag) in zip(validadores, respostas) if etag}
+    return mudou, novos_etags
+
+
+async def obter_perfil(
+    client: GitHubClient,
+    username: str,
+    buscar: Callable[[], Awaitable[dict]],
+    progresso: Optional[Callable[[str], None]] = None,
+    variante: str = "",
+) -> dict:
+    """
+    Devolve o snapshot do perfil a partir do cache quando possível:
+    - dentro do TTL: sem nenhuma chamada ao GitHub;
+    - TTL vencido: revalida com `If-None-Match`; se tudo responder 304, renova o snapshot;
+    - caso contrário: executa `buscar()` (coleta completa) e grava o resultado, com os ETags
+      só quando o perfil já tinha snapshot (num login novo eles custariam 2 chamadas a mais).
+    `variante` separa snapshots do mesmo login gerados de formas diferentes (ex.: modo de seleção).
+    """
+    cache = _get_cache()
+    chave = f"{username.lower()}#{variante}" if variante else username.lower()
+    entrada = await cache.get(chave)
+    agora = time.time()
+
+    if entrada and agora - entrada["salvo_em"] < PERFIL_CACHE_TTL:
+        contadores["hits"] += 1
+        telemetria.registrar_cache("perfis", "hit")
+        if progresso:
+            progresso(f"Perfil de @{username} encontrado no cache.")
+        return entrada["dados"]
+
+    if entrada and entrada.get("etags"):
+        try:
+            mudou, etags = await _revalidar(client, username, entrada["etags"])
+            if not mudou:
+                contadores["revalidados_304"] += 1
+                telemetria.registrar_cache("perfis", "revalidado_304")
+                logging.info(f"♻️ Perfil de {username} inalterado (304), reaproveitando snapshot.")
+                if progresso:
+                    progresso(f"Perfil de @{username} sem alterações desde a última análise.")
+                await cache.set(chave, {**entrada, "etags": etags, "salvo_em": agora})
+                return entrada["dados"]
+        except Exception as e:
+            logging.warning(f"Falha ao revalidar o cache de {username}: {e}")
+
+    contadores["misses"] += 1
+    telemetria.registrar_cache("perfis", "miss")
+
+    # Perfil nunca visto: só a coleta, sem as 2 chamadas extras dos ETags (muitos logins
+    # são vistos uma única vez). Perfil já buscado antes: os ETags são obtidos em paralelo
+    # com a coleta para que a próxima consulta fora do TTL possa ser revalidada com 304;
+    # se a coleta acabar mais nova que o ETag, a próxima revalidação apenas refaz a coleta.
+    tarefa_etags = asyncio.create_task(_revalidar(client, username, {})) if entrada else None
+    try:
+        dados = await buscar()
+    except BaseException:
+        if tarefa_etags:
+            tarefa_etags.cancel()
+        raise
+
+    etags = {}
+    if tarefa_etags:
+        try:
+            _, etags = await tarefa_etags
+        except Exception as e:
+            logging.warning(f"Não foi possível obter os ETags de {username}: {e}")
+
+    await cache.set(chave, {"dados": dados, "etags": etags, "salvo_em": time.time()})
+    return dados
+
+
+def estatisticas() -> dict:
+    return {**contadores, **_get_cache().estatisticas()}
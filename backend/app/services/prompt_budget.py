@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Callable, List, Tuple
+from core.config import TIKTOKEN_CACHE_DIR
+
+try:
+    import tiktoken
+except ImportError:  # contagem aproximada sem o tokenizador
+    tiktoken = None
+
+_COMENTARIO_HTML = re.compile(r"<!--.*?-->", re.DOTALL)
+_BLOCO_CODIGO = re.compile(r"```.*?```", re.DOTALL)
+_IMAGEM_MD = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_MD = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_TAG = re.compile(r"<[^>]+>")
+_LINHA_TABELA = re.compile(r"^\s*\|.*\|\s*$")
+_ESPACOS = re.compile(r"[ \t]+")
+_LINHAS_VAZIAS = re.compile(r"\n{3,}")
+
+# Modelos usados pelo gpt_service, com os tokenizadores carregados no aquecimento
+MODELOS = ("gpt-4o", "gpt-4o-mini")
+
+# O tiktoken lê a variável ao carregar o arquivo BPE
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", TIKTOKEN_CACHE_DIR)
+
+
+@lru_cache(maxsize=8)
+def _codificador(modelo: str):
+    """Tokenizador local do modelo; None se o tiktoken (ou o arquivo BPE dele) não estiver disponível."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(modelo)
+    except Exception as e:
+        logging.warning(f"Tokenizador de {modelo} indisponível ({e}); usando contagem aproximada.")
+        return None
+
+
+async def aquecer():
+    """
+    Carrega os tokenizadores fora do event loop: na primeira vez o tiktoken baixa o arquivo
+    BPE de forma síncrona e sem timeout, o que travaria o loop dentro de uma requisição.
+    """
+    for modelo in MODELOS:
+        await asyncio.to_thread(_codificador, modelo)
+
+
+def contar_tokens(texto: str, modelo: str = "gpt-4o") -> int:
+    """Tokens de entrada do texto; sem tokenizador, estima ~4 caracteres por token."""
+    codificador = _codificador(modelo)
+    if codificador is not None:
+        return len(codificador.encode(texto, disallowed_special=()))
+    return math.ceil(len(texto) / 4)
+
+
+def cortar_tokens(texto: str, max_tokens: int, modelo: str = "gpt-4o") -> str:
+    """Corta `texto` em no máximo `max_tokens` tokens, terminando em um espaço quando possível."""
+    if max_tokens <= 0:
+        return ""
+    if contar_tokens(texto, modelo) <= max_tokens:
+        return texto
+
+    codificador = _codificador(modelo)
+    if codificador is not None:
+        cortado = codificador.decode(codificador.encode(texto, disallowed_special=())[:max_tokens - 1])
+    else:
+        cortado = texto[:(max_tokens - 1) * 4]
+    if " " in cortado:
+        cortado = cortado.rsplit(" ", 1)[0]
+    return cortado.rstrip() + "…"
+
+
+def limpar_markdown(texto: str) -> str:
+    """Remove o que não agrega ao modelo: comentários, imagens/badges, URLs de links, tags HTML e espaços extras."""
+    texto = _COMENTARIO_HTML.sub("", texto)
+    texto = _IMAGEM_MD.sub("", texto)
+    texto = _LINK_MD.sub(r"\1", texto)
+    texto = _TAG.sub(" ", texto)
+    texto = _ESPACOS.sub(" ", texto)
+    linhas = [linha.strip() for linha in texto.splitlines()]
+    return _LINHAS_VAZIAS.sub("\n\n", "\n".join(linhas)).strip()
+
+
+def resumir_markdown(texto: str) -> str:
+    """
+    Resumo extrativo de um README: mantém os títulos e a primeira frase de cada
+    parágrafo, descartando blocos de código e tabelas.
+    """
+    texto = _TAG.sub(" ", _BLOCO_CODIGO.sub("", texto))
+    resumo = []
+    for paragrafo in re.split(r"\n\s*\n", texto):
+        linhas = [l.strip() for l in paragrafo.splitlines() if l.strip() and not _LINHA_TABELA.match(l)]
+        if not linhas:
+            continue
+        titulos = [l for l in linhas if l.startswith("#")]
+        corpo = " ".join(l for l in linhas if not l.startswith("#"))
+        resumo.extend(titulos)
+        if corpo:
+            resumo.append(re.split(r"(?<=[.!?])\s", corpo, maxsplit=1)[0])
+    return "\n".join(resumo)
+
+
+def ajustar_ao_orcamento(
+    montar: Callable[[], str],
+    passos: List[Tuple[str, Callable[[], bool]]],
+    orcamento: int,
+    modelo: str = "gpt-4o",
+) -> Tuple[str, int, List[str]]:
+    """
+    Monta o prompt e, enquanto ele passar de `orcamento` tokens, aplica os cortes em ordem de
+    prioridade. Cada passo altera o estado usado por `montar` e devolve False quando não
+    tem mais o que cortar (aí segue para o próximo).
+    Retorna (prompt, tokens, nomes dos passos aplicados).
+    """
+    prompt = montar()
+    tokens = contar_tokens(prompt, modelo)
+    aplicados = []
+    for nome, passo in passos:
+        while tokens > orcamento and passo():
+            aplicados.append(nome)
+            prompt = montar()
+            tokens = contar_tokens(prompt, modelo)
+    return prompt, tokens, aplicados
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from app.services import clientes, indice_perfis, perfis_colunar, prompt_budget
+from core.config import AQUECIMENTO_GITHUB_CONSULTAR, AQUECIMENTO_HABILITADO
+
+# Estado do aquecimento por componente:
+# {"estado": "pendente" | "pronto" | "erro", "duracao_ms": float, "erro": str}
+_componentes: Dict[str, dict] = {}
+_tarefa: Optional[asyncio.Task] = None
+_ultima_tentativa = 0.0
+
+# Intervalo mínimo (segundos) entre novas tentativas de aquecer componentes que falharam
+_INTERVALO_NOVA_TENTATIVA = 30
+
+
+def _etapas() -> Dict[str, Callable[[], Awaitable]]:
+    return {
+        "github": lambda: clientes.aquecer_github(AQUECIMENTO_GITHUB_CONSULTAR),
+        "openai": clientes.aquecer_openai,
+        "indice_perfis": indice_perfis.aquecer,
+        "perfis_colunar": perfis_colunar.aquecer,
+        "tokenizador": prompt_budget.aquecer,
+    }
+
+
+async def _aquecer_componente(nome: str, etapa: Callable[[], Awaitable]):
+    inicio = time.perf_counter()
+    try:
+        await etapa()
+        _componentes[nome] = {"estado": "pronto", "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1)}
+    except Exception as e:
+        logging.warning(f"⚠️ Falha ao aquecer {nome}: {e}")
+        _componentes[nome] = {"estado": "erro", "erro": str(e)}
+
+
+async def _aquecer(nomes):
+    inicio = time.perf_counter()
+    etapas = _etapas()
+    await asyncio.gather(*(_aquecer_componente(nome, etapas[nome]) for nome in nomes))
+    logging.info(f"🔥 Aquecimento de {', '.join(nomes)} concluído em {time.perf_counter() - inicio:.2f}s")
+
+
+def iniciar():
+    """Dispara o aquecimento em segundo plano, sem atrasar o startup."""
+    global _tarefa, _ultima_tentativa
+    if not AQUECIMENTO_HABILITADO or (_tarefa and not _tarefa.done()):
+        return
+    nomes = [nome for nome in _etapas() if _componentes.get(nome, {}).get("estado") != "pronto"]
+    if nomes:
+        # Componentes com erro continuam reportando o erro até a nova tentativa terminar
+        for nome in nomes:
+            _componentes.setdefault(nome, {"estado": "pendente"})
+        _ultima_tentativa = time.monotonic()
+        _tarefa = asyncio.create_task(_aquecer(nomes))
+
+
+async def parar():
+    if _tarefa and not _tarefa.done():
+        _tarefa.cancel()
+        try:
+            await _tarefa
+        except asyncio.CancelledError:
+            pass
+
+
+def estado() -> dict:
+    """
+    Prontidão do processo. Componentes com erro são aquecidos de novo nas consultas seguintes
+    (no máximo a cada `_INTERVALO_NOVA_TENTATIVA` segundos), para que uma falha passageira
+    (ex.: GitHub fora do ar no startup) não deixe o processo fora do balanceamento para sempre.
+    """
+    if not AQUECIMENTO_HABILITADO:
+        return {"pronto": True, "aquecimento": "desligado", "componentes": {}}
+    falhou = any(c["estado"] == "erro" for c in _componentes.values())
+    if falhou and time.monotonic() - _ultima_tentativa >= _INTERVALO_NOVA_TENTATIVA:
+        iniciar()
+    pronto = bool(_componentes) and all(c["estado"] == "pronto" for c in _componentes.values())
+    return {"pronto": pronto, "componentes": dict(_componentes)}
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import httpx
+from core.config import (
+    MULTIPROCESSO,
+    RATE_LIMIT_ESPERA_MAXIMA,
+    RATE_LIMIT_LIMIAR_PACING,
+    RATE_LIMIT_SINCRONIZACAO,
+)
+
+
+class RateLimitExcedido(Exception):
+    """Nenhum token tem cota disponível dentro do tempo máximo de espera."""
+
+
+def recurso_da_requisicao(url: str) -> str:
+    """Classifica a chamada no recurso de cota do GitHub (core, search ou graphql)."""
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+class _Orcamento:
+    def __init__(self):
+        self.limite: Optional[int] = None
+        self.restante: Optional[int] = None
+        self.reset: float = 0.0
+        self.em_uso = 0
+        self.proxima_liberacao = 0.0
+
+    def disponivel(self, agora: float) -> Optional[int]:
+        """Cota livre (descontando chamadas em andamento); None = ainda desconhecida."""
+        if self.restante is None or agora >= self.reset:
+            return None
+        return self.restante - self.em_uso
+
+
+class RateLimitScheduler:
+    """
+    Coordena todas as chamadas ao GitHub do processo:
+    - acompanha `X-RateLimit-Remaining`/`X-RateLimit-Reset` por token e por recurso;
+    - escolhe o token com mais cota livre (menos carregado);
+    - espaça as chamadas quando a cota está perto do fim, em vez de gastá-la em rajada;
+    - respeita o `Retry-After` dos limites secundários bloqueando o token pelo tempo pedido.
+    Com `compartilhado` (modo MULTIPROCESSO), a cota e os bloqueios vistos por cada processo são
+    sincronizados pelo estado compartilhado a cada RATE_LIMIT_SINCRONIZACAO segundos.
+    """
+
+    def __init__(self, tokens: List[str], compartilhado: bool = MULTIPROCESSO):
+        self.tokens = tokens
+        self._orcamentos: Dict[Tuple[str, str], _Orcamento] = {}
+        self._bloqueado_ate: Dict[str, float] = {token: 0.0 for token in tokens}
+        self._lock = asyncio.Lock()
+        self.contadores = {"chamadas": 0, "esperas": 0, "segundos_esperando": 0.0, "limites_secundarios": 0}
+
+        self.compartilhado = compartilhado
+        self._ids = {token: hashlib.sha256(token.encode()).hexdigest()[:16] for token in tokens}
+        self._alterados: Set[Tuple[str, str]] = set()
+        self._bloqueios_alterados: Set[str] = set()
+        self._ultima_sincronizacao = 0.0
+        self._lock_sincronizacao = asyncio.Lock()
+
+    def _orcamento(self, token: str, recurso: str) -> _Orcamento:
+        return self._orcamentos.setdefault((token, recurso), _Orcamento())
+
+    def _escolher(self, recurso: str, agora: float) -> Tuple[Optional[str], float]:
+        """Devolve (token, 0) se algum pode ser usado agora, ou (None, segundos até o próximo liberar)."""
+        melhor = None
+        melhor_livre = None
+        espera = float("inf")
+
+        for token in self.tokens:
+            if self._bloqueado_ate[token] > agora:
+                espera = min(espera, self._bloqueado_ate[token] - agora)
+                continue
+
+            orc = self._orcamento(token, recurso)
+            livre = orc.disponivel(agora)
+            if livre is not None and livre <= 0:
+                espera = min(espera, orc.reset - agora)
+                continue
+            if orc.proxima_liberacao > agora:
+                espera = min(espera, orc.proxima_liberacao - agora)
+                continue
+
+            # Cota desconhecida conta como cheia
+            livre_ordenavel = float("inf") if livre is None else livre
+            if melhor is None or livre_ordenavel > melhor_livre:
+                melhor, melhor_livre = token, livre_ordenavel
+
+        return melhor, (0.0 if melhor else max(espera, 0.0))
+
+    async def _sincronizar(self):
+        """Troca com os outros processos as cotas e bloqueios conhecidos (no máximo uma vez por intervalo)."""
+        if time.time() - self._ultima_sincronizacao < RATE_LIMIT_SINCRONIZACAO or self._lock_sincronizacao.locked():
+            return
+        # Import tardio: o estado compartilhado só é criado quando o modo está ligado
+        from app.services.estado_compartilhado import obter_estado
+
+        async with self._lock_sincronizacao:
+            self._ultima_sincronizacao = time.time()
+            cotas = [
+                (self._ids[token], recurso, orc.limite, orc.restante, orc.reset)
+                for token, recurso in self._alterados
+                if (orc := self._orcamento(token, recurso)).restante is not None
+            ]
+            bloqueios = {self._ids[token]: self._bloqueado_ate[token] for token in self._bloqueios_alterados}
+            self._alterados.clear()
+            self._bloqueios_alterados.clear()
+            try:
+                todas, todos_bloqueios = await asyncio.to_thread(obter_estado().sincronizar_cotas, cotas, bloqueios)
+            except Exception as e:
+                logging.warning(f"Falha ao sincronizar a cota do GitHub entre processos: {e}")
+                return
+
+            tokens_por_id = {id_: token for token, id_ in self._ids.items()}
+            for token_id, recurso, limite, restante, reset in todas:
+                token = tokens_por_id.get(token_id)
+                if token is None:
+                    continue
+                orc = self._orcamento(token, recurso)
+                if reset > orc.reset:
+                    orc.restante, orc.reset = restante, reset
+                elif reset == orc.reset and orc.restante is not None:
+                    orc.restante = min(orc.restante, restante)
+                orc.limite = orc.limite or limite
+            for token_id, ate in todos_bloqueios.items():
+                token = tokens_por_id.get(token_id)
+                if token is not None:
+                    self._bloqueado_ate[token] = max(self._bloqueado_ate[token], ate)
+
+    async def adquirir(self, recurso: str) -> str:
+        """Espera (se preciso) e reserva uma chamada em um token para o recurso."""
+        while True:
+            if self.compartilhado:
+                await self._sincronizar()
+            async with self._lock:
+                agora = time.time()
+                token, espera = self._escolher(recurso, agora)
+                if token:
+                    orc = self._orcamento(token, recurso)
+                    orc.em_uso += 1
+                    livre = orc.disponivel(agora)
+                    if orc.limite and livre is not None and livre < orc.limite * RATE_LIMIT_LIMIAR_PACING:
+                        # Distribui a cota restante até o reset
+                        orc.proxima_liberacao = agora + (orc.reset - agora) / max(livre, 1)
+                    self.contadores["chamadas"] += 1
+                    return token
+
+            if espera > RATE_LIMIT_ESPERA_MAXIMA:
+                raise RateLimitExcedido(
+                    f"Limite de requisições do GitHub ({recurso}) atingido; tente novamente em {int(espera)}s."
+                )
+            self.contadores["esperas"] += 1
+            self.contadores["segundos_esperando"] += espera
+            await asyncio.sleep(espera)
+
+    def liberar(self, token: str, recurso: str, response: Optional[httpx.Response] = None):
+        """Libera a reserva e atualiza o orçamento com os cabeçalhos da resposta."""
+        orc = self._orcamento(token, recurso)
+        orc.em_uso = max(orc.em_uso - 1, 0)
+        if response is None:
+            return
+
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers:
+            # O GitHub informa o recurso real (ex.: code_search) quando difere do nosso palpite
+            recurso_real = headers.get("X-RateLimit-Resource", recurso)
+            orc_real = orc if recurso_real == recurso else self._orcamento(token, recurso_real)
+            orc_real.restante = int(headers["X-RateLimit-Remaining"])
+            orc_real.limite = int(headers.get("X-RateLimit-Limit", orc_real.limite or 0)) or None
+            orc_real.reset = float(headers.get("X-RateLimit-Reset", orc_real.reset))
+            self._alterados.add((token, recurso_real))
+
+    def bloquear(self, token: str, segundos: float):
+        """Limite secundário: o token fica fora de uso pelo tempo indicado em `Retry-After`."""
+        self.contadores["limites_secundarios"] += 1
+        self._bloqueado_ate[token] = max(self._bloqueado_ate[token], time.time() + segundos)
+        self._bloqueios_alterados.add(token)
+
+    def estado(self) -> dict:
+        agora = time.time()
+        tokens = []
+        for token in self.tokens:
+            recursos = {}
+            for (t, recurso), orc in self._orcamentos.items():
+                if t != token:
+                    continue
+                recursos[recurso] = {
+                    "limite": orc.limite,
+                    "restante": orc.restante,
+                    "reset_em_s": max(int(orc.reset - agora), 0) if orc.reset else None,
+                    "em_uso": orc.em_uso,
+                }
+            tokens.append({
+                "token": f"…{token[-4:]}",
+                "bloqueado_por_s": max(int(self._bloqueado_ate[token] - agora), 0),
+                "recursos": recursos,
+            })
+        return {"tokens": tokens, **self.contadores, "compartilhado": self.compartilhado}
@@ -0,0 +1,69 @@
+import math
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+# Nomes típicos de projetos de estudo/triviais, que a IA "Olheiro" também é instruída a ignorar
+_TRIVIAL = re.compile(
+    r"(hello[-_ ]?world|^test[e]?s?$|^teste?[-_]|exercicio|exercise|curso|course|tutorial|aula|"
+    r"dotfiles|^config$|practice|pratica|playground|sandbox|^demo$)",
+    re.IGNORECASE,
+)
+
+
+def _dias_desde(pushed_at: Optional[str], agora: datetime) -> Optional[float]:
+    if not pushed_at:
+        return None
+    try:
+        data = datetime.fromisoformat(pushed_at.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max((agora - data).total_seconds() / 86400, 0.0)
+
+
+def pontuar_repositorio(repo: dict, agora: Optional[datetime] = None) -> float:
+    """
+    Complexidade/relevância estimada de um repositório, sem IA.
+    Usa os campos do coletor (`tamanho` em KB, `linguagens`, `bytes_linguagens`, `stars`,
+    `tem_readme`, `descricao`, `topicos`, `pushed_at`); os ausentes simplesmente não pontuam.
+    """
+    agora = agora or datetime.now(timezone.utc)
+    pontos = 0.0
+
+    # Volume de código: bytes por linguagem quando disponíveis, senão o tamanho do repositório
+    bytes_codigo = sum((repo.get("bytes_linguagens") or {}).values())
+    if bytes_codigo:
+        pontos += 0.6 * math.log1p(bytes_codigo / 1024)
+    else:
+        pontos += 0.6 * math.log1p(repo.get("tamanho") or 0)
+
+    pontos += 0.5 * min(len(repo.get("linguagens") or []), 5)
+    pontos += math.log1p(repo.get("stars") or 0)
+    pontos += 1.0 if repo.get("tem_readme") else 0.0
+
+    descricao = (repo.get("descricao") or "").strip()
+    if descricao:
+        pontos += 0.5 if len(descricao) >= 30 else 0.25
+
+    pontos += 0.2 * min(len(repo.get("topicos") or []), 5)
+
+    dias = _dias_desde(repo.get("pushed_at"), agora)
+    if dias is not None:
+        pontos += math.exp(-dias / 365)
+
+    if _TRIVIAL.search(repo.get("nome", "")):
+        pontos -= 2.0
+
+    return round(pontos, 4)
+
+
+def ranquear_repositorios(repos: List[dict], agora: Optional[datetime] = None) -> List[Tuple[dict, float]]:
+    """(repo, pontuação) do mais para o menos relevante; empates pelo nome."""
+    pontuados = [(repo, pontuar_repositorio(repo, agora)) for repo in repos]
+    pontuados.sort(key=lambda item: (-item[1], item[0]["nome"].lower()))
+    return pontuados
+
+
+def selecionar_repositorios_local(repos: List[dict], quantidade: int = 5, agora: Optional[datetime] = None) -> List[str]:
+    """Substituto determinístico da IA "Olheiro": nomes dos `quantidade` repositórios mais bem pontuados."""
+    return [repo["nome"] for repo, _ in ranquear_repositorios(repos, agora)[:quantidade]]
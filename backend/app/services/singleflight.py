@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from core.config import MULTIPROCESSO, VOO_LEASE_SEGUNDOS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas concorrentes com a mesma chave: a primeira executa,
+    as demais aguardam o mesmo resultado (ou a mesma exceção).
+    A execução roda em uma task própria, então o cancelamento de um
+    chamador (ex.: cliente desconectou) não derruba os outros.
+    """
+
+    def __init__(self):
+        self._em_voo: Dict[Hashable, asyncio.Task] = {}
+        self.contadores = {"executadas": 0, "coalescidas": 0}
+
+    async def executar(self, chave: Hashable, funcao: Callable[[], Awaitable[T]]) -> T:
+        tarefa = self._em_voo.get(chave)
+        if tarefa is not None:
+            self.contadores["coalescidas"] += 1
+            return await asyncio.shield(tarefa)
+
+        tarefa = asyncio.create_task(funcao())
+        self._em_voo[chave] = tarefa
+        self.contadores["executadas"] += 1
+        tarefa.add_done_callback(lambda _: self._em_voo.pop(chave, None))
+        return await asyncio.shield(tarefa)
+
+    def estatisticas(self) -> dict:
+        return {**self.contadores, "em_voo": len(self._em_voo)}
+
+
+class SingleFlightCompartilhado(SingleFlight):
+    """
+    SingleFlight que também coalesce entre processos (modo MULTIPROCESSO).
+    Dentro do processo funciona igual ao SingleFlight; entre processos, quem conseguir a
+    reserva da chave no estado compartilhado executa e publica o resultado (que precisa ser
+    serializável em JSON), e os outros processos aguardam por ele. Se o dono terminar com
+    erro ou morrer (reserva expirada), o próximo a conseguir a reserva executa.
+    """
+
+    def __init__(self, nome: str, intervalo_espera: float = 0.2):
+        super().__init__()
+        self.nome = nome
+        self.intervalo_espera = intervalo_espera
+        self._dono = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.contadores["coalescidas_entre_processos"] = 0
+
+    async def executar(self, chave: Hashable, funcao: Callable[[], Awaitable[T]]) -> T:
+        return await super().executar(chave, lambda: self._executar_entre_processos(chave, funcao))
+
+    async def _executar_entre_processos(self, chave: Hashable, funcao: Callable[[], Awaitable[T]]) -> T:
+        # Import tardio: o estado compartilhado só é criado quando o modo está ligado
+        from app.services.estado_compartilhado import SEM_RESULTADO, obter_estado
+
+        estado = obter_estado()
+        chave_txt = f"{self.nome}:{json.dumps(chave, ensure_ascii=False, default=str)}"
+        inicio = time.time()
+        aguardou = False
+
+        while True:
+            if await asyncio.to_thread(estado.tentar_reservar, chave_txt, self._dono, VOO_LEASE_SEGUNDOS):
+                try:
+                    resultado = await funcao()
+                except BaseException:
+                    await asyncio.to_thread(estado.liberar, chave_txt, self._dono)
+                    raise
+                await asyncio.to_thread(estado.liberar, chave_txt, self._dono, resultado)
+                return resultado
+
+            if not aguardou:
+                aguardou = True
+                self.contadores["coalescidas_entre_processos"] += 1
+
+            # Outro processo está executando: aguarda o resultado ou o fim da reserva dele
+            while True:
+                await asyncio.sleep(self.intervalo_espera)
+                resultado, reservado = await asyncio.to_thread(estado.consultar, chave_txt, inicio)
+                if resultado is not SEM_RESULTADO:
+                    return resultado
+                if not reservado:
+                    break
+
+
+def criar_singleflight(nome: str) -> SingleFlight:
+    """SingleFlight do processo ou, no modo MULTIPROCESSO, compartilhado entre os workers."""
+    return SingleFlightCompartilhado(nome) if MULTIPROCESSO else SingleFlight()
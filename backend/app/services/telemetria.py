@@ -0,0 +1,154 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+# --- MÉTRICAS (expostas em GET /metrics) ---
+ETAPA_SEGUNDOS = Histogram(
+    "github_analyzer_etapa_segundos",
+    "Duração de cada etapa do pipeline de análise",
+    ["etapa"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80),
+)
+REQUISICAO_SEGUNDOS = Histogram(
+    "github_analyzer_requisicao_segundos",
+    "Duração das requisições à API, por rota",
+    ["rota"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160),
+)
+GITHUB_CHAMADAS = Counter(
+    "github_analyzer_github_chamadas_total",
+    "Chamadas à API do GitHub",
+    ["recurso", "status"],
+)
+GITHUB_CHAMADAS_POR_REQUISICAO = Histogram(
+    "github_analyzer_github_chamadas_por_requisicao",
+    "Chamadas ao GitHub feitas por requisição à API",
+    ["rota"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+OPENAI_TOKENS = Counter(
+    "github_analyzer_openai_tokens_total",
+    "Tokens enviados/recebidos da OpenAI, por função de gpt_service",
+    ["funcao", "direcao"],
+)
+PROMPT_TOKENS = Histogram(
+    "github_analyzer_prompt_tokens",
+    "Tokens de entrada de cada prompt enviado à OpenAI, por função de gpt_service",
+    ["funcao"],
+    buckets=(100, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 12000),
+)
+CACHE_CONSULTAS = Counter(
+    "github_analyzer_cache_consultas_total",
+    "Consultas aos caches (perfis e respostas da IA)",
+    ["cache", "resultado"],
+)
+ERROS = Counter(
+    "github_analyzer_erros_total",
+    "Erros por categoria",
+    ["categoria"],
+)
+
+# Estado da requisição atual: {"etapas": {nome: segundos}, "github_chamadas": n}.
+# As tasks criadas durante a requisição herdam o mesmo dicionário.
+_requisicao: ContextVar[Optional[dict]] = ContextVar("telemetria_requisicao", default=None)
+
+
+@contextmanager
+def etapa(nome: str):
+    """Mede um trecho do pipeline: vai para o histograma e para o `Server-Timing` da requisição."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        ETAPA_SEGUNDOS.labels(nome).observe(duracao)
+        estado = _requisicao.get()
+        if estado is not None:
+            estado["etapas"][nome] = estado["etapas"].get(nome, 0.0) + duracao
+
+
+def registrar_chamada_github(recurso: str, status: int):
+    GITHUB_CHAMADAS.labels(recurso, str(status)).inc()
+    estado = _requisicao.get()
+    if estado is not None:
+        estado["github_chamadas"] += 1
+
+
+def registrar_tokens(funcao: str, entrada: int, saida: int):
+    OPENAI_TOKENS.labels(funcao, "entrada").inc(entrada)
+    OPENAI_TOKENS.labels(funcao, "saida").inc(saida)
+
+
+def registrar_prompt(funcao: str, tokens: int):
+    PROMPT_TOKENS.labels(funcao).observe(tokens)
+
+
+def registrar_cache(cache: str, resultado: str):
+    CACHE_CONSULTAS.labels(cache, resultado).inc()
+
+
+def registrar_erro(categoria: str):
+    ERROS.labels(categoria).inc()
+
+
+def exportar() -> tuple:
+    """
+    (corpo, content-type) no formato de exposição do Prometheus. Com vários workers
+    (PROMETHEUS_MULTIPROC_DIR definido pelo tools/servidor.py), soma as métricas de todos os processos.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def _server_timing(estado: dict, total: float) -> str:
+    partes = [f"{nome};dur={segundos * 1000:.1f}" for nome, segundos in estado["etapas"].items()]
+    partes.append(f"github;desc=\"chamadas ao GitHub: {estado['github_chamadas']}\"")
+    partes.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(partes)
+
+
+class TelemetriaMiddleware:
+    """
+    Middleware ASGI: abre o estado de telemetria de cada requisição, acrescenta o cabeçalho
+    `Server-Timing` com as etapas concluídas até o início da resposta e, ao fim do corpo
+    (inclusive em respostas em streaming), registra a duração e as chamadas ao GitHub da rota.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = {"etapas": {}, "github_chamadas": 0}
+        token = _requisicao.set(estado)
+        inicio = time.perf_counter()
+
+        def rota() -> str:
+            # Usa o padrão da rota (ex.: /ranking-vaga/jobs/{job_id}) para não explodir a cardinalidade
+            route = scope.get("route")
+            return getattr(route, "path", "desconhecida")
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = list(mensagem.get("headers", []))
+                valor = _server_timing(estado, time.perf_counter() - inicio)
+                cabecalhos.append((b"server-timing", valor.encode("latin-1", "replace")))
+                mensagem = {**mensagem, "headers": cabecalhos}
+            elif mensagem["type"] == "http.response.body" and not mensagem.get("more_body", False):
+                REQUISICAO_SEGUNDOS.labels(rota()).observe(time.perf_counter() - inicio)
+                GITHUB_CHAMADAS_POR_REQUISICAO.labels(rota()).observe(estado["github_chamadas"])
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _requisicao.reset(token)
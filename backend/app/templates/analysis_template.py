@@ -1,4 +1,5 @@
 # app/templates/analysis_template.py
+from html import escape
 
 def gerar_analise(nome, bio, seguidores, seguindo, public_repos, linguagens, repos_detalhes):
     linguagens_ordenadas = sorted(linguagens.items(), key=lambda x: x[1], reverse=True)
@@ -41,3 +42,131 @@ def gerar_analise(nome, bio, seguidores, seguindo, public_repos, linguagens, rep
     <p><em>Essa análise foi gerada automaticamente com base nos dados públicos disponíveis no GitHub.</em></p>
     """
     return html
+
+
+# ==============================================================================
+# RENDERIZAÇÃO DAS RESPOSTAS ESTRUTURADAS DA IA
+# ==============================================================================
+# A IA devolve só os dados (JSON); a marcação e os estilos inline ficam aqui.
+
+CARD_STYLE = "border: 1px solid #30363d; border-radius: 8px; padding: 16px; margin-bottom: 16px;"
+REPO_CARD_STYLE = "border-top: 1px solid #30363d; padding-top: 12px; margin-top: 12px;"
+CARD_ERRO_STYLE = "border: 1px solid #ff6b6b; border-radius: 8px; padding: 16px; margin-bottom: 16px; background-color: #ff6b6b20;"
+
+CORES_VEREDITO = {
+    "recomendado": "green",
+    "com_ressalvas": "orange",
+    "nao_recomendado": "#ff6b6b",
+}
+
+
+def _texto(valor) -> str:
+    """Texto escapado de um campo da resposta; listas viram frases separadas por espaço."""
+    if valor is None:
+        return ""
+    if isinstance(valor, list):
+        valor = " ".join(str(v) for v in valor)
+    return escape(str(valor).strip())
+
+
+def _lista(valor) -> list:
+    """Campo que deveria ser uma lista; um valor solto (texto, objeto) vira uma lista de um item."""
+    if valor is None or valor == "":
+        return []
+    if isinstance(valor, list):
+        return valor
+    return [valor]
+
+
+def _card(titulo: str, conteudo: str) -> str:
+    return f'<div style="{CARD_STYLE}">\n    <h2>{titulo}</h2>\n{conteudo}\n</div>\n'
+
+
+def _repos(repositorios: list, campos: list) -> str:
+    """Um bloco por repositório: <h3> com o nome e uma <ul> com os `campos` (rótulo, chave)."""
+    blocos = []
+    for i, repo in enumerate(_lista(repositorios)):
+        if not isinstance(repo, dict):
+            continue
+        itens = "".join(
+            f"<li><strong>{rotulo}:</strong> {_texto(repo.get(chave))}</li>"
+            for rotulo, chave in campos if repo.get(chave)
+        )
+        abertura = "<div>" if i == 0 else f'<div style="{REPO_CARD_STYLE}">'
+        blocos.append(f"    {abertura}\n        <h3>{_texto(repo.get('nome'))}</h3>\n        <ul>{itens}</ul>\n    </div>")
+    return "\n".join(blocos) or "    <p>Nenhum repositório analisado.</p>"
+
+
+def renderizar_analise(dados: dict, contexto: str = "recrutamento") -> str:
+    """HTML da análise individual a partir do JSON gerado pela IA (mesmo layout do HTML gerado antes pelo modelo)."""
+    if contexto == "autoanalise":
+        return (
+            _card("🚀 Seus Pontos Fortes Atuais", f"    <p>{_texto(dados.get('pontos_fortes'))}</p>")
+            + _card(
+                "💡 Análise Detalhada dos Seus Projetos (Selecionados por IA)",
+                _repos(dados.get("repositorios"), [
+                    ("O que foi bem feito", "bem_feito"),
+                    ("Ponto de Melhoria (Ação)", "melhoria"),
+                    ("Próximo Nível (Sugestão)", "proximo_nivel"),
+                ]),
+            )
+            + _card("🎯 Plano de Ação (Resumo)", f"    <p>{_texto(dados.get('plano_acao'))}</p>")
+        )
+
+    veredito = dados.get("veredito") or {}
+    if not isinstance(veredito, dict):
+        veredito = {"texto": veredito}
+    cor = CORES_VEREDITO.get(str(veredito.get("nivel", "")).lower(), "green")
+    resumo = (
+        f"    <p>{_texto(dados.get('resumo'))}</p>\n"
+        f'    <ul>\n        <li><span style="color:{cor};">Veredito: {_texto(veredito.get("texto"))}</span></li>\n    </ul>'
+    )
+    return (
+        _card("📊 Resumo do Perfil e Veredito", resumo)
+        + _card(
+            "🔍 Análise Técnica Detalhada dos Repositórios (Selecionados por IA)",
+            _repos(dados.get("repositorios"), [
+                ("Objetivo Inferido", "objetivo"),
+                ("Análise Técnica", "analise_tecnica"),
+                ("Qualidade e Documentação", "qualidade"),
+                ("Sinal de Senioridade", "senioridade"),
+            ]),
+        )
+    )
+
+
+def renderizar_ranking(dados: dict, job_description: str, nomes: dict) -> str:
+    """
+    HTML do ranking a partir do JSON gerado pela IA. `nomes` mapeia username (minúsculo)
+    para o nome do candidato, para o título não depender do que o modelo escreveu.
+    """
+    blocos = []
+    for i, item in enumerate(_lista(dados.get("ranking"))):
+        if not isinstance(item, dict):
+            continue
+        username = str(item.get("username", "")).lstrip("@")
+        nome = nomes.get(username.lower(), item.get("nome") or username)
+        abertura = "<div>" if i == 0 else f'<div style="{REPO_CARD_STYLE}">'
+        blocos.append(
+            f"    {abertura}\n"
+            f"        <h3>{i + 1}º - {_texto(nome)} (@{_texto(username)})</h3>\n"
+            f"        <ul>\n"
+            f"            <li><strong>Pontos Fortes para a Vaga:</strong> {_texto(item.get('pontos_fortes'))}</li>\n"
+            f"            <li><strong>Pontos a Observar:</strong> {_texto(item.get('pontos_a_observar'))}</li>\n"
+            f"        </ul>\n"
+            f"    </div>"
+        )
+
+    passos = "".join(
+        f"<li><strong>Próximo Passo {i + 1}:</strong> {_texto(passo)}</li>"
+        for i, passo in enumerate(_lista(dados.get("proximos_passos")))
+    )
+    return (
+        _card("📋 Descrição da Vaga", f"    <p>{escape(job_description)}</p>")
+        + _card("📊 Ranking de Candidatos para a Vaga", "\n".join(blocos) or "    <p>Nenhum candidato ranqueado.</p>")
+        + _card("⭐ Justificativa Final do Ranking", f"    <p>{_texto(dados.get('justificativa'))}</p>\n    <ul>{passos}</ul>")
+    )
+
+
+def renderizar_erro(titulo: str, detalhe) -> str:
+    return f'<div style="{CARD_ERRO_STYLE}"><h2>❌ {titulo}</h2><p class="erro">Detalhe: {escape(str(detalhe))}</p></div>'
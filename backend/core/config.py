@@ -0,0 +1,198 @@
+# core/config.py
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Carrega o .env
+load_dotenv()
+
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ("1", "true", "sim", "yes", "on")
+
+
+# Diretório dos dados locais (caches SQLite etc.)
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+# --- MODO MULTIPROCESSO (vários workers do uvicorn/gunicorn) ---
+# Liga o estado compartilhado entre os processos: coalescência de buscas/análises
+# idênticas e contabilidade da cota do GitHub. Ligado pelo tools/servidor.py com --workers > 1.
+MULTIPROCESSO = _env_bool("MULTIPROCESSO", False)
+ESTADO_COMPARTILHADO_DB = os.getenv("ESTADO_COMPARTILHADO_DB", str(DATA_DIR / "estado.sqlite3"))
+
+# Validade (segundos) da reserva de quem está executando uma busca/análise coalescida;
+# se o processo dono morrer, outro assume depois desse tempo
+VOO_LEASE_SEGUNDOS = float(os.getenv("VOO_LEASE_SEGUNDOS", "120"))
+
+# Intervalo mínimo (segundos) entre sincronizações da cota do GitHub com os outros processos
+RATE_LIMIT_SINCRONIZACAO = float(os.getenv("RATE_LIMIT_SINCRONIZACAO", "1"))
+
+# --- OPENAI ---
+# Endpoint da API (ex.: http://127.0.0.1:9000/v1 para o tools/stub_server.py); vazio = API oficial
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# --- GITHUB ---
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+
+# Liga o coletor via GraphQL (1-2 consultas por perfil). Se falhar, cai no caminho REST.
+GITHUB_USE_GRAPHQL = _env_bool("GITHUB_USE_GRAPHQL", True)
+
+# Quantidade máxima de repositórios (sem forks) varridos por perfil
+MAX_REPOS_TO_SCAN = int(os.getenv("MAX_REPOS_TO_SCAN", "30"))
+
+# Timeout (segundos) das chamadas HTTP ao GitHub
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "20"))
+
+# Tamanho do pool de conexões HTTP compartilhado com o GitHub
+GITHUB_MAX_CONEXOES = int(os.getenv("GITHUB_MAX_CONEXOES", "20"))
+
+# Sub-requisições de detalhes dos repositórios (linguagens e README) feitas em paralelo no
+# caminho REST: por perfil e no total, somando todos os perfis sendo coletados ao mesmo tempo
+GITHUB_CONCORRENCIA_POR_PERFIL = int(os.getenv("GITHUB_CONCORRENCIA_POR_PERFIL", "8"))
+GITHUB_CONCORRENCIA_GLOBAL = int(os.getenv("GITHUB_CONCORRENCIA_GLOBAL", str(GITHUB_MAX_CONEXOES)))
+
+# --- RATE LIMIT DO GITHUB ---
+# Espera máxima (segundos) por cota antes de desistir da chamada
+RATE_LIMIT_ESPERA_MAXIMA = float(os.getenv("RATE_LIMIT_ESPERA_MAXIMA", "60"))
+
+# Abaixo desta fração da cota as chamadas passam a ser espaçadas até o reset
+RATE_LIMIT_LIMIAR_PACING = float(os.getenv("RATE_LIMIT_LIMIAR_PACING", "0.1"))
+
+# Tentativas por chamada quando o GitHub responde com limite secundário (403/429 + Retry-After)
+GITHUB_TENTATIVAS = int(os.getenv("GITHUB_TENTATIVAS", "3"))
+
+# --- CACHE DE PERFIS ---
+PERFIL_CACHE_HABILITADO = _env_bool("PERFIL_CACHE_HABILITADO", True)
+PERFIL_CACHE_DB = os.getenv("PERFIL_CACHE_DB", str(DATA_DIR / "perfis.sqlite3"))
+
+# Tempo (segundos) em que um snapshot é servido sem nenhuma chamada ao GitHub.
+# Depois disso ele é revalidado com ETag (304 = continua válido).
+PERFIL_CACHE_TTL = int(os.getenv("PERFIL_CACHE_TTL", "3600"))
+PERFIL_CACHE_MAX_MEMORIA = int(os.getenv("PERFIL_CACHE_MAX_MEMORIA", "256"))
+PERFIL_CACHE_MAX_DISCO = int(os.getenv("PERFIL_CACHE_MAX_DISCO", "5000"))
+
+# Coleta REST incremental: repositórios sem push novo desde a última coleta
+# reaproveitam linguagens e README do snapshot em vez de consultar o GitHub
+PERFIL_INCREMENTAL_HABILITADO = _env_bool("PERFIL_INCREMENTAL_HABILITADO", True)
+
+# --- ATIVIDADE RECENTE (filtro atividadeRecente) ---
+# Janela (dias desde o último push) para um perfil contar como ativo
+ATIVIDADE_RECENTE_DIAS = int(os.getenv("ATIVIDADE_RECENTE_DIAS", "90"))
+# Último push de cada login, tirado dos repositórios já carregados; um perfil visto como
+# inativo só é consultado de novo no GitHub depois de ATIVIDADE_CACHE_TTL segundos
+ATIVIDADE_CACHE_TTL = int(os.getenv("ATIVIDADE_CACHE_TTL", "86400"))
+ATIVIDADE_CACHE_MAX_MEMORIA = int(os.getenv("ATIVIDADE_CACHE_MAX_MEMORIA", "5000"))
+ATIVIDADE_CACHE_MAX_DISCO = int(os.getenv("ATIVIDADE_CACHE_MAX_DISCO", "100000"))
+
+# --- CACHE DE RESPOSTAS DA IA ---
+LLM_CACHE_HABILITADO = _env_bool("LLM_CACHE_HABILITADO", True)
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", str(DATA_DIR / "llm.sqlite3"))
+LLM_CACHE_MAX_MEMORIA = int(os.getenv("LLM_CACHE_MAX_MEMORIA", "128"))
+LLM_CACHE_MAX_DISCO = int(os.getenv("LLM_CACHE_MAX_DISCO", "2000"))
+
+# Funções de gpt_service que nunca usam o cache (separadas por vírgula),
+# ex.: "gerar_ranking_completo,selecionar_repositorios_com_ia"
+LLM_CACHE_FUNCOES_DESATIVADAS = {
+    f.strip() for f in os.getenv("LLM_CACHE_FUNCOES_DESATIVADAS", "").split(",") if f.strip()
+}
+
+# --- HISTÓRICO DE ANÁLISES ---
+# Análises e rankings gerados ficam salvos (HTML comprimido) e são servidos de novo
+# quando o mesmo perfil/vaga é pedido com os mesmos dados, sem chamar a IA
+HISTORICO_HABILITADO = _env_bool("HISTORICO_HABILITADO", True)
+HISTORICO_DB = os.getenv("HISTORICO_DB", str(DATA_DIR / "historico.sqlite3"))
+HISTORICO_RETENCAO_DIAS = float(os.getenv("HISTORICO_RETENCAO_DIAS", "30"))
+HISTORICO_MAX_ITENS = int(os.getenv("HISTORICO_MAX_ITENS", "10000"))
+
+# --- ÍNDICE VETORIAL DE PERFIS ---
+# Todo perfil buscado no GitHub vira um vetor (linguagens + termos de bio/repositórios/README)
+# num índice local, consultado por descrição de vaga ou por "perfis parecidos com @login"
+INDICE_PERFIS_HABILITADO = _env_bool("INDICE_PERFIS_HABILITADO", True)
+INDICE_PERFIS_DB = os.getenv("INDICE_PERFIS_DB", str(DATA_DIR / "indice_perfis.sqlite3"))
+INDICE_PERFIS_PESO_LINGUAGENS = float(os.getenv("INDICE_PERFIS_PESO_LINGUAGENS", "0.6"))
+INDICE_PERFIS_README_MAX_CHARS = int(os.getenv("INDICE_PERFIS_README_MAX_CHARS", "5000"))
+INDICE_PERFIS_TOP_K_MAX = int(os.getenv("INDICE_PERFIS_TOP_K_MAX", "100"))
+
+# --- ESTATÍSTICAS COLUNARES DOS PERFIS ---
+# Estrelas, datas de push e bytes por linguagem de cada repositório coletado, em colunas
+# NumPy, para filtrar/agregar os perfis já conhecidos sem chamar o GitHub
+PERFIS_COLUNAR_HABILITADO = _env_bool("PERFIS_COLUNAR_HABILITADO", True)
+PERFIS_COLUNAR_DB = os.getenv("PERFIS_COLUNAR_DB", str(DATA_DIR / "perfis_colunar.sqlite3"))
+
+# --- FILA DE JOBS DE RANKING ---
+JOBS_DB = os.getenv("JOBS_DB", str(DATA_DIR / "jobs.sqlite3"))
+
+# Jobs processados ao mesmo tempo e candidatos analisados em paralelo dentro de cada job
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+JOBS_CONCORRENCIA_CANDIDATOS = int(os.getenv("JOBS_CONCORRENCIA_CANDIDATOS", "5"))
+
+# Um job em processamento sem sinal de vida do worker por este tempo (segundos) volta para
+# a fila (ex.: o processo dono caiu). Com um único processo, os jobs interrompidos voltam no startup.
+JOBS_LEASE_SEGUNDOS = float(os.getenv("JOBS_LEASE_SEGUNDOS", "60"))
+
+# Limite de candidatos por vaga no modo assíncrono
+JOBS_MAX_CANDIDATOS = int(os.getenv("JOBS_MAX_CANDIDATOS", "50"))
+
+# --- ANÁLISE EM LOTE ---
+LOTE_MAX_ITENS = int(os.getenv("LOTE_MAX_ITENS", "500"))
+
+# Perfis analisados ao mesmo tempo em /analisar-lote
+LOTE_CONCORRENCIA = int(os.getenv("LOTE_CONCORRENCIA", "5"))
+
+# --- RANKING ---
+# Candidatos (melhores no pré-ranking local) enviados ao modelo para o ranking final
+RANKING_TOP_K = int(os.getenv("RANKING_TOP_K", "5"))
+
+# Limite de candidatos por vaga no ranking síncrono (POST /ranking-vaga). Acima de
+# RANKING_TOP_K o modo map_reduce passa a valer; para mais candidatos, use a fila de jobs
+RANKING_MAX_CANDIDATOS = int(os.getenv("RANKING_MAX_CANDIDATOS", "10"))
+
+# Tamanho máximo (caracteres) do resumo de cada análise no prompt de ranking
+RANKING_RESUMO_MAX_CHARS = int(os.getenv("RANKING_RESUMO_MAX_CHARS", "1500"))
+
+# Como o ranking é gerado:
+# - "unico": pré-ranking local e uma chamada com os RANKING_TOP_K finalistas;
+# - "map_reduce": uma avaliação curta por candidato (em paralelo) e uma etapa de fusão;
+# - "auto": map_reduce quando há mais candidatos que RANKING_TOP_K.
+RANKING_MODO = os.getenv("RANKING_MODO", "unico")
+# Avaliações individuais (etapa "map") em andamento ao mesmo tempo, somando todos os rankings
+RANKING_MAPA_CONCORRENCIA = int(os.getenv("RANKING_MAPA_CONCORRENCIA", "16"))
+
+# --- ORÇAMENTO DE TOKENS DOS PROMPTS ---
+# Tokens de entrada por chamada; acima disso o prompt é cortado por prioridade
+ANALISE_MAX_TOKENS_ENTRADA = int(os.getenv("ANALISE_MAX_TOKENS_ENTRADA", "2500"))
+RANKING_MAX_TOKENS_ENTRADA = int(os.getenv("RANKING_MAX_TOKENS_ENTRADA", "4000"))
+
+# Tokens do README do perfil (já limpo de badges e HTML) enviados na análise
+ANALISE_README_MAX_TOKENS = int(os.getenv("ANALISE_README_MAX_TOKENS", "500"))
+
+# Onde o tiktoken guarda os arquivos BPE dos tokenizadores. Baixados uma vez (no aquecimento),
+# os próximos startups os leem do disco, sem acesso à rede
+TIKTOKEN_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", str(DATA_DIR / "tiktoken"))
+
+# --- SELEÇÃO DOS REPOSITÓRIOS DESTACADOS ---
+# "ia" (IA "Olheiro"), "local" (pontuação determinística, sem chamada à IA) ou
+# "hibrido" (a pontuação local pré-filtra e a IA escolhe). Pode ser trocado por requisição.
+SELECAO_REPOS_MODO = os.getenv("SELECAO_REPOS_MODO", "ia").strip().lower()
+
+# Repositórios enviados à IA no modo "hibrido"
+SELECAO_REPOS_PREFILTRO = int(os.getenv("SELECAO_REPOS_PREFILTRO", "12"))
+
+# Arquivo JSONL onde cada seleção feita pela IA é registrada (vazio = desligado).
+# Usado por tools/avaliar_selecao_repos.py para comparar com a pontuação local.
+SELECAO_REPOS_REGISTRO = os.getenv("SELECAO_REPOS_REGISTRO", "")
+
+# --- INICIALIZAÇÃO E PRONTIDÃO ---
+# Os clientes do GitHub e da OpenAI são criados no primeiro uso. Com o aquecimento ligado,
+# logo após o startup eles são criados em segundo plano (junto com a carga dos índices locais)
+# e GET /ready passa a responder 200 quando tudo estiver pronto.
+AQUECIMENTO_HABILITADO = _env_bool("AQUECIMENTO_HABILITADO", True)
+# Abre a conexão com o GitHub no aquecimento com uma chamada a /rate_limit (não gasta cota)
+AQUECIMENTO_GITHUB_CONSULTAR = _env_bool("AQUECIMENTO_GITHUB_CONSULTAR", True)
+
+# Orçamento (ms) do `import main` medido por tools/tempo_importacao.py
+IMPORTACAO_ORCAMENTO_MS = float(os.getenv("IMPORTACAO_ORCAMENTO_MS", "1000"))
@@ -1,4 +1,3 @@
-import os
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -11,12 +10,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.api.routes import router as api_router
+from app.ciclo_de_vida import ciclo_de_vida
+from app.services.telemetria import TelemetriaMiddleware
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 
 # Criação da aplicação FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=ciclo_de_vida)
 
 # Middleware para CORS
 app.add_middleware(
@@ -24,17 +25,22 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Métricas por requisição e cabeçalho Server-Timing
+app.add_middleware(TelemetriaMiddleware)
+
 # Ajuste do caminho para o diretório frontend
 BASE_DIR = Path(__file__).resolve().parent       # backend/
 PROJECT_ROOT = BASE_DIR.parent                   # github-analyzer-main/
 FRONTEND_DIR = PROJECT_ROOT / "frontend"         # github-analyzer-main/frontend
 
-print(f"Montando static em: {FRONTEND_DIR} (existe? {FRONTEND_DIR.exists()})")
-
-# Montagem da pasta estática
-app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+# Montagem da pasta estática (o backend também sobe sem o frontend, ex.: só a API)
+if FRONTEND_DIR.exists():
+    app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+else:
+    logging.warning(f"Pasta do frontend não encontrada em {FRONTEND_DIR}; /static não será servido.")
 
 # Rotas para os HTMLs principais
 def serve_html(file_name: str):
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "tools"))
+
+# Bancos locais (caches, histórico, índices) isolados por execução e credenciais falsas:
+# nenhuma chamada sai da máquina, o GitHub e a OpenAI são o tools/stub_server.py em processo
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="github-analyzer-testes-")
+os.environ["GITHUB_TOKEN"] = "token-de-teste"
+os.environ["OPENAI_API_KEY"] = "chave-de-teste"
+
+import stub_server  # noqa: E402
+from app.services import clientes  # noqa: E402
+from app.services.github_client import GitHubClient  # noqa: E402
+
+
+def criar_stub(*opcoes: str):
+    """App ASGI do stub, sem latência; `opcoes` seguem a linha de comando do tools/stub_server.py."""
+    args = stub_server.criar_parser().parse_args([
+        "--latencia-github", "0", "--latencia-openai", "0", "--jitter", "0", "--fixtures", "", *opcoes,
+    ])
+    return stub_server.criar_app(args)
+
+
+def cliente_para(transport: httpx.AsyncBaseTransport) -> GitHubClient:
+    return GitHubClient(["token-de-teste"], transport=transport)
+
+
+@pytest.fixture
+def stub():
+    return criar_stub()
+
+
+@pytest.fixture
+def github_stub(stub, monkeypatch):
+    """GitHubClient ligado ao stub e instalado como o cliente compartilhado do app."""
+    cliente = cliente_para(httpx.ASGITransport(app=stub))
+    monkeypatch.setattr(clientes, "_github", cliente)
+    yield cliente
+    asyncio.run(cliente.fechar())
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """AsyncOpenAI ligado ao stub (50 ms por resposta) e instalado como o cliente compartilhado do app."""
+    from openai import AsyncOpenAI
+
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=criar_stub("--latencia-openai", "50")))
+    cliente = AsyncOpenAI(api_key="chave-de-teste", base_url="http://stub/v1", http_client=http_client)
+    monkeypatch.setattr(clientes, "_openai", cliente)
+    yield cliente
+    asyncio.run(cliente.close())
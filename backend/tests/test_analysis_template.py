@@ -0,0 +1,21 @@
+from app.templates.analysis_template import renderizar_analise, renderizar_ranking
+
+
+def test_proximos_passos_em_texto_vira_um_passo():
+    html = renderizar_ranking({"proximos_passos": "Entrevistar @fulana"}, "Vaga", {})
+    assert html.count("Próximo Passo") == 1
+    assert "<strong>Próximo Passo 1:</strong> Entrevistar @fulana" in html
+
+
+def test_proximos_passos_em_lista():
+    html = renderizar_ranking({"proximos_passos": ["Entrevistar", "Teste técnico"]}, "Vaga", {})
+    assert "Próximo Passo 2:</strong> Teste técnico" in html
+
+
+def test_ranking_e_repositorios_com_um_objeto_so():
+    ranking = renderizar_ranking({"ranking": {"username": "fulana", "pontos_fortes": "APIs"}}, "Vaga", {"fulana": "Fulana"})
+    assert "1º - Fulana (@fulana)" in ranking
+
+    analise = renderizar_analise({"repositorios": {"nome": "api", "objetivo": "Pagamentos"}})
+    assert "<h3>api</h3>" in analise
+    assert "Nenhum repositório analisado." not in analise
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.services import clientes, github_service, profile_cache
+from conftest import cliente_para
+
+AGORA = datetime(2026, 10, 18, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: AGORA)
+    return AGORA - github_service.ATIVIDADE_RECENTE_DIAS * 86400
+
+
+@pytest.fixture
+def github_repos(monkeypatch):
+    """GitHub falso em que /users/{login}/repos devolve `repos[login]`; registra as chamadas."""
+    repos, chamadas = {}, []
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        chamadas.append(request.url.path)
+        login = request.url.path.split("/")[2]
+        return httpx.Response(200, json=repos.get(login, []))
+
+    cliente = cliente_para(httpx.MockTransport(responder))
+    monkeypatch.setattr(clientes, "_github", cliente)
+    yield repos, chamadas
+    asyncio.run(cliente.fechar())
+
+
+def _ativo(login: str, consultar: bool = True):
+    return asyncio.run(github_service._ativo_recentemente(login, consultar))
+
+
+def test_push_exatamente_no_limite_conta_como_ativo(relogio, github_repos):
+    asyncio.run(profile_cache.registrar_atividade("dev-no-limite", [_iso(relogio)], completo=False))
+    assert _ativo("dev-no-limite", consultar=False) is True
+
+    asyncio.run(profile_cache.registrar_atividade("dev-um-segundo-antes", [_iso(relogio - 1)], completo=True))
+    assert _ativo("dev-um-segundo-antes", consultar=False) is False
+    assert github_repos[1] == []
+
+
+def test_push_desconhecido_consulta_uma_vez(relogio, github_repos):
+    repos, chamadas = github_repos
+    repos["dev-desconhecido"] = [{"pushed_at": _iso(relogio + 86400)}]
+    assert _ativo("dev-desconhecido", consultar=False) is None
+    assert _ativo("dev-desconhecido") is True
+    assert chamadas == ["/users/dev-desconhecido/repos"]
+
+
+@pytest.mark.parametrize("repos_do_login", [[], [{"pushed_at": None}]], ids=["sem-repos", "sem-pushed-at"])
+def test_sem_data_de_push_e_inativo(relogio, github_repos, repos_do_login):
+    repos, chamadas = github_repos
+    login = f"dev-sem-push-{len(repos_do_login)}"
+    repos[login] = repos_do_login
+    assert _ativo(login) is False
+    # Listagem completa sem push: o cache decide nas próximas vezes, sem nova chamada
+    assert _ativo(login, consultar=False) is False
+    assert chamadas == [f"/users/{login}/repos"]
+
+
+def test_query_com_atividade_recente_usa_pushed_na_busca_de_repositorios(relogio):
+    caminho, query = github_service._query_busca(["Python"], 5, 10, True, "Recife", "django")
+    assert caminho == "/search/repositories"
+    assert query == "pushed:>=2026-07-20 language:Python django"
+
+    caminho, query = github_service._query_busca(["Python"], 5, 10, False, "Recife", "django")
+    assert caminho == "/search/users"
+    assert query == "language:Python repos:>=5 followers:>=10 location:Recife django"
+    assert "pushed:" not in query
+
+
+def test_busca_com_atividade_recente_so_devolve_perfis_ativos(github_stub):
+    candidatos = asyncio.run(github_service.buscar_candidatos_com_filtros(
+        linguagens=["Python"], atividade_recente=True, max_usuarios=10, top_k=5,
+    ))
+    assert candidatos
+    for dados in candidatos:
+        assert asyncio.run(github_service._ativo_recentemente(dados["login"], consultar=False)) is True
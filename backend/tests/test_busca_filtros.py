@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.services import github_service
+
+
+def _aprovados_na_ordem_da_busca(logins, linguagens, min_stars=0):
+    """Avalia todos os perfis, sem nenhum corte, na ordem da busca."""
+    async def avaliar():
+        aprovados = []
+        for login in logins:
+            user = await github_service.clientes.github().get_json(f"/users/{login}")
+            if not github_service._passa_filtros_baratos(user):
+                continue
+            processado = await github_service.processar_usuario_com_filtros(user, min_stars, linguagens)
+            if processado:
+                aprovados.append(processado)
+        return aprovados
+
+    aprovados = asyncio.run(avaliar())
+    return [dados["login"] for dados, _ in aprovados], aprovados
+
+
+def _por_pontuacao(aprovados, linguagens):
+    ordenados = sorted(aprovados, key=lambda item: (
+        -github_service.pontuar_candidato(item[0], item[1], linguagens), item[0]["login"].lower(),
+    ))
+    return [dados["login"] for dados, _ in ordenados]
+
+
+def _logins_da_busca(query: str, quantidade: int):
+    async def listar():
+        logins = []
+        async for item in github_service.clientes.github().paginar("/search/users", {"q": query, "per_page": quantidade}):
+            if len(logins) >= quantidade:
+                break
+            logins.append(item["login"])
+        return logins
+    return asyncio.run(listar())
+
+
+@pytest.mark.parametrize("top_k", [1, 3])
+def test_corte_devolve_os_melhores_pela_pontuacao(github_stub, top_k):
+    linguagens = ["Python"]
+    na_ordem, aprovados = _aprovados_na_ordem_da_busca(_logins_da_busca("language:Python", 15), linguagens)
+    esperado = _por_pontuacao(aprovados, linguagens)
+    assert len(esperado) > top_k
+    # O melhor não é o primeiro aprovado na ordem da busca (o corte antigo devolveria este)
+    assert na_ordem[0] != esperado[0]
+
+    obtidos = asyncio.run(github_service.buscar_candidatos_com_filtros(
+        linguagens=linguagens, max_usuarios=15, top_k=top_k,
+    ))
+    assert [d["login"] for d in obtidos] == esperado[:top_k]
+
+
+def test_pontuacao_usa_as_estrelas_numericas():
+    dados = {
+        "linguagens": {"Python": 2}, "seguidores": 0, "public_repos": 0,
+        "repos_detalhes": ["api - Sem descrição (Python) - ⭐ 1"],
+    }
+    assert github_service.pontuar_candidato(dados, 120, ["Python"]) > github_service.pontuar_candidato(dados, 0, ["Python"])
@@ -0,0 +1,39 @@
+import importlib
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services import clientes, prontidao
+
+
+@pytest.fixture
+def aquecimento_local(monkeypatch):
+    """Aquecimento sem chamadas externas, com o estado de prontidão zerado."""
+    async def pronto():
+        return None
+
+    monkeypatch.setattr(prontidao, "_componentes", {})
+    monkeypatch.setattr(prontidao, "_tarefa", None)
+    monkeypatch.setattr(prontidao, "_etapas", lambda: {"teste": pronto})
+
+
+def _esperar_pronto(cliente: TestClient) -> int:
+    for _ in range(50):
+        resposta = cliente.get("/ready")
+        if resposta.status_code == 200:
+            break
+        time.sleep(0.02)
+    return resposta.status_code
+
+
+@pytest.mark.parametrize("modulo", ["main", "app.main"])
+def test_pontos_de_entrada_rodam_o_ciclo_de_vida(modulo, aquecimento_local, github_stub):
+    app = importlib.import_module(modulo).app
+    with TestClient(app) as cliente:
+        assert _esperar_pronto(cliente) == 200
+        # Com a fila iniciada, um job inexistente é 404 (e não 500)
+        assert cliente.get("/ranking-vaga/jobs/inexistente").status_code == 404
+    assert clientes._github is None
+    assert routes.fila_ranking is not None
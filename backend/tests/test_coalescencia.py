@@ -0,0 +1,35 @@
+import asyncio
+
+from app.services import gpt_service
+
+REPOS_API = ["api - API de pagamentos (Python) - ⭐ 12"]
+REPOS_CLI = ["cli - Ferramenta de linha de comando (Go) - ⭐ 3"]
+
+
+def _analisar(repos_detalhes):
+    return gpt_service.gerar_analise_gpt(
+        "Fulana", "Backend", 10, 2, 5, {"Python": 3}, repos_detalhes,
+        login="fulana", usar_cache=False,
+    )
+
+
+def _executar_em_paralelo(*listas_de_repos):
+    antes = dict(gpt_service.voos_analise.contadores)
+
+    async def rodar():
+        return await asyncio.gather(*(_analisar(repos) for repos in listas_de_repos))
+
+    resultados = asyncio.run(rodar())
+    depois = gpt_service.voos_analise.contadores
+    return resultados, {chave: depois[chave] - antes[chave] for chave in ("executadas", "coalescidas")}
+
+
+def test_mesmo_login_com_outros_repositorios_nao_compartilha_a_analise(openai_stub):
+    _, contagem = _executar_em_paralelo(REPOS_API, REPOS_CLI)
+    assert contagem == {"executadas": 2, "coalescidas": 0}
+
+
+def test_mesmo_prompt_aguarda_a_mesma_chamada(openai_stub):
+    resultados, contagem = _executar_em_paralelo(REPOS_API, REPOS_API)
+    assert contagem == {"executadas": 1, "coalescidas": 1}
+    assert resultados[0] == resultados[1]
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.services import github_service, profile_cache
+
+
+def _coletar(monkeypatch, login: str, incremental: bool) -> dict:
+    monkeypatch.setattr(github_service, "PERFIL_INCREMENTAL_HABILITADO", incremental)
+    return asyncio.run(github_service._coletar_perfil_rest(login))
+
+
+def test_coleta_incremental_igual_a_completa(github_stub, monkeypatch):
+    login = "dev-incremental"
+    completa = _coletar(monkeypatch, login, incremental=False)
+    assert completa["repos"]
+
+    # Primeira coleta incremental: sem snapshot, tudo é consultado
+    assert _coletar(monkeypatch, login, incremental=True) == completa
+
+    # Segunda: nada mudou, tudo sai do snapshot
+    reaproveitados = profile_cache.contadores["repos_reaproveitados"]
+    assert _coletar(monkeypatch, login, incremental=True) == completa
+    assert profile_cache.contadores["repos_reaproveitados"] - reaproveitados == len(completa["repos"])
+
+
+def test_coleta_incremental_busca_de_novo_os_repos_com_push(github_stub, monkeypatch):
+    login = "dev-incremental-push"
+    completa = _coletar(monkeypatch, login, incremental=False)
+    _coletar(monkeypatch, login, incremental=True)
+
+    # Snapshot desatualizado em um repo no meio da lista: pushed_at antigo e detalhes que não valem mais
+    snapshot = asyncio.run(profile_cache.obter_repos(login))
+    alterado = completa["repos"][len(completa["repos"]) // 2]["nome"]
+    snapshot[alterado] = {**snapshot[alterado], "pushed_at": "2000-01-01T00:00:00Z",
+                          "linguagens": ["COBOL"], "bytes_linguagens": {"COBOL": 1}}
+    asyncio.run(profile_cache.salvar_repos(login, snapshot))
+
+    buscados = profile_cache.contadores["repos_buscados"]
+    assert _coletar(monkeypatch, login, incremental=True) == completa
+    assert profile_cache.contadores["repos_buscados"] - buscados == 1
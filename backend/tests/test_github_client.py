@@ -0,0 +1,27 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from conftest import cliente_para
+
+
+@pytest.mark.parametrize("retry_after, esperado", [
+    (lambda: "30", 30),
+    (lambda: formatdate(time.time() + 90, usegmt=True), 90),
+    (lambda: "depois", 60),
+], ids=["segundos", "data-http", "invalido"])
+def test_limite_secundario_aceita_retry_after_em_segundos_ou_data(monkeypatch, retry_after, esperado):
+    respostas = iter([
+        httpx.Response(403, headers={"Retry-After": retry_after()}, json={"message": "secondary rate limit"}),
+        httpx.Response(200, json={"login": "fulana"}),
+    ])
+    cliente = cliente_para(httpx.MockTransport(lambda request: next(respostas)))
+    bloqueios = []
+    monkeypatch.setattr(cliente.scheduler, "bloquear", lambda token, segundos: bloqueios.append(segundos))
+
+    assert asyncio.run(cliente.get_json("/users/fulana")) == {"login": "fulana"}
+    assert bloqueios == [pytest.approx(esperado, abs=2)]
+    asyncio.run(cliente.fechar())
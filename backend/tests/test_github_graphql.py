@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import httpx
+import stub_server
+
+from app.services import github_service
+from app.services.github_graphql import coletar_perfil_graphql
+from conftest import cliente_para
+
+
+def _login_com_readme(tem: bool) -> str:
+    return next(f"dev-gql-{i}" for i in range(100) if (stub_server._readme_perfil(f"dev-gql-{i}") is not None) == tem)
+
+
+def test_graphql_e_rest_coletam_o_mesmo_perfil(github_stub):
+    for login in (_login_com_readme(True), _login_com_readme(False)):
+        graphql = asyncio.run(coletar_perfil_graphql(github_stub, login, 30))
+        rest = asyncio.run(github_service._coletar_perfil_rest(login))
+        assert graphql["perfil"] == rest["perfil"]
+        assert graphql["repos"] == rest["repos"]
+
+
+def test_graphql_respeita_max_repos_e_ignora_o_repo_do_perfil(github_stub):
+    login = _login_com_readme(True)
+    coleta = asyncio.run(coletar_perfil_graphql(github_stub, login, 3))
+    esperados = [r["name"] for r in stub_server.gerar_repos(login) if not r["fork"] and r["name"] != login]
+    assert [r["nome"] for r in coleta["repos"]] == esperados[:3]
+    assert coleta["perfil"]["readme_text"] == stub_server._readme_perfil(login)
+
+
+def _github_falso(perfil_repo, readme_rest=None):
+    """Transporte com uma resposta GraphQL fixa e o endpoint REST de README; registra as chamadas."""
+    chamadas = []
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        chamadas.append(request.url.path)
+        if request.url.path == "/graphql":
+            login = json.loads(request.content)["variables"]["login"]
+            return httpx.Response(200, json={"data": {"user": {
+                "login": login, "name": None, "bio": None, "url": f"https://github.com/{login}",
+                "followers": {"totalCount": 1}, "following": {"totalCount": 0},
+                "publicRepos": {"totalCount": 0}, "profileRepo": perfil_repo,
+                "repositories": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []},
+            }}})
+        if request.url.path.endswith("/readme") and readme_rest is not None:
+            return httpx.Response(200, text=readme_rest)
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    return cliente_para(httpx.MockTransport(responder)), chamadas
+
+
+def test_readme_com_outro_nome_vem_pela_rest():
+    # Repositório do perfil existe, mas sem README.md (ex.: readme.md ou README.rst)
+    cliente, chamadas = _github_falso({"readme": None}, readme_rest="Olá em reStructuredText")
+    coleta = asyncio.run(coletar_perfil_graphql(cliente, "fulano", 10))
+    assert coleta["perfil"]["readme_text"] == "Olá em reStructuredText"
+    assert chamadas == ["/graphql", "/repos/fulano/fulano/readme"]
+
+
+def test_readme_md_nao_gera_chamada_rest():
+    cliente, chamadas = _github_falso({"readme": {"text": "# Fulano"}})
+    coleta = asyncio.run(coletar_perfil_graphql(cliente, "fulano", 10))
+    assert coleta["perfil"]["readme_text"] == "# Fulano"
+    assert chamadas == ["/graphql"]
+
+
+def test_sem_repositorio_de_perfil_nao_busca_readme():
+    cliente, chamadas = _github_falso(None)
+    coleta = asyncio.run(coletar_perfil_graphql(cliente, "fulano", 10))
+    assert coleta["perfil"]["readme_text"] == "Nenhum README de perfil público encontrado."
+    assert chamadas == ["/graphql"]
@@ -0,0 +1,58 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.services import historico
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = historico.HistoricoStore(str(tmp_path / "historico.sqlite3"), 30, 100)
+    monkeypatch.setattr(historico, "_store", store)
+    return store
+
+
+def _salvar(tipo, logins, html, snapshot=None):
+    async def gerar():
+        return html
+    return asyncio.run(historico.obter_ou_gerar(tipo, logins, tipo, snapshot or {"html": html}, gerar, titulo=html))
+
+
+def _listar(login):
+    itens, total = asyncio.run(historico.listar(login))
+    assert total == len(itens)
+    return itens
+
+
+def test_ranking_aparece_no_historico_de_cada_candidato(store):
+    id_perfil, _ = _salvar("perfil", ["Ana"], "<p>perfil</p>")
+    id_ranking, _ = _salvar("ranking", ["Bia", "Ana", "Caio"], "<p>ranking</p>", snapshot={"vaga": 1})
+
+    assert {item["id"] for item in _listar("ana")} == {id_perfil, id_ranking}
+    assert [item["id"] for item in _listar("CAIO")] == [id_ranking]
+    assert _listar("ana,bia,caio") == []
+
+    ranking = next(item for item in _listar("bia") if item["id"] == id_ranking)
+    assert ranking["logins"] == ["ana", "bia", "caio"]
+    assert asyncio.run(historico.obter(id_perfil))["login"] == "ana"
+
+    # O mesmo ranking em outra ordem de candidatos é servido pelo histórico
+    assert _salvar("ranking", ["caio", "ana", "bia"], "<p>outro</p>", snapshot={"vaga": 1}) == (id_ranking, "<p>ranking</p>")
+
+    asyncio.run(historico.remover(id_ranking))
+    assert _listar("bia") == []
+
+
+def test_rankings_salvos_antes_dos_participantes_sao_migrados(tmp_path):
+    caminho = str(tmp_path / "antigo.sqlite3")
+    historico.HistoricoStore(caminho, 30, 100)
+    with sqlite3.connect(caminho) as conn:
+        conn.execute("DROP TABLE participantes")
+        conn.execute(
+            "INSERT INTO analises VALUES ('r1', 'k1', 'ranking', 'ana,bia', 'ranking', NULL, 'h', 't', x'', 0, strftime('%s','now'), 0)"
+        )
+
+    store = historico.HistoricoStore(caminho, 30, 100)
+    itens, _ = store.listar("bia", None, 10, 0)
+    assert [(item["id"], item["login"], item["logins"]) for item in itens] == [("r1", "", ["ana", "bia"])]
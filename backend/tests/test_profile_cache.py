@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from app.services import profile_cache
+from conftest import cliente_para
+
+
+class TransporteContado(httpx.AsyncBaseTransport):
+    """Repassa ao stub e guarda o caminho de cada chamada."""
+
+    def __init__(self, app):
+        self._interno = httpx.ASGITransport(app=app)
+        self.chamadas = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.chamadas.append(request.url.path)
+        return await self._interno.handle_async_request(request)
+
+
+def test_etags_so_sao_buscados_para_perfis_ja_vistos(stub, monkeypatch):
+    transporte = TransporteContado(stub)
+    cliente = cliente_para(transporte)
+    coletas = []
+
+    async def buscar():
+        coletas.append(1)
+        return {"login": "dev-etag"}
+
+    def obter():
+        transporte.chamadas.clear()
+        asyncio.run(profile_cache.obter_perfil(cliente, "dev-etag", buscar))
+        return list(transporte.chamadas)
+
+    # Login novo: só a coleta, sem os GETs dos ETags
+    assert obter() == []
+    assert len(coletas) == 1
+
+    # TTL vencido, snapshot sem ETags: coleta de novo e agora busca os ETags
+    monkeypatch.setattr(profile_cache, "PERFIL_CACHE_TTL", 0)
+    assert sorted(obter()) == ["/users/dev-etag", "/users/dev-etag/repos"]
+    assert len(coletas) == 2
+
+    # Com ETags: revalida (304) e reaproveita o snapshot sem coletar
+    assert sorted(obter()) == ["/users/dev-etag", "/users/dev-etag/repos"]
+    assert len(coletas) == 2
+    asyncio.run(cliente.fechar())
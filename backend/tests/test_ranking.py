@@ -0,0 +1,39 @@
+import asyncio
+import re
+
+from app.models.schemas import CandidateDataForRanking, RankingInput
+from app.services import gpt_service
+from core.config import RANKING_MAX_CANDIDATOS, RANKING_TOP_K
+
+VAGA = "Desenvolvedor(a) backend Python com experiência em APIs, filas e bancos relacionais."
+
+
+def test_ranking_sincrono_aceita_candidatos_para_o_map_reduce():
+    urls = [f"dev-{i}" for i in range(RANKING_MAX_CANDIDATOS)]
+    assert RankingInput(jobDescription=VAGA, candidateUrls=urls, modoRanking="auto")
+    assert gpt_service.resolver_modo_ranking("auto", len(urls)) == "map_reduce"
+
+
+def test_listas_dos_demais_candidatos_continuam_a_numeracao(monkeypatch):
+    candidatos = [
+        CandidateDataForRanking(username=f"dev-{i}", nome=f"Dev {i}", html_url=f"https://github.com/dev-{i}",
+                                analise_html="<p>Backend Python</p>", linguagens={"Python": i + 1})
+        for i in range(RANKING_TOP_K + 4)
+    ]
+    sem_avaliacao = {"dev-0", "dev-1"}
+
+    async def avaliar(job_description, cand, pontuacao, usar_cache):
+        if cand.username in sem_avaliacao:
+            return None
+        nota = int(cand.username.split("-")[1])
+        return {"nota": nota, "pontos_fortes": "APIs", "pontos_a_observar": "-", "resumo": "-"}
+
+    async def fusao_indisponivel(*args, **kwargs):
+        raise RuntimeError("sem fusão")
+
+    monkeypatch.setattr(gpt_service, "_avaliar_candidato", avaliar)
+    monkeypatch.setattr(gpt_service, "_chat", fusao_indisponivel)
+    html = asyncio.run(gpt_service._ranking_map_reduce(VAGA, candidatos, usar_cache=False))
+
+    avaliados = len(candidatos) - len(sem_avaliacao)
+    assert [int(n) for n in re.findall(r'<ol start="(\d+)">', html)] == [RANKING_TOP_K + 1, avaliados + 1]
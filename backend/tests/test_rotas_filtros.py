@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def test_analisar_com_filtros_devolve_a_analise(github_stub, openai_stub):
+    # Sem o bloco `with`: só a rota, sem o ciclo de vida (fila de jobs e aquecimento)
+    resposta = TestClient(app).post("/analisar-com-filtros", json={"linguagens": ["Python"]})
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert "erro" not in corpo, corpo.get("erro")
+    assert "Perfil encontrado" in corpo["analise"]
+    assert "Erro ao Gerar Análise" not in corpo["analise"]
+
+
+def test_analisar_com_filtros_sem_filtros_e_400():
+    assert TestClient(app).post("/analisar-com-filtros", json={}).status_code == 400
@@ -0,0 +1,16 @@
+import tempo_importacao
+
+from core.config import IMPORTACAO_ORCAMENTO_MS
+
+
+def test_import_main_dentro_do_orcamento_e_sem_o_sdk_da_openai():
+    medicoes = [tempo_importacao.medir("main") for _ in range(3)]
+    total, falhas = tempo_importacao.verificar(medicoes, "main", IMPORTACAO_ORCAMENTO_MS, ["openai"])
+    assert not falhas, f"import main: {total:.0f}ms; " + "; ".join(falhas)
+
+
+def test_verificar_acusa_orcamento_estourado_e_modulo_proibido():
+    medicoes = [{"main": (10, 1_500_000, 0), "openai": (5, 900_000, 1)}]
+    total, falhas = tempo_importacao.verificar(medicoes, "main", 1000, ["openai"])
+    assert total == 1500
+    assert len(falhas) == 2
@@ -0,0 +1,107 @@
+"""
+Compara a pontuação local de repositórios (app/services/repo_scorer.py) com as
+seleções feitas pela IA "Olheiro" e mede o custo de cada uma.
+
+As seleções da IA são gravadas pelo backend quando SELECAO_REPOS_REGISTRO aponta
+para um arquivo JSONL (uma linha por perfil analisado nos modos "ia"/"hibrido").
+
+Uso (a partir de backend/):
+    python tools/avaliar_selecao_repos.py data/selecoes.jsonl
+    python tools/avaliar_selecao_repos.py data/selecoes.jsonl --prefiltro 12 --repeticoes 200
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.repo_scorer import ranquear_repositorios, selecionar_repositorios_local  # noqa: E402
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def carregar(caminho: Path):
+    registros = []
+    with caminho.open(encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha:
+                registros.append(json.loads(linha))
+    return registros
+
+
+def avaliar(registros, prefiltro: int, repeticoes: int) -> dict:
+    concordancia, jaccard, cobertura_prefiltro = [], [], []
+    identicos = 0
+    latencias_ia = []
+    tempos_local = []
+
+    for registro in registros:
+        repos = registro["repos"]
+        nomes = {repo["nome"] for repo in repos}
+        escolhidos_ia = [nome for nome in registro["selecionados"] if nome in nomes]
+        if not escolhidos_ia:
+            continue
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            escolhidos_local = selecionar_repositorios_local(repos, quantidade=len(escolhidos_ia))
+        tempos_local.append((time.perf_counter() - inicio) / repeticoes)
+
+        ia, local = set(escolhidos_ia), set(escolhidos_local)
+        concordancia.append(len(ia & local) / len(ia))
+        jaccard.append(len(ia & local) / len(ia | local))
+        identicos += ia == local
+
+        # Quanto das escolhas da IA sobrevive ao pré-filtro do modo "hibrido"
+        melhores = {repo["nome"] for repo, _ in ranquear_repositorios(repos)[:prefiltro]}
+        cobertura_prefiltro.append(len(ia & melhores) / len(ia))
+
+        latencias_ia.append(registro.get("latencia", 0.0))
+
+    n = len(concordancia)
+    if not n:
+        return {"perfis": 0}
+    return {
+        "perfis": n,
+        "concordancia_media": round(statistics.mean(concordancia), 3),
+        "jaccard_medio": round(statistics.mean(jaccard), 3),
+        "selecoes_identicas": round(identicos / n, 3),
+        f"cobertura_prefiltro_top{prefiltro}": round(statistics.mean(cobertura_prefiltro), 3),
+        "latencia_ia_ms": {
+            "p50": round(_percentil(latencias_ia, 50) * 1000, 1),
+            "p95": round(_percentil(latencias_ia, 95) * 1000, 1),
+        },
+        "latencia_local_ms": {
+            "p50": round(_percentil(tempos_local, 50) * 1000, 3),
+            "p95": round(_percentil(tempos_local, 95) * 1000, 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("registro", type=Path, help="arquivo JSONL gerado com SELECAO_REPOS_REGISTRO")
+    parser.add_argument("--prefiltro", type=int, default=12, help="tamanho do pré-filtro do modo 'hibrido'")
+    parser.add_argument("--repeticoes", type=int, default=100, help="repetições para medir a pontuação local")
+    args = parser.parse_args()
+
+    registros = carregar(args.registro)
+    relatorio = {"geral": avaliar(registros, args.prefiltro, args.repeticoes)}
+    for modo in sorted({r.get("modo", "ia") for r in registros}):
+        relatorio[modo] = avaliar([r for r in registros if r.get("modo", "ia") == modo], args.prefiltro, args.repeticoes)
+
+    print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark ponta a ponta dos endpoints do backend.
+
+Mede latência (p50/p95/p99), requisições por segundo e chamadas feitas ao GitHub e à
+OpenAI por requisição (lidas dos contadores do tools/stub_server.py).
+
+Uso (a partir de backend/, com o stub e o backend já rodando):
+    python tools/stub_server.py --porta 9000 &
+    GITHUB_API_URL=http://127.0.0.1:9000 GITHUB_GRAPHQL_URL=http://127.0.0.1:9000/graphql \\
+        OPENAI_BASE_URL=http://127.0.0.1:9000/v1 uvicorn main:app --port 8000 &
+    python tools/benchmark.py --requisicoes 50 --concorrencia 10
+
+Por padrão cada requisição usa um login diferente (sem acertos de cache); `--logins N`
+faz as requisições se repetirem entre N logins para medir o caminho com cache.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+import httpx
+
+VAGA = (
+    "Desenvolvedor(a) backend Python com experiência em FastAPI, filas, bancos relacionais, "
+    "Docker e observabilidade. Desejável conhecimento em Go e em pipelines de dados."
+)
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _payloads(prefixo: str, logins: int) -> Dict[str, Callable[[int], dict]]:
+    def login(i: int) -> str:
+        return f"{prefixo}-{i % logins if logins else i}"
+
+    return {
+        "/analisar-perfil": lambda i: {"usernameOrUrl": login(i), "contexto": "recrutamento"},
+        "/ranking-vaga": lambda i: {"jobDescription": VAGA, "candidateUrls": [login(i * 5 + k) for k in range(5)]},
+        "/analisar-com-filtros": lambda i: {"linguagens": ["Python"], "minFollowers": 1, "habilidades": [f"{prefixo}{i % (logins or 10**9)}"]},
+    }
+
+
+async def _contadores(stub: httpx.AsyncClient) -> Dict[str, int]:
+    try:
+        return (await stub.get("/_stub/contadores")).json()
+    except httpx.HTTPError:
+        return {}
+
+
+async def medir(
+    api: httpx.AsyncClient, stub: httpx.AsyncClient, endpoint: str, payload: Callable[[int], dict],
+    requisicoes: int, concorrencia: int,
+) -> dict:
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias, status = [], {}
+
+    async def uma(i: int):
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                resposta = await api.post(endpoint, json=payload(i))
+                codigo = str(resposta.status_code)
+            except httpx.HTTPError as e:
+                codigo = type(e).__name__
+            latencias.append(time.perf_counter() - inicio)
+            status[codigo] = status.get(codigo, 0) + 1
+
+    antes = await _contadores(stub)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma(i) for i in range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+    depois = await _contadores(stub)
+
+    github = sum(depois.get(k, 0) - antes.get(k, 0) for k in depois if k.startswith("github_"))
+    openai = depois.get("openai", 0) - antes.get("openai", 0)
+    return {
+        "endpoint": endpoint,
+        "requisicoes": requisicoes,
+        "status": status,
+        "p50_ms": round(_percentil(latencias, 50) * 1000, 1),
+        "p95_ms": round(_percentil(latencias, 95) * 1000, 1),
+        "p99_ms": round(_percentil(latencias, 99) * 1000, 1),
+        "media_ms": round(statistics.mean(latencias) * 1000, 1) if latencias else 0.0,
+        "rps": round(requisicoes / duracao, 2) if duracao else 0.0,
+        "github_por_req": round(github / requisicoes, 2),
+        "openai_por_req": round(openai / requisicoes, 2),
+    }
+
+
+def _tabela(resultados: List[dict]) -> str:
+    colunas = ["endpoint", "requisicoes", "p50_ms", "p95_ms", "p99_ms", "rps", "github_por_req", "openai_por_req", "status"]
+    linhas = [colunas] + [[str(r[c]) for c in colunas] for r in resultados]
+    larguras = [max(len(linha[i]) for linha in linhas) for i in range(len(colunas))]
+    return "\n".join("  ".join(valor.ljust(larguras[i]) for i, valor in enumerate(linha)) for linha in linhas)
+
+
+async def executar(args) -> List[dict]:
+    prefixo = args.prefixo or f"bench-{uuid.uuid4().hex[:6]}"
+    payloads = _payloads(prefixo, args.logins)
+    endpoints = list(payloads) if args.endpoint == "todos" else [args.endpoint]
+
+    resultados = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as api, \
+            httpx.AsyncClient(base_url=args.stub, timeout=10) as stub:
+        for endpoint in endpoints:
+            if args.aquecimento:
+                await medir(api, stub, endpoint, payloads[endpoint], args.aquecimento, args.concorrencia)
+            resultados.append(await medir(api, stub, endpoint, payloads[endpoint], args.requisicoes, args.concorrencia))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL do backend")
+    parser.add_argument("--stub", default="http://127.0.0.1:9000", help="URL do stub (para contar chamadas)")
+    parser.add_argument("--endpoint", default="todos",
+                        choices=["todos", "/analisar-perfil", "/ranking-vaga", "/analisar-com-filtros"])
+    parser.add_argument("--requisicoes", type=int, default=20)
+    parser.add_argument("--concorrencia", type=int, default=5)
+    parser.add_argument("--aquecimento", type=int, default=0, help="requisições descartadas antes da medição")
+    parser.add_argument("--logins", type=int, default=0, help="repete as requisições entre N logins (0 = todos distintos)")
+    parser.add_argument("--prefixo", default="", help="prefixo dos logins sintéticos (padrão: aleatório por execução)")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(executar(args))
+    print(json.dumps(resultados, ensure_ascii=False, indent=2) if args.json else _tabela(resultados))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Compara os filtros da busca (linguagens, minStars, minRepos, minFollowers, atividadeRecente)
+e a agregação de linguagens sobre perfis já coletados em dois caminhos:
+- dicionários: um laço em Python por perfil/repositório, como em processar_usuario_com_filtros;
+- colunar: app/services/perfis_colunar.py (máscaras NumPy sobre todas as colunas).
+
+Os perfis são sintéticos (sem GitHub e sem SQLite) e os dois caminhos precisam devolver o
+mesmo resultado.
+
+Uso (a partir de backend/):
+    python tools/benchmark_filtros.py --perfis 100000 --repeticoes 20
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.perfis_colunar import PerfisColunar, registro_do_perfil  # noqa: E402
+from core.config import ATIVIDADE_RECENTE_DIAS  # noqa: E402
+
+LINGUAGENS = [
+    "Python", "JavaScript", "TypeScript", "Go", "Rust", "Java", "Kotlin", "C", "C++", "C#",
+    "Ruby", "PHP", "Shell", "HTML", "CSS", "Scala", "Elixir", "Haskell", "Swift", "Dart",
+]
+
+CENARIOS = {
+    "linguagem": {"linguagens": ["Rust"]},
+    "estrelas+seguidores": {"min_stars": 50, "min_followers": 100},
+    "completo": {"linguagens": ["Python", "Go"], "min_stars": 10, "min_repos": 5,
+                 "min_followers": 20, "atividade_recente": True},
+}
+
+
+def gerar_perfis(quantidade: int, semente: int):
+    aleatorio = random.Random(semente)
+    agora = datetime.now(timezone.utc)
+    perfis = []
+    for i in range(quantidade):
+        repos = []
+        for _ in range(aleatorio.randint(0, 30)):
+            linguagens = aleatorio.sample(LINGUAGENS, aleatorio.randint(0, 3))
+            pushed_at = agora - timedelta(days=aleatorio.expovariate(1 / 200))
+            repos.append({
+                "stars": int(aleatorio.paretovariate(1.5)) - 1,
+                "pushed_at": pushed_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "bytes_linguagens": {lang: aleatorio.randint(100, 200_000) for lang in linguagens},
+            })
+        perfis.append({
+            "login": f"dev-{i}",
+            "seguidores": int(aleatorio.paretovariate(1.2)) - 1,
+            "public_repos": len(repos) + aleatorio.randint(0, 10),
+            "repos": repos,
+        })
+    return perfis
+
+
+def filtrar_dicionarios(perfis, linguagens=None, min_stars=0, min_repos=0, min_followers=0,
+                        atividade_recente=False, limite=50, top_linguagens=10):
+    limite_push = time.time() - ATIVIDADE_RECENTE_DIAS * 86400
+    filtro = {lang.lower() for lang in linguagens or []}
+    aprovados = []
+    por_linguagem = Counter()
+    for perfil in perfis:
+        if perfil["seguidores"] < min_followers or perfil["public_repos"] < min_repos:
+            continue
+        total_stars = 0
+        ultimo_push = 0.0
+        tem_linguagem = not filtro
+        bytes_perfil = {}
+        for repo in perfil["repos"]:
+            total_stars += repo["stars"]
+            push = datetime.fromisoformat(repo["pushed_at"].replace("Z", "+00:00")).timestamp()
+            ultimo_push = max(ultimo_push, push)
+            for lang, qtd in repo["bytes_linguagens"].items():
+                if lang.lower() in filtro:
+                    tem_linguagem = True
+                bytes_perfil[lang] = bytes_perfil.get(lang, 0) + qtd
+        if total_stars < min_stars or not tem_linguagem:
+            continue
+        if atividade_recente and ultimo_push < limite_push:
+            continue
+        aprovados.append((total_stars, perfil["login"]))
+        por_linguagem.update(bytes_perfil)
+
+    # Mesma ordem do caminho colunar: mais estrelas primeiro, empate pela ordem de inserção
+    aprovados = sorted(aprovados, key=lambda item: -item[0])
+    total_bytes = sum(por_linguagem.values()) or 1
+    return {
+        "total": len(aprovados),
+        "perfis": [login for _, login in aprovados[:limite]],
+        "linguagens": {lang: round(qtd / total_bytes, 4) for lang, qtd in por_linguagem.most_common(top_linguagens)},
+    }
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--perfis", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.perfis} perfis sintéticos...")
+    perfis = gerar_perfis(args.perfis, args.semente)
+
+    inicio = time.perf_counter()
+    store = PerfisColunar()
+    for perfil in perfis:
+        store.adicionar(perfil["login"], registro_do_perfil(perfil, perfil["repos"]))
+    print(f"Carga das colunas: {time.perf_counter() - inicio:.2f}s ({store.estatisticas()})")
+    print()
+
+    print(f"{'cenário':<22} {'aprovados':>9}  {'dicionários':>12}  {'colunar':>10}  {'ganho':>7}")
+    for nome, filtros in CENARIOS.items():
+        esperado = filtrar_dicionarios(perfis, **filtros)
+        obtido = store.filtrar(**filtros)
+        logins = [p["login"] for p in obtido["perfis"]]
+        if (obtido["total"], logins) != (esperado["total"], esperado["perfis"]):
+            raise SystemExit(f"Resultados diferentes no cenário '{nome}'")
+
+        # Poucas repetições no caminho lento; o colunar é medido com todas
+        ms_dict = _medir(lambda: filtrar_dicionarios(perfis, **filtros), max(1, args.repeticoes // 5))
+        ms_col = _medir(lambda: store.filtrar(**filtros), args.repeticoes)
+        print(f"{nome:<22} {obtido['total']:>9}  {ms_dict:>10.1f}ms  {ms_col:>8.2f}ms  {ms_dict / ms_col:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Sobe o backend com um ou mais workers do uvicorn.
+
+Com --workers > 1 cada worker é um processo separado e o modo MULTIPROCESSO é ligado:
+buscas e análises idênticas são coalescidas entre os processos e a cota do GitHub é
+contabilizada em conjunto (estado compartilhado em SQLite no DATA_DIR). Os caches de
+perfis, respostas da IA, histórico e a fila de jobs já ficam no SQLite e são vistos por
+todos os workers; as métricas de GET /metrics são somadas entre os processos.
+
+Uso (a partir de backend/):
+    python tools/servidor.py --workers 4 --porta 8000
+"""
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos (padrão: número de CPUs)")
+    parser.add_argument("--app", default="main:app", help="aplicação ASGI (módulo:atributo)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    if args.workers > 1:
+        # Lido por core.config em cada worker (os processos herdam o ambiente)
+        os.environ["MULTIPROCESSO"] = "true"
+        from core.config import DATA_DIR
+
+        # O prometheus_client exige um diretório limpo a cada início
+        metricas_dir = Path(os.getenv("PROMETHEUS_MULTIPROC_DIR", DATA_DIR / "prometheus"))
+        shutil.rmtree(metricas_dir, ignore_errors=True)
+        metricas_dir.mkdir(parents=True, exist_ok=True)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(metricas_dir)
+
+    import uvicorn
+
+    uvicorn.run(args.app, host=args.host, port=args.porta, workers=args.workers, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""
+Servidor local que imita a API do GitHub (REST + GraphQL) e a da OpenAI, para medir
+o backend sem gastar cota real.
+
+Modos:
+- sintetico  (padrão) perfis e repositórios gerados de forma determinística a partir do login;
+- gravar     repassa as chamadas às APIs reais e salva cada resposta em `--fixtures`;
+- reproduzir responde com as respostas gravadas (o que faltar cai no modo sintético).
+
+Injeção de falhas: latência (`--latencia-github`, `--latencia-openai`, `--ms-por-token`, `--jitter`), cota por
+token (`--cota`, `--janela`), limites secundários (`--taxa-limite-secundario`) e erros 502 (`--taxa-erro`).
+
+Uso (a partir de backend/):
+    python tools/stub_server.py --porta 9000 --latencia-github 80 --latencia-openai 1500
+
+e aponte o backend para ele:
+    GITHUB_API_URL=http://127.0.0.1:9000
+    GITHUB_GRAPHQL_URL=http://127.0.0.1:9000/graphql
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1
+
+`GET /_stub/contadores` devolve as chamadas recebidas por API; `POST /_stub/zerar` zera os contadores.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+GITHUB_REAL = "https://api.github.com"
+OPENAI_REAL = "https://api.openai.com"
+
+# Cabeçalhos das respostas reais que valem a pena gravar
+_CABECALHOS_GRAVADOS = {"content-type", "etag", "link", "retry-after"} | {
+    f"x-ratelimit-{c}" for c in ("limit", "remaining", "reset", "used", "resource")
+}
+
+_LINGUAGENS = ["Python", "JavaScript", "TypeScript", "Go", "Rust", "Java", "C#", "C++", "Ruby", "PHP", "Shell", "HTML", "CSS"]
+_TEMAS = ["api", "cli", "bot", "dashboard", "compilador", "scraper", "pipeline", "jogo", "site", "sdk", "crawler", "chat"]
+_TOPICOS = ["fastapi", "react", "docker", "kubernetes", "ml", "data", "devops", "testing", "graphql", "aws"]
+
+
+# ==============================================================================
+# DADOS SINTÉTICOS
+# ==============================================================================
+def _rng(*partes) -> random.Random:
+    semente = hashlib.sha256("|".join(map(str, partes)).encode()).hexdigest()
+    return random.Random(int(semente[:16], 16))
+
+
+def gerar_usuario(login: str) -> dict:
+    rng = _rng("usuario", login)
+    return {
+        "login": login,
+        "type": "User",
+        "name": login.replace("-", " ").title(),
+        "html_url": f"https://github.com/{login}",
+        "bio": rng.choice(["Backend developer", "Engenheira de dados", "Full-stack dev", None]),
+        "location": rng.choice(["São Paulo", "Recife", "Lisboa", "Remote", None]),
+        "followers": rng.randint(0, 800),
+        "following": rng.randint(0, 200),
+        "public_repos": rng.randint(5, 40),
+    }
+
+
+def gerar_repos(login: str) -> list:
+    rng = _rng("repos", login)
+    # Último push entre hoje e um ano atrás, conforme o login (para o filtro de atividade recente)
+    hoje = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    agora = hoje - timedelta(days=_rng("atividade", login).randint(0, 365))
+    repos = []
+    for i in range(gerar_usuario(login)["public_repos"]):
+        tema = rng.choice(_TEMAS)
+        nome = f"{tema}-{i}" if rng.random() > 0.1 else "hello-world" if i == 0 else f"exercicio-{i}"
+        langs = rng.sample(_LINGUAGENS, rng.randint(1, 4))
+        repos.append({
+            "name": nome,
+            "full_name": f"{login}/{nome}",
+            "fork": rng.random() < 0.1,
+            "description": rng.choice([None, f"Um {tema} escrito em {langs[0]}", f"{tema.title()} com testes, CI e documentação"]),
+            "stargazers_count": int(rng.paretovariate(1.5)) - 1,
+            "size": rng.randint(10, 50000),
+            "topics": rng.sample(_TOPICOS, rng.randint(0, 3)),
+            "pushed_at": (agora - timedelta(days=i * rng.randint(3, 40))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "_linguagens": {lang: rng.randint(500, 200000) for lang in langs},
+            "_tem_readme": rng.random() < 0.7,
+        })
+    return repos
+
+
+def _publico(repo: dict) -> dict:
+    return {k: v for k, v in repo.items() if not k.startswith("_")}
+
+
+def _repo(owner: str, nome: str) -> Optional[dict]:
+    return next((r for r in gerar_repos(owner) if r["name"] == nome), None)
+
+
+def _readme_perfil(login: str) -> Optional[str]:
+    if _rng("readme", login).random() < 0.5:
+        return f"# Olá, eu sou {login}\n\nTrabalho com APIs, dados e automação."
+    return None
+
+
+def _resposta_graphql(variaveis: dict) -> dict:
+    """Responde no formato do PERFIL_QUERY de app/services/github_graphql.py."""
+    login = variaveis["login"]
+    usuario = gerar_usuario(login)
+    repos = [r for r in gerar_repos(login) if not r["fork"]]
+    inicio = int(variaveis.get("after") or 0)
+    pagina = repos[inicio:inicio + variaveis["pageSize"]]
+    readme = _readme_perfil(login)
+    return {"data": {"user": {
+        "login": login,
+        "name": usuario["name"],
+        "bio": usuario["bio"],
+        "url": usuario["html_url"],
+        "followers": {"totalCount": usuario["followers"]},
+        "following": {"totalCount": usuario["following"]},
+        "publicRepos": {"totalCount": usuario["public_repos"]},
+        "profileRepo": {"readme": {"text": readme}} if readme else None,
+        "repositories": {
+            "pageInfo": {"hasNextPage": inicio + len(pagina) < len(repos), "endCursor": str(inicio + len(pagina))},
+            "nodes": [{
+                "name": r["name"],
+                "description": r["description"],
+                "stargazerCount": r["stargazers_count"],
+                "diskUsage": r["size"],
+                "pushedAt": r["pushed_at"],
+                "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in r["topics"]]},
+                "languages": {"edges": [{"size": b, "node": {"name": l}} for l, b in r["_linguagens"].items()]},
+                "root": {"entries": [{"name": "README.md"}] if r["_tem_readme"] else [{"name": "src"}]},
+            } for r in pagina],
+        },
+    }}}
+
+
+# ==============================================================================
+# OPENAI SINTÉTICA
+# ==============================================================================
+def _conteudo_openai(prompt: str, formato_json: bool = False) -> str:
+    if "Responda APENAS com uma lista JSON" in prompt:
+        # IA "Olheiro": devolve os 5 primeiros nomes da lista enviada
+        bloco = prompt.split("---")[1] if prompt.count("---") >= 2 else ""
+        nomes = [linha.split(" - ")[0].strip() for linha in bloco.strip().splitlines() if linha.strip()]
+        return json.dumps(nomes[:5])
+    if formato_json and "Avalie a aderência de UM candidato" in prompt:
+        username = re.search(r"CANDIDATO: .*? \(@([^)]+)\)", prompt).group(1)
+        return json.dumps({
+            "nota": _rng("nota", username).randint(20, 95),
+            "pontos_fortes": "Ponto forte simulado. " * 3, "pontos_a_observar": "Ponto simulado. " * 2,
+            "resumo": "Resumo simulado da aderência.",
+        }, ensure_ascii=False)
+    if formato_json and "AVALIAÇÕES:" in prompt:
+        return json.dumps({
+            "ordem": re.findall(r"^- @([^ |]+) \|", prompt, re.M),
+            "justificativa": "Justificativa simulada do ranking. " * 10,
+            "proximos_passos": ["Passo 1", "Passo 2", "Passo 3"],
+        }, ensure_ascii=False)
+    if formato_json and "ANÁLISES DOS CANDIDATOS FINALISTAS" in prompt:
+        usernames = re.findall(r"--- CANDIDATO \d+: .*? \(@([^)]+)\) ---", prompt)
+        return json.dumps({
+            "ranking": [{"username": u, "pontos_fortes": "Ponto forte simulado. " * 6, "pontos_a_observar": "Ponto simulado. " * 4}
+                        for u in usernames],
+            "justificativa": "Justificativa simulada do ranking. " * 10,
+            "proximos_passos": ["Passo 1", "Passo 2", "Passo 3"],
+        }, ensure_ascii=False)
+    if formato_json:
+        texto = "Trecho da análise simulada do perfil. " * 4
+        repos = [{"nome": f"repo-{i}", "objetivo": texto, "analise_tecnica": texto, "qualidade": texto, "senioridade": texto,
+                  "bem_feito": texto, "melhoria": texto, "proximo_nivel": texto} for i in range(5)]
+        return json.dumps({
+            "resumo": texto, "veredito": {"nivel": "recomendado", "texto": texto}, "repositorios": repos,
+            "pontos_fortes": texto, "plano_acao": texto,
+        }, ensure_ascii=False)
+    paragrafos = "".join(f"<p>Trecho {i} da análise simulada do perfil.</p>" for i in range(40))
+    return f'<div style="border: 1px solid #30363d;"><h2>Análise simulada</h2>{paragrafos}</div>'
+
+
+def _uso(prompt: str, conteudo: str) -> dict:
+    entrada, saida = len(prompt) // 4, len(conteudo) // 4
+    return {"prompt_tokens": entrada, "completion_tokens": saida, "total_tokens": entrada + saida}
+
+
+# ==============================================================================
+# SERVIDOR
+# ==============================================================================
+class Stub:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.semente)
+        self.contadores = Counter()
+        self.cotas = {}
+        self.fixtures = Path(args.fixtures) if args.fixtures else None
+        self.http = httpx.AsyncClient(timeout=60)
+
+    # --- falhas injetadas ---
+    async def _latencia(self, ms: float):
+        if ms > 0:
+            fator = 1 + self.rng.uniform(-self.args.jitter, self.args.jitter)
+            await asyncio.sleep(max(ms * fator, 0) / 1000)
+
+    def _cota(self, token: str, recurso: str) -> dict:
+        agora = time.time()
+        cota = self.cotas.get((token, recurso))
+        if cota is None or agora >= cota["reset"]:
+            cota = {"restante": self.args.cota, "reset": agora + self.args.janela}
+            self.cotas[(token, recurso)] = cota
+        return cota
+
+    def _cabecalhos_cota(self, cota: dict, recurso: str) -> dict:
+        return {
+            "X-RateLimit-Limit": str(self.args.cota),
+            "X-RateLimit-Remaining": str(max(cota["restante"], 0)),
+            "X-RateLimit-Reset": str(int(cota["reset"])),
+            "X-RateLimit-Resource": recurso,
+        }
+
+    # --- gravação / reprodução ---
+    def _chave(self, request: Request, corpo: bytes) -> str:
+        base = f"{request.method} {request.url.path}?{urlencode(sorted(request.query_params.items()))}"
+        return hashlib.sha256(base.encode() + b"\n" + corpo).hexdigest()
+
+    def _ler_fixture(self, chave: str, base: str) -> Optional[Response]:
+        arquivo = self.fixtures / f"{chave}.json"
+        if not arquivo.exists():
+            return None
+        gravada = json.loads(arquivo.read_text(encoding="utf-8"))
+        cabecalhos = {k: v.replace(GITHUB_REAL, base) for k, v in gravada["cabecalhos"].items()}
+        return Response(gravada["corpo"].encode("utf-8"), status_code=gravada["status"], headers=cabecalhos)
+
+    async def _gravar(self, request: Request, corpo: bytes, chave: str, upstream: str) -> Response:
+        cabecalhos = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "content-length", "accept-encoding")}
+        resposta = await self.http.request(
+            request.method, upstream + request.url.path, params=request.query_params, content=corpo, headers=cabecalhos
+        )
+        salvos = {k: v for k, v in resposta.headers.items() if k.lower() in _CABECALHOS_GRAVADOS}
+        self.fixtures.mkdir(parents=True, exist_ok=True)
+        (self.fixtures / f"{chave}.json").write_text(json.dumps({
+            "requisicao": f"{request.method} {request.url.path}",
+            "status": resposta.status_code,
+            "cabecalhos": salvos,
+            "corpo": resposta.text,
+        }, ensure_ascii=False), encoding="utf-8")
+        base = str(request.base_url).rstrip("/")
+        return Response(resposta.content, status_code=resposta.status_code,
+                        headers={k: v.replace(GITHUB_REAL, base) for k, v in salvos.items()})
+
+    # --- GitHub ---
+    async def github(self, request: Request, corpo: bytes) -> Response:
+        caminho = request.url.path
+        recurso = "graphql" if caminho == "/graphql" else "search" if caminho.startswith("/search/") else "core"
+        self.contadores[f"github_{recurso}"] += 1
+        if self.args.modo == "gravar":
+            return await self._gravar(request, corpo, self._chave(request, corpo), GITHUB_REAL)
+        await self._latencia(self.args.latencia_github)
+
+        if self.rng.random() < self.args.taxa_erro:
+            self.contadores["erros_injetados"] += 1
+            return JSONResponse({"message": "Server Error (injetado)"}, status_code=502)
+        if self.rng.random() < self.args.taxa_limite_secundario:
+            self.contadores["limites_secundarios_injetados"] += 1
+            return JSONResponse({"message": "secondary rate limit (injetado)"}, status_code=403, headers={"Retry-After": "1"})
+
+        token = request.headers.get("authorization", "anonimo")
+        cota = self._cota(token, recurso)
+        if cota["restante"] <= 0:
+            self.contadores["cota_esgotada"] += 1
+            return JSONResponse({"message": "API rate limit exceeded"}, status_code=403,
+                                headers=self._cabecalhos_cota(cota, recurso))
+
+        resposta = await self._responder_github(request, corpo)
+        # Como na API real, 304 e /rate_limit não gastam cota
+        if resposta.status_code != 304 and caminho != "/rate_limit":
+            cota["restante"] -= 1
+        resposta.headers.update(self._cabecalhos_cota(cota, recurso))
+        return resposta
+
+    async def _responder_github(self, request: Request, corpo: bytes) -> Response:
+        base = str(request.base_url).rstrip("/")
+        if self.args.modo == "reproduzir":
+            gravada = self._ler_fixture(self._chave(request, corpo), base)
+            if gravada is not None:
+                return gravada
+            self.contadores["fixtures_faltando"] += 1
+        return self._github_sintetico(request, corpo, base)
+
+    def _github_sintetico(self, request: Request, corpo: bytes, base: str) -> Response:
+        caminho, params = request.url.path, request.query_params
+
+        if caminho == "/graphql":
+            return JSONResponse(_resposta_graphql(json.loads(corpo)["variables"]))
+
+        if caminho == "/rate_limit":
+            return JSONResponse({"resources": {}})
+
+        if m := re.fullmatch(r"/users/([^/]+)", caminho):
+            return self._com_etag(request, gerar_usuario(m.group(1)))
+
+        if m := re.fullmatch(r"/users/([^/]+)/repos", caminho):
+            repos = gerar_repos(m.group(1))
+            if params.get("sort") == "stargazers":
+                repos = sorted(repos, key=lambda r: -r["stargazers_count"])
+            return self._paginado(request, [_publico(r) for r in repos], base)
+
+        if m := re.fullmatch(r"/repos/([^/]+)/([^/]+)/languages", caminho):
+            repo = _repo(*m.groups())
+            return JSONResponse(repo["_linguagens"]) if repo else JSONResponse({"message": "Not Found"}, 404)
+
+        if m := re.fullmatch(r"/repos/([^/]+)/([^/]+)/readme", caminho):
+            owner, nome = m.groups()
+            texto = _readme_perfil(owner) if owner == nome else (
+                f"# {nome}\n\nProjeto de exemplo." if (_repo(owner, nome) or {}).get("_tem_readme") else None
+            )
+            if texto is None:
+                return JSONResponse({"message": "Not Found"}, 404)
+            return Response(texto, media_type="text/plain")
+
+        if caminho == "/search/users":
+            rng = _rng("busca", params.get("q", ""))
+            logins = [f"dev-{rng.randint(1000, 9999)}-{i}" for i in range(100)]
+            return self._paginado(request, [{"login": login} for login in logins], base, envelope=True)
+
+        if caminho == "/search/repositories":
+            # Repositórios dos logins sintéticos; respeita só o qualificador `pushed:>=AAAA-MM-DD`
+            q = params.get("q", "")
+            rng = _rng("busca-repos", q)
+            desde = re.search(r"pushed:>=(\d{4}-\d{2}-\d{2})", q)
+            itens = []
+            for i in range(200):
+                login = f"dev-{rng.randint(1000, 9999)}-{i}"
+                for r in gerar_repos(login)[:2]:
+                    if desde is None or r["pushed_at"][:10] >= desde.group(1):
+                        itens.append({**_publico(r), "owner": {"login": login, "type": "User"}})
+            return self._paginado(request, itens[:1000], base, envelope=True)
+
+        return JSONResponse({"message": "Not Found"}, 404)
+
+    def _com_etag(self, request: Request, dados) -> Response:
+        corpo = json.dumps(dados, ensure_ascii=False)
+        etag = f'"{hashlib.sha1(corpo.encode()).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(corpo, media_type="application/json", headers={"ETag": etag})
+
+    def _paginado(self, request: Request, itens: list, base: str, envelope: bool = False) -> Response:
+        por_pagina = int(request.query_params.get("per_page", 30))
+        pagina = int(request.query_params.get("page", 1))
+        inicio = (pagina - 1) * por_pagina
+        trecho = itens[inicio:inicio + por_pagina]
+        resposta = self._com_etag(request, {"total_count": len(itens), "items": trecho} if envelope else trecho)
+        if inicio + por_pagina < len(itens):
+            params = {**request.query_params, "page": pagina + 1}
+            resposta.headers["Link"] = f'<{base}{request.url.path}?{urlencode(params)}>; rel="next"'
+        return resposta
+
+    # --- OpenAI ---
+    async def openai(self, request: Request, corpo: bytes) -> Response:
+        self.contadores["openai"] += 1
+        if self.args.modo != "sintetico":
+            chave = self._chave(request, corpo)
+            if self.args.modo == "gravar":
+                return await self._gravar(request, corpo, chave, OPENAI_REAL)
+            gravada = self._ler_fixture(chave, str(request.base_url).rstrip("/"))
+            if gravada is not None:
+                await self._latencia(self.args.latencia_openai)
+                return gravada
+            self.contadores["fixtures_faltando"] += 1
+
+        if self.rng.random() < self.args.taxa_erro:
+            self.contadores["erros_injetados"] += 1
+            await self._latencia(self.args.latencia_openai)
+            return JSONResponse({"error": {"message": "erro injetado", "type": "server_error"}}, status_code=500)
+
+        payload = json.loads(corpo)
+        prompt = "\n".join(m["content"] for m in payload["messages"])
+        formato_json = (payload.get("response_format") or {}).get("type") == "json_object"
+        conteudo = _conteudo_openai(prompt, formato_json)
+        modelo = payload.get("model", "gpt-4o")
+
+        if not payload.get("stream"):
+            # A geração leva mais tempo quanto maior a resposta
+            await self._latencia(self.args.latencia_openai + self.args.ms_por_token * _uso(prompt, conteudo)["completion_tokens"])
+            return JSONResponse({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": modelo,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": conteudo}, "finish_reason": "stop"}],
+                "usage": _uso(prompt, conteudo),
+            })
+
+        pedacos = [conteudo[i:i + 40] for i in range(0, len(conteudo), 40)]
+
+        async def eventos():
+            for pedaco in pedacos:
+                await self._latencia(self.args.latencia_openai / len(pedacos))
+                chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": modelo,
+                         "choices": [{"index": 0, "delta": {"content": pedaco}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": modelo,
+                     "choices": [], "usage": _uso(prompt, conteudo)}
+            yield f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n"
+
+        return StreamingResponse(eventos(), media_type="text/event-stream")
+
+
+def criar_app(args) -> FastAPI:
+    stub = Stub(args)
+    app = FastAPI(title="Stub GitHub + OpenAI")
+
+    @app.get("/_stub/contadores")
+    async def contadores():
+        return dict(stub.contadores)
+
+    @app.post("/_stub/zerar")
+    async def zerar():
+        stub.contadores.clear()
+        stub.cotas.clear()
+        return {"ok": True}
+
+    @app.api_route("/{caminho:path}", methods=["GET", "HEAD", "POST"])
+    async def despachar(request: Request, caminho: str):
+        corpo = await request.body()
+        if request.url.path.startswith("/v1/"):
+            return await stub.openai(request, corpo)
+        return await stub.github(request, corpo)
+
+    return app
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=9000)
+    parser.add_argument("--modo", choices=["sintetico", "gravar", "reproduzir"], default="sintetico")
+    parser.add_argument("--fixtures", default="data/fixtures", help="diretório das respostas gravadas")
+    parser.add_argument("--latencia-github", type=float, default=50, help="latência média (ms) do GitHub")
+    parser.add_argument("--latencia-openai", type=float, default=1000, help="latência média (ms) da OpenAI")
+    parser.add_argument("--ms-por-token", type=float, default=0,
+                        help="latência extra (ms) por token de saída da OpenAI, fora do streaming")
+    parser.add_argument("--jitter", type=float, default=0.2, help="variação relativa da latência (0.2 = ±20%%)")
+    parser.add_argument("--cota", type=int, default=5000, help="chamadas por token e recurso em cada janela")
+    parser.add_argument("--janela", type=float, default=3600, help="duração (s) da janela de cota")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas com erro 5xx")
+    parser.add_argument("--taxa-limite-secundario", type=float, default=0.0, help="fração de respostas 403 + Retry-After")
+    parser.add_argument("--semente", type=int, default=42)
+    return parser
+
+
+def main():
+    args = criar_parser().parse_args()
+    uvicorn.run(criar_app(args), host=args.host, port=args.porta, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Mede o tempo de importação do app (`import main`) com `python -X importtime` e falha
+(código de saída 1) se passar do orçamento ou se algum módulo que deveria ser carregado
+só sob demanda (ex.: o SDK da OpenAI) aparecer na importação.
+
+Cada medição roda num processo novo; o total é a mediana das repetições. O relatório lista
+os pacotes de primeiro nível e os módulos mais caros (tempo próprio).
+
+Uso (a partir de backend/):
+    python tools/tempo_importacao.py --repeticoes 5
+    python tools/tempo_importacao.py --orcamento-ms 800 --proibidos openai,numpy
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from core.config import IMPORTACAO_ORCAMENTO_MS  # noqa: E402
+
+# "import time:   self [us] | cumulative | imported package"
+_LINHA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def medir(modulo: str) -> dict:
+    """Importa `modulo` num processo novo e devolve {modulo: (próprio_us, cumulativo_us, nível)}."""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=BACKEND_DIR, env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        erro = processo.stderr.strip().splitlines()[-1:] or ["sem saída"]
+        raise SystemExit(f"Falha ao importar {modulo}: {erro[0]}")
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if m := _LINHA.match(linha):
+            proprio, cumulativo, recuo, nome = m.groups()
+            tempos[nome] = (int(proprio), int(cumulativo), len(recuo) // 2)
+    return tempos
+
+
+def verificar(medicoes: list, modulo: str, orcamento_ms: float, proibidos: list) -> tuple:
+    """Mediana (ms) das medições e as falhas: módulos proibidos importados e orçamento estourado."""
+    total = statistics.median(m[modulo][1] / 1000 for m in medicoes)
+    falhas = [
+        f"'{proibido}' é importado no startup (deveria ser carregado sob demanda)"
+        for proibido in proibidos if any(proibido in m for m in medicoes)
+    ]
+    if total > orcamento_ms:
+        falhas.append(f"import {modulo} levou {total:.0f}ms (orçamento {orcamento_ms:.0f}ms)")
+    return total, falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulo", default="main")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento-ms", type=float, default=IMPORTACAO_ORCAMENTO_MS)
+    parser.add_argument("--proibidos", default="openai",
+                        help="módulos (separados por vírgula) que não podem ser importados no startup")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    medicoes = [medir(args.modulo) for _ in range(args.repeticoes)]
+    proibidos = [p.strip() for p in args.proibidos.split(",") if p.strip()]
+    total, falhas = verificar(medicoes, args.modulo, args.orcamento_ms, proibidos)
+    totais = [m[args.modulo][1] / 1000 for m in medicoes]
+    # Relatório da medição mais próxima da mediana
+    tempos = medicoes[min(range(len(totais)), key=lambda i: abs(totais[i] - total))]
+
+    pacotes = defaultdict(int)
+    for nome, (proprio, _, _) in tempos.items():
+        pacotes[nome.split(".")[0]] += proprio
+    print(f"Pacotes de primeiro nível (tempo próprio somado), total {total:.0f}ms:")
+    for nome, us in sorted(pacotes.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {nome:<30} {us / 1000:>8.1f}ms")
+    print()
+    print("Módulos mais caros (tempo próprio):")
+    for nome, (proprio, cumulativo, _) in sorted(tempos.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {nome:<50} {proprio / 1000:>8.1f}ms  (cumulativo {cumulativo / 1000:.1f}ms)")
+    print()
+
+    print(f"import {args.modulo}: mediana {total:.0f}ms em {args.repeticoes} execuções "
+          f"(mín {min(totais):.0f}ms, máx {max(totais):.0f}ms), orçamento {args.orcamento_ms:.0f}ms")
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        raise SystemExit(1)
+    print("✅ Dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Teste de carga do modo multiprocesso: sobe o tools/stub_server.py e, para cada quantidade
+de workers pedida, o backend via tools/servidor.py (com um DATA_DIR vazio), mede a vazão
+de um endpoint com o tools/benchmark.py e compara com a primeira medição.
+
+Os ganhos aparecem quando o trabalho de CPU do backend (coleta, montagem de prompts,
+renderização, caches) é o gargalo; com latências altas no stub o limite passa a ser a
+espera pelas APIs e os números se aproximam. Rode em uma máquina com pelo menos tantos
+núcleos quanto o maior número de workers.
+
+Uso (a partir de backend/):
+    python tools/teste_carga_workers.py --workers 1 2 4 --requisicoes 200 --concorrencia 32
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+from benchmark import _payloads, medir
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _esperar(url: str, timeout: float = 60):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} não respondeu em {timeout:.0f}s")
+
+
+def _parar(processo: subprocess.Popen):
+    processo.terminate()
+    try:
+        processo.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+
+
+async def _medir(args, porta: int, prefixo: str) -> dict:
+    payload = _payloads(prefixo, 0)[args.endpoint]
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{porta}", timeout=args.timeout) as api, \
+            httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.porta_stub}", timeout=10) as stub:
+        if args.aquecimento:
+            await medir(api, stub, args.endpoint, payload, args.aquecimento, args.concorrencia)
+        return await medir(api, stub, args.endpoint, payload, args.requisicoes, args.concorrencia)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--endpoint", default="/analisar-perfil",
+                        choices=["/analisar-perfil", "/ranking-vaga", "/analisar-com-filtros"])
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--aquecimento", type=int, default=10, help="requisições descartadas antes de cada medição")
+    parser.add_argument("--porta", type=int, default=8100, help="porta do backend")
+    parser.add_argument("--porta-stub", type=int, default=9100)
+    parser.add_argument("--latencia-github", type=float, default=20, help="latência média (ms) do GitHub no stub")
+    parser.add_argument("--latencia-openai", type=float, default=50, help="latência média (ms) da OpenAI no stub")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    stub = subprocess.Popen(
+        [sys.executable, "tools/stub_server.py", "--porta", str(args.porta_stub),
+         "--latencia-github", str(args.latencia_github), "--latencia-openai", str(args.latencia_openai),
+         "--cota", "10000000"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    resultados = []
+    try:
+        _esperar(f"http://127.0.0.1:{args.porta_stub}/_stub/contadores")
+        for workers in args.workers:
+            data_dir = tempfile.mkdtemp(prefix=f"carga-{workers}w-")
+            env = {
+                **os.environ,
+                "DATA_DIR": data_dir,
+                "GITHUB_TOKEN": os.getenv("GITHUB_TOKEN", "stub"),
+                "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "stub"),
+                "GITHUB_API_URL": f"http://127.0.0.1:{args.porta_stub}",
+                "GITHUB_GRAPHQL_URL": f"http://127.0.0.1:{args.porta_stub}/graphql",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{args.porta_stub}/v1",
+            }
+            backend = subprocess.Popen(
+                [sys.executable, "tools/servidor.py", "--workers", str(workers), "--porta", str(args.porta),
+                 "--host", "127.0.0.1", "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                _esperar(f"http://127.0.0.1:{args.porta}/metrics/cache")
+                resultado = asyncio.run(_medir(args, args.porta, f"carga-{workers}w-{uuid.uuid4().hex[:6]}"))
+                resultados.append({"workers": workers, **resultado})
+                print(f"{workers} worker(s): {resultado['rps']} req/s, p50 {resultado['p50_ms']} ms, status {resultado['status']}")
+            finally:
+                _parar(backend)
+                shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        _parar(stub)
+
+    if not resultados:
+        return
+    base = resultados[0]["rps"] or 1
+    print()
+    print(f"{'workers':>7}  {'req/s':>8}  {'p50_ms':>8}  {'p95_ms':>8}  {'escala':>6}")
+    for r in resultados:
+        print(f"{r['workers']:>7}  {r['rps']:>8}  {r['p50_ms']:>8}  {r['p95_ms']:>8}  {r['rps'] / base:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -146,7 +146,7 @@ document.addEventListener("DOMContentLoaded", () => {
     const context = document.querySelector('input[name="contexto"]:checked').value;
     if (!user) return showError("Digite um usuário.");
     
-    await processRequest("/analisar-perfil", { usernameOrUrl: user, contexto: context });
+    await processStream("/analisar-perfil/stream", { usernameOrUrl: user, contexto: context });
   });
 
   // 2. Form Ranking
@@ -203,6 +203,76 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Consome o endpoint SSE: mostra o progresso no loader e renderiza o HTML conforme chega
+  async function processStream(endpoint, data) {
+    const loadingText = loader.querySelector(".loading-text");
+    loader.classList.remove("hidden");
+    resultadoDiv.classList.remove("ativo");
+    errorMessage.classList.add("hidden");
+
+    let html = "";
+
+    try {
+      const response = await fetch(endpoint, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(data)
+      });
+
+      if (!response.ok || !response.body) {
+        const result = await response.json().catch(() => ({}));
+        throw new Error(result.detail || "Erro na requisição.");
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Cada evento SSE termina com uma linha em branco
+        let fimEvento;
+        while ((fimEvento = buffer.indexOf("\n\n")) !== -1) {
+          const { tipo, dados } = parseSSE(buffer.slice(0, fimEvento));
+          buffer = buffer.slice(fimEvento + 2);
+
+          if (tipo === "progresso") {
+            loadingText.textContent = dados.mensagem;
+          } else if (tipo === "token") {
+            if (!html) {
+              loader.classList.add("hidden");
+              resultadoDiv.classList.add("ativo");
+              setTimeout(() => resultadoDiv.scrollIntoView({ behavior: "smooth" }), 100);
+            }
+            html += dados.texto;
+            resultadoDiv.innerHTML = html;
+          } else if (tipo === "erro") {
+            throw new Error(dados.detail || "Erro na requisição.");
+          }
+        }
+      }
+
+    } catch (error) {
+      showError(error.message);
+    } finally {
+      loader.classList.add("hidden");
+      loadingText.textContent = "Processando...";
+    }
+  }
+
+  function parseSSE(bloco) {
+    let tipo = "message";
+    const linhas = [];
+    bloco.split("\n").forEach(linha => {
+      if (linha.startsWith("event:")) tipo = linha.slice(6).trim();
+      else if (linha.startsWith("data:")) linhas.push(linha.slice(5).trim());
+    });
+    return { tipo, dados: linhas.length ? JSON.parse(linhas.join("\n")) : {} };
+  }
+
   function showError(msg) {
     errorMessage.textContent = msg;
     errorMessage.classList.remove("hidden");